@@ -0,0 +1,177 @@
+"""
+Langlivet Chromium-server som flere scraper-kjøringer kan dele.
+
+  python browser_server.py start   # starter Chromium og lagrer endepunktet
+  python browser_server.py status
+  python browser_server.py stop
+
+Scraperne kobler seg til over CDP (connect_over_cdp) når et endepunkt er
+tilgjengelig, og starter ellers sin egen nettleser som før. Endepunktet
+hentes fra miljøvariabelen POSTLISTE_BROWSER_ENDPOINT eller fra
+endepunktfilen som start skriver ("off" i miljøvariabelen slår av).
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ENDPOINT_ENV = "POSTLISTE_BROWSER_ENDPOINT"
+ENDPOINT_FILE = Path(tempfile.gettempdir()) / "postliste_browser_endpoint.json"
+
+# Samme flagg som create_playwright_context bruker, pluss bildeblokkering
+# i selve nettleseren (ruter installeres per tilkobling på klientsiden)
+SERVER_ARGS = [
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--blink-settings=imagesEnabled=false",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+
+STARTUP_TIMEOUT = 30
+
+
+def _is_alive(endpoint, timeout=1.0):
+    try:
+        with urllib.request.urlopen(f"{endpoint}/json/version", timeout=timeout) as resp:
+            return resp.status == 200
+    except Exception:
+        return False
+
+
+def get_browser_endpoint():
+    """
+    Returnerer CDP-endepunktet (http://127.0.0.1:<port>) til en kjørende
+    server, eller None hvis ingen er tilgjengelig.
+    """
+    endpoint = os.environ.get(ENDPOINT_ENV)
+    if endpoint == "off":
+        return None
+
+    if not endpoint and ENDPOINT_FILE.exists():
+        try:
+            endpoint = json.loads(ENDPOINT_FILE.read_text(encoding="utf-8")).get("endpoint")
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese {ENDPOINT_FILE}: {e}")
+            return None
+
+    if not endpoint:
+        return None
+    if not _is_alive(endpoint):
+        print(f"[WARN] Nettleserserver på {endpoint} svarer ikke; starter egen nettleser.")
+        return None
+    return endpoint
+
+
+def get_server_pid(endpoint):
+    """
+    Pid til Chromium-prosessen som start_server() startet for endpoint,
+    eller None (f.eks. når endepunktet kommer fra miljøvariabelen og
+    serveren er startet et annet sted).
+    """
+    if not ENDPOINT_FILE.exists():
+        return None
+    try:
+        info = json.loads(ENDPOINT_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if info.get("endpoint") != endpoint:
+        return None
+    return info.get("pid")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _chromium_executable():
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+def start_server(port=None):
+    """Starter Chromium i bakgrunnen og skriver endepunktfilen."""
+    existing = get_browser_endpoint()
+    if existing:
+        print(f"[INFO] Nettleserserver kjører allerede på {existing}")
+        return existing
+
+    port = port or _free_port()
+    profile = tempfile.mkdtemp(prefix="postliste-browser-")
+    cmd = [
+        _chromium_executable(),
+        *SERVER_ARGS,
+        "--remote-debugging-address=127.0.0.1",
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={profile}",
+        "about:blank",
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    endpoint = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while not _is_alive(endpoint):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError(f"Chromium startet ikke på port {port}")
+        time.sleep(0.2)
+
+    ENDPOINT_FILE.write_text(
+        json.dumps({"endpoint": endpoint, "pid": proc.pid, "profile": profile}),
+        encoding="utf-8",
+    )
+    print(f"[INFO] Nettleserserver startet på {endpoint} (pid {proc.pid})")
+    return endpoint
+
+
+def stop_server():
+    """Stopper serveren som start_server() startet."""
+    if not ENDPOINT_FILE.exists():
+        print("[INFO] Ingen nettleserserver registrert.")
+        return
+    info = json.loads(ENDPOINT_FILE.read_text(encoding="utf-8"))
+    try:
+        os.killpg(info["pid"], signal.SIGTERM)
+        print(f"[INFO] Stoppet nettleserserver (pid {info['pid']})")
+    except ProcessLookupError:
+        print("[INFO] Nettleserserveren var allerede stoppet.")
+    ENDPOINT_FILE.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delt Chromium-server for scraperne")
+    parser.add_argument("command", choices=["start", "stop", "status"])
+    parser.add_argument("--port", type=int, help="Fast CDP-port (standard: ledig port)")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        start_server(args.port)
+    elif args.command == "stop":
+        stop_server()
+    else:
+        endpoint = get_browser_endpoint()
+        print(f"[INFO] Nettleserserver: {endpoint or 'ingen'}")
+
+
+if __name__ == "__main__":
+    main()
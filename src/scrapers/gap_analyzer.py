@@ -0,0 +1,121 @@
+import argparse
+import bisect
+import json
+from datetime import datetime
+
+from utils_files import (
+    DATA_DIR,
+    atomic_write,
+    load_archive_year,
+    load_all_postliste,
+    load_page_map,
+)
+from utils_documents import normalize_documents
+from utils_gaps import (
+    DATE_GAP_DAYS,
+    DEFAULT_PER_PAGE,
+    GAP_FACTOR,
+    MIN_ID_GAP,
+    find_gaps,
+    pages_for_gaps,
+)
+
+ARCHIVE_DIR = DATA_DIR / "archive"
+
+
+def repair_pages_path(year):
+    return ARCHIVE_DIR / f"repair_pages_{year}.json"
+
+
+def collect_year_docs(year, shard_docs):
+    """Alle kjente dokumenter for året: archive, missing_<år>.json og shards."""
+    docs = dict(load_archive_year(year))
+
+    missing_path = ARCHIVE_DIR / f"missing_{year}.json"
+    if missing_path.exists():
+        for d in normalize_documents(json.loads(missing_path.read_text(encoding="utf-8"))):
+            docs[d["dokumentID"]] = d
+
+    prefix = f"{year}/"
+    for did, d in shard_docs.items():
+        if did.startswith(prefix):
+            docs[did] = d
+    return list(docs.values())
+
+
+def newer_counter(all_docs):
+    """Returnerer en funksjon som teller dokumenter med dato etter en gitt dato."""
+    dates = sorted(d["dato_iso"] for d in all_docs if d.get("dato_iso"))
+
+    def count(observed):
+        if not observed:
+            return 0
+        return len(dates) - bisect.bisect_right(dates, observed)
+
+    return count
+
+
+def year_page_span(page_map, year):
+    """Antall sider i sidekartet som inneholder datoer fra året (for sammenligning)."""
+    lo, hi = f"{year}-01-01", f"{year}-12-31"
+    return sum(
+        1 for e in page_map["pages"].values()
+        if e["first_date"] <= hi and e["last_date"] >= lo
+    )
+
+
+def analyze(year, per_page=DEFAULT_PER_PAGE, min_gap=MIN_ID_GAP, factor=GAP_FACTOR, date_gap_days=DATE_GAP_DAYS):
+    shard_dict, _ = load_all_postliste()
+    docs = collect_year_docs(year, shard_dict)
+    page_map = load_page_map()
+
+    gaps = find_gaps(docs, year, min_gap=min_gap, factor=factor, date_gap_days=date_gap_days)
+    # Samme dokument kan ligge både i shardene og i arkivet; tell det én gang
+    known = list({**{d["dokumentID"]: d for d in docs}, **shard_dict}.values())
+    pages = pages_for_gaps(gaps, page_map, newer_counter(known), per_page=per_page)
+
+    print(f"[INFO] {len(docs)} kjente dokumenter for {year}, {len(gaps)} hull funnet")
+    for g in gaps:
+        print(f"       {g['type']:5s} {g['fra_id'] or '-':>12s} – {g['til_id'] or '-':<12s} "
+              f"({g['fra_dato']} – {g['til_dato']})")
+
+    if gaps and not pages:
+        print("[WARN] Sidekartet (data/page_map.json) dekker ikke året; kan ikke anslå sider.")
+
+    span = year_page_span(page_map, year)
+    if span:
+        print(f"[INFO] {len(pages)} sider å reparere (året spenner over minst {span} sider i sidekartet)")
+    else:
+        print(f"[INFO] {len(pages)} sider å reparere")
+
+    result = {
+        "year": year,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "per_page": per_page,
+        "gaps": gaps,
+        "pages": pages,
+    }
+    atomic_write(repair_pages_path(year), result)
+    print(f"[INFO] Lagret {repair_pages_path(year)}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Finner hull i dokumentID-serien for et år og anslår hvilke sider repair bør skrape"
+    )
+    parser.add_argument("year", type=int)
+    parser.add_argument("--per-page", type=int, default=DEFAULT_PER_PAGE)
+    parser.add_argument("--min-gap", type=int, default=MIN_ID_GAP,
+                        help="Minste hopp i løpenummer som regnes som hull")
+    parser.add_argument("--factor", type=float, default=GAP_FACTOR,
+                        help="Hull må også være større enn faktor × 95-persentilen av hull i året")
+    parser.add_argument("--date-gap-days", type=int, default=DATE_GAP_DAYS,
+                        help="Perioder uten dokumenter lenger enn dette regnes som hull")
+    args = parser.parse_args()
+
+    analyze(args.year, args.per_page, args.min_gap, args.factor, args.date_gap_days)
+
+
+if __name__ == "__main__":
+    main()
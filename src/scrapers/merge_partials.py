@@ -0,0 +1,167 @@
+import argparse
+import heapq
+import json
+from collections import defaultdict
+
+from utils_documents import archive_sort_key
+from utils_files import DATA_DIR, load_partial, load_page_map, save_page_map, write_archive_file
+from utils_gaps import merge_page_maps
+
+ARCHIVE_DIR = DATA_DIR / "archive"
+
+SPLITS = ("full", "H", "Q")
+
+
+def split_label(dato_iso, split):
+    """Arkivfil-etikett for en dato: full, H1/H2 eller Q1–Q4."""
+    if split == "full":
+        return "full"
+    month = int(dato_iso[5:7])
+    if split == "H":
+        return "H1" if month <= 6 else "H2"
+    return f"Q{(month - 1) // 3 + 1}"
+
+
+def archive_path(year, label):
+    return ARCHIVE_DIR / f"postliste_{year}_{label}.json"
+
+
+def load_sources(paths):
+    """
+    Leser delresultatene. Returnerer en liste (prioritet, navn, meta, docs)
+    der høyere prioritet vinner ved duplikater: nyeste "created" først,
+    deretter rekkefølgen på kommandolinjen.
+    """
+    sources = []
+    for pos, path in enumerate(paths):
+        meta, docs = load_partial(path)
+        sources.append(((meta.get("created") or "", pos), str(path), meta, docs))
+        part = meta.get("partition")
+        label = f" (partisjon {part['index']}/{part['count']})" if part else ""
+        print(f"[INFO] Leste {len(docs)} dokumenter fra {path}{label}")
+    return sources
+
+
+def check_coverage(sources):
+    """Advarer om manglende partisjoner, uferdige sider og samler feilede sider."""
+    seen = defaultdict(set)
+    failed = set()
+    for _prio, name, meta, _docs in sources:
+        part = meta.get("partition")
+        if part:
+            key = (meta.get("start_date"), meta.get("end_date"), part["count"])
+            seen[key].add(part["index"])
+        failed.update(meta.get("failed_pages") or [])
+        if meta.get("remaining_pages"):
+            print(f"[WARN] {name} ble stoppet av tidsbudsjettet; {len(meta['remaining_pages'])} sider ble ikke kjørt")
+
+    for (start, end, count), indexes in sorted(seen.items(), key=str):
+        missing = sorted(set(range(1, count + 1)) - indexes)
+        if missing:
+            print(f"[WARN] Mangler partisjon(er) {missing} av {count} for {start}–{end}")
+
+    if failed:
+        print(f"[WARN] {len(failed)} feilede sider i delresultatene: {sorted(failed)}")
+    return sorted(failed)
+
+
+def pick_winners(sources):
+    """{ dokumentID: id(dokument) } for versjonen som skal beholdes."""
+    winners = {}
+    for _prio, _name, _meta, docs in sorted(sources, key=lambda s: s[0]):
+        for d in docs:
+            winners[d["dokumentID"]] = id(d)
+    return winners
+
+
+def merge_partials(paths, splits=("full",), replace=False):
+    """
+    K-veis fletting av delresultater til data/archive/postliste_<år>_<etikett>.json.
+
+      - dokumenter uten dato hoppes over
+      - duplikater på dokumentID: nyeste delresultat vinner, og
+        delresultater vinner over eksisterende arkivinnhold
+      - hver fil sorteres deterministisk (nyeste dato, deretter høyeste ID)
+      - uten replace flettes eksisterende arkivfiler inn
+      - sidekartene i delresultatene flettes inn i data/page_map.json
+    Returnerer listen av skrevne filer.
+    """
+    sources = load_sources(paths)
+    check_coverage(sources)
+    winners = pick_winners(sources)
+
+    page_map = load_page_map()
+    for _prio, _name, meta, _docs in sources:
+        merge_page_maps(page_map, meta.get("page_map") or {})
+    if any(meta.get("page_map") for _p, _n, meta, _d in sources):
+        save_page_map(page_map)
+
+    written = []
+    for split in splits:
+        # (år, etikett) -> én sortert strøm per delresultat
+        buckets = defaultdict(list)
+        undated = 0
+        for _prio, _name, _meta, docs in sources:
+            per_bucket = defaultdict(list)
+            for d in docs:
+                if winners.get(d["dokumentID"]) != id(d):
+                    continue
+                if not d.get("dato_iso"):
+                    undated += 1
+                    continue
+                per_bucket[(d["dato_iso"][:4], split_label(d["dato_iso"], split))].append(d)
+            for key, bucket_docs in per_bucket.items():
+                buckets[key].append(sorted(bucket_docs, key=archive_sort_key, reverse=True))
+
+        if undated:
+            print(f"[WARN] Hoppet over {undated} dokumenter uten dato")
+
+        for (year, label), streams in sorted(buckets.items()):
+            path = archive_path(year, label)
+
+            if not replace and path.exists():
+                _meta, existing = load_partial(path)
+                existing = [d for d in existing if d["dokumentID"] not in winners]
+                streams.append(sorted(existing, key=archive_sort_key, reverse=True))
+
+            merged = []
+            seen = set()
+            for d in heapq.merge(*streams, key=archive_sort_key, reverse=True):
+                if d["dokumentID"] in seen:
+                    continue
+                seen.add(d["dokumentID"])
+                merged.append(d)
+
+            write_archive_file(path, merged)
+            written.append(path)
+            print(f"[INFO] Skrev {path} med {len(merged)} dokumenter")
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Slår sammen delresultater fra scraper_dates.py --partition til archive-filer"
+    )
+    parser.add_argument("partials", nargs="+", help="Delresultater (eller rene dokumentlister)")
+    parser.add_argument(
+        "--split",
+        action="append",
+        choices=SPLITS,
+        help="Arkivinndeling: full (hele år), H (halvår) eller Q (kvartal). Kan gjentas.",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Overskriv arkivfilene i stedet for å flette inn eksisterende innhold",
+    )
+    args = parser.parse_args()
+
+    try:
+        merge_partials(args.partials, splits=args.split or ["full"], replace=args.replace)
+    except (OSError, ValueError, json.JSONDecodeError) as e:
+        parser.exit(1, f"[ERROR] {e}\n")
+
+
+if __name__ == "__main__":
+    main()
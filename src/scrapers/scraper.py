@@ -1,3 +1,5 @@
+import asyncio
+import time
 from playwright.sync_api import sync_playwright
 from datetime import datetime, date
 
@@ -6,14 +8,163 @@ from utils_files import (
     load_config,
     load_all_postliste,
     load_changes,
-    save_changes,
-    merge_and_save_sharded,
+    load_page_fingerprints,
+    save_page_fingerprints,
+    load_revisit_state,
+    save_revisit_state,
+    load_resume_cursor,
+    save_resume_cursor,
+    clear_resume_cursor,
+    load_page_map,
+    save_page_map,
 )
 
-from scraper_core_incremental import hent_side_incremental
+from scraper_core_incremental import hent_teasere_incremental
+from scraper_core_async import hent_detaljer_async
 from scraper_changes import detect_changes, build_change_entry
+from utils_concurrency import compute_concurrency
+from utils_deadline import DeadlinePlanner
+from utils_gaps import record_page
+from utils_playwright import RecyclePolicy
+from utils_documents import fingerprint_page, teaser_hash
+from utils_playwright_setup import create_playwright_context
+from browser_server import get_browser_endpoint
+from utils_revisit import build_revisit_queue, update_revisit_state
+from utils_writer import BackgroundWriter
 
 CONFIG_FILE = "../config/config.json"
+CURSOR_NAME = "scraper"
+
+
+def page_unchanged(page_num, fp, previous_fp):
+    """En side regnes som uendret hvis fingeravtrykket er likt forrige kjøring."""
+    return previous_fp["pages"].get(str(page_num)) == fp
+
+
+def page_shifted(teasers, previous_fp):
+    """
+    Alle teasere på siden har samme teaser-hash som sist de ble behandlet,
+    dvs. siden er bare forskjøvet av nye dokumenter øverst. Brukes bare med
+    skip_shifted_pages i config, fordi slike sider ellers aldri hentes på
+    nytt og status-/filendringer da bare fanges opp av revisit.
+    """
+    known = previous_fp["documents"]
+    return all(known.get(t["dokumentID"]) == teaser_hash(t) for t in teasers)
+
+
+def needs_details(teaser, existing_dict):
+    """Et dokument trenger detaljhenting hvis det er nytt eller teaseren er endret."""
+    old = existing_dict.get(teaser["dokumentID"])
+    return old is None or teaser_hash(old) != teaser_hash(teaser)
+
+
+def sweep_listing(
+    mode, max_pages, existing_dict, previous_fp, current_fp, planner, page_map, first_page=1, skip_shifted=False
+):
+    """
+    Fase 1: leser kun listesidene.
+    Returnerer (targets, stats) der targets er teasere som skal
+    detaljhentes i fase 2.
+
+      - incremental: nye eller teaser-endrede dokumenter; stopper på
+        første side der alle dokumenter er kjente
+      - update: alle dokumenter på sider som ikke er uendret siden
+        forrige kjøring (fingeravtrykk); går gjennom alle max_pages.
+        Med skip_shifted hoppes også sider med bare kjente teasere over.
+
+    Stopper tidsbudsjettet sveipet, settes stats["next_page"] til første
+    side som ikke ble lest. Hver lest side registreres i page_map.
+    """
+    use_fingerprints = mode == "update"
+    targets = {}
+    stats = {
+        "listing_pages": 0,
+        "pages_skipped": 0,
+        "pages_shifted": 0,
+        "pages_processed": 0,
+        "stop_page": None,
+        "next_page": None,
+        "page_targets": {},
+    }
+
+    with sync_playwright() as p:
+        endpoint = get_browser_endpoint()
+        if endpoint:
+            print(f"[INFO] Kobler til delt nettleserserver på {endpoint}")
+            browser = p.chromium.connect_over_cdp(endpoint)
+        else:
+            browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
+
+        for page_num in range(first_page, max_pages + 1):
+            if not planner.can_schedule("listeside"):
+                stats["next_page"] = page_num
+                break
+
+            started = time.monotonic()
+            teasers = hent_teasere_incremental(page_num, browser)
+            planner.record(time.monotonic() - started, "listeside")
+            stats["listing_pages"] += 1
+
+            if not teasers:
+                print(f"[INFO] Ingen dokumenter på side {page_num}. Stopper.")
+                stats["stop_page"] = page_num
+                break
+
+            record_page(page_map, page_num, 100, teasers)
+
+            fp = fingerprint_page(teasers)
+            current_fp["pages"][str(page_num)] = fp
+
+            if use_fingerprints:
+                if page_unchanged(page_num, fp, previous_fp):
+                    print(f"[INFO] Side {page_num} uendret siden forrige kjøring. Hopper over.")
+                    stats["pages_skipped"] += 1
+                    continue
+                if skip_shifted and page_shifted(teasers, previous_fp):
+                    print(f"[INFO] Side {page_num} er bare forskjøvet (skip_shifted_pages). Hopper over.")
+                    stats["pages_shifted"] += 1
+                    continue
+                selected = teasers
+            else:
+                selected = [t for t in teasers if needs_details(t, existing_dict)]
+
+            stats["pages_processed"] += 1
+            stats["page_targets"][page_num] = [t["dokumentID"] for t in selected]
+            for t in selected:
+                targets.setdefault(t["dokumentID"], t)
+
+            print(f"[INFO] Side {page_num}: {len(selected)} av {len(teasers)} dokumenter trenger detaljer")
+
+            # Incremental stop condition (update-modus går gjennom alle sider)
+            known = sum(1 for t in teasers if t["dokumentID"] in existing_dict)
+            if mode != "update" and known == len(teasers):
+                print("[INFO] Incremental: alle dokumenter på denne siden er kjente. Stopper.")
+                stats["stop_page"] = page_num
+                break
+
+        browser.close()
+
+    return list(targets.values()), stats
+
+
+async def fetch_details(targets, planner, policy, on_result=None):
+    """
+    Fase 2: henter detaljsider parallelt, kun for targets. Ferdige
+    dokumenter sendes til on_result etter hvert.
+    """
+    if not targets:
+        return []
+
+    concurrency = compute_concurrency()
+    p, browser, context = await create_playwright_context()
+    try:
+        return await hent_detaljer_async(
+            context, targets, concurrency, planner=planner, policy=policy, on_result=on_result
+        )
+    finally:
+        await context.close()
+        await browser.close()
+        await p.stop()
 
 
 def main():
@@ -24,51 +175,128 @@ def main():
 
     mode = config.get("mode", "incremental")
     max_pages = int(config.get(f"max_pages_{mode}", 50))
+    revisit_budget = int(config.get("revisit_budget", 50))
+    skip_shifted = bool(config.get("skip_shifted_pages", False))
+    planner = DeadlinePlanner.from_config(config)
 
-    print(f"[INFO] Modus: {mode}, max_pages: {max_pages}")
+    print(f"[INFO] Modus: {mode}, max_pages: {max_pages}, revisit_budget: {revisit_budget}")
 
     # Last ALLE shards
     existing_dict, _all_existing_list = load_all_postliste()
     updated = dict(existing_dict)
     changes = load_changes()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
+    # Detaljhentede dokumenter og endringshendelsene deres lagres i
+    # bakgrunnen mens scrapingen pågår
+    writer = BackgroundWriter.from_config(config, existing_dict, changes)
+    writer.start()
 
-        for page_num in range(1, max_pages + 1):
-            docs = hent_side_incremental(page_num, browser)
+    # Fingeravtrykk brukes kun i update-modus
+    use_fingerprints = mode == "update"
+    previous_fp = load_page_fingerprints() if use_fingerprints else {"pages": {}, "documents": {}}
+    current_fp = {"pages": dict(previous_fp["pages"]), "documents": dict(previous_fp["documents"])}
 
-            if not docs:
-                print(f"[INFO] Ingen dokumenter på side {page_num}. Stopper.")
-                break
+    # Resume-markør fra en kjøring som ble stoppet av tidsbudsjettet
+    cursor = load_resume_cursor(CURSOR_NAME)
+    if cursor and cursor.get("mode") != mode:
+        cursor = None
+    pending = list(cursor.get("pending", [])) if cursor else []
+    first_page = 1
+    if cursor and use_fingerprints and cursor.get("next_page"):
+        # Update-modus fortsetter sveipet der forrige kjøring stoppet
+        first_page = int(cursor["next_page"])
+    if cursor:
+        print(f"[INFO] Fortsetter fra resume-markør: side {first_page}, {len(pending)} ventende dokumenter")
 
-            print(f"[INFO] Behandler {len(docs)} dokumenter fra side {page_num}")
+    # Fase 1: listesveip
+    page_map = load_page_map()
+    targets, stats = sweep_listing(
+        mode, max_pages, existing_dict, previous_fp, current_fp, planner, page_map, first_page, skip_shifted
+    )
+    swept_ids = {t["dokumentID"] for t in targets}
+    targets = [t for t in pending if t["dokumentID"] not in swept_ids] + targets
+    print(f"[INFO] Listesveip ferdig: {stats['listing_pages']} sider lest, {len(targets)} dokumenter til detaljhenting")
 
-            for d in docs:
-                doc_id = d["dokumentID"]
-                is_new, change_dict = detect_changes(updated, d)
+    # Revisit: dokumenter som sannsynligvis har endret status/filer
+    revisit_state = load_revisit_state()
+    revisit = build_revisit_queue(
+        existing_dict,
+        changes,
+        revisit_state,
+        revisit_budget,
+        exclude=[t["dokumentID"] for t in targets],
+    )
+    print(f"[INFO] Revisit: {len(revisit)} dokumenter planlagt for ny sjekk")
 
-                if is_new:
-                    print(f"[NEW] {doc_id} – {d['tittel']}")
-                    changes.append(build_change_entry(doc_id, d["tittel"], change_dict, "NEW"))
-                elif change_dict:
-                    print(f"[UPDATE] {doc_id} – {', '.join(change_dict.keys())}")
-                    changes.append(build_change_entry(doc_id, d["tittel"], change_dict, "UPDATE"))
+    revisit_ids = {d["dokumentID"] for d in revisit}
+    revisit_hits = 0
 
-                updated[doc_id] = d
+    def on_result(batch):
+        """Endringene finnes når dokumentet kommer, og lagres sammen med det."""
+        nonlocal revisit_hits
+        entries = []
+        for d in batch:
+            doc_id = d["dokumentID"]
+            is_new, change_dict = detect_changes(updated, d)
 
-            # Incremental stop condition
-            known = sum(1 for d in docs if d["dokumentID"] in existing_dict)
-            if known == len(docs):
-                print("[INFO] Incremental: alle dokumenter på denne siden er kjente. Stopper.")
-                break
+            if is_new:
+                print(f"[NEW] {doc_id} – {d['tittel']}")
+                entries.append(build_change_entry(doc_id, d["tittel"], change_dict, "NEW"))
+            elif change_dict:
+                print(f"[UPDATE] {doc_id} – {', '.join(change_dict.keys())}")
+                entries.append(build_change_entry(doc_id, d["tittel"], change_dict, "UPDATE"))
+                if doc_id in revisit_ids:
+                    revisit_hits += 1
 
-        browser.close()
+            updated[doc_id] = d
+        writer.submit(batch, entries)
+
+    # Fase 2: målrettet detaljhenting
+    docs = asyncio.run(fetch_details(targets + revisit, planner, RecyclePolicy.from_config(config), on_result))
+
+    for d in docs:
+        current_fp["documents"][d["dokumentID"]] = teaser_hash(d)
+
+    # Dokumenter som ikke rakk detaljhenting før fristen
+    fetched_ids = {d["dokumentID"] for d in docs}
+    unfinished = [t for t in targets if t["dokumentID"] not in fetched_ids]
+    unfinished_ids = {t["dokumentID"] for t in unfinished}
+    for page_num, ids in stats["page_targets"].items():
+        if unfinished_ids.intersection(ids):
+            # Siden må behandles på nytt neste gang
+            current_fp["pages"].pop(str(page_num), None)
+
+    # Siste checkpoint (shards og endringslogg) og fsync av shards
+    writer.close()
+
+    if use_fingerprints:
+        save_page_fingerprints(current_fp)
+    save_page_map(page_map)
+
+    save_revisit_state(update_revisit_state(revisit_state, [d["dokumentID"] for d in docs], updated))
 
-    # Lagre til shards
-    merge_and_save_sharded(existing_dict, list(updated.values()))
-    save_changes(changes)
+    if stats["next_page"] or unfinished:
+        save_resume_cursor(CURSOR_NAME, {
+            "mode": mode,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "next_page": stats["next_page"],
+            "pending": unfinished,
+        })
+    else:
+        clear_resume_cursor(CURSOR_NAME)
 
+    planned_pages = max_pages - first_page + 1
+    print(f"[INFO] Listesider planlagt/lest:   {planned_pages}/{stats['listing_pages']}")
+    print(f"[INFO] Detaljsider planlagt/hentet: {len(targets) + len(revisit)}/{len(docs)}")
+    if stats["next_page"]:
+        print(f"[INFO] Listesveip fortsetter fra side {stats['next_page']} neste kjøring")
+    print(f"[INFO] Gjenstår til neste kjøring: {len(unfinished)} dokumenter")
+    print(f"[INFO] Revisit-treff:              {revisit_hits} av {len(revisit)}")
+    print(f"[INFO] Sider hoppet over (uendret): {stats['pages_skipped']}")
+    if skip_shifted:
+        print(f"[INFO] Sider hoppet over (forskjøvet, skip_shifted_pages): {stats['pages_shifted']}")
+    print(f"[INFO] Sider behandlet på nytt:    {stats['pages_processed']}")
+    planner.report()
     print(f"[INFO] Incremental scraper ferdig.")
 
 
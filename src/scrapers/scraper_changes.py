@@ -1,9 +1,27 @@
 from datetime import datetime
 
+from utils_documents import normalize_document
+
+COMPARED_FIELDS = ["status", "tittel", "dokumenttype", "avsender_mottaker", "journal_link", "dato", "dato_iso"]
+
+
 def detect_changes(existing, new_doc):
-    """Returnerer (is_new, changes_dict)."""
+    """
+    Returnerer (is_new, changes_dict).
+    Begge sider normaliseres først, slik at ulike feltnavn fra ulike
+    scrapere (detalj_link vs journal_link) ikke gir falske endringer.
+
+    Hurtigvei: lagrede dokumenter bærer en innholds-hash. Er den lik
+    hashen til det nye dokumentet, er det ingen endringer å rapportere.
+    """
+    new_doc = normalize_document(new_doc)
     doc_id = new_doc["dokumentID"]
-    old = existing.get(doc_id)
+    stored = existing.get(doc_id)
+
+    if stored and stored.get("hash") == new_doc["hash"]:
+        return False, {}
+
+    old = normalize_document(stored)
 
     if not old:
         return True, {
@@ -11,14 +29,14 @@ def detect_changes(existing, new_doc):
             "tittel": {"gammel": None, "ny": new_doc.get("tittel")},
             "dokumenttype": {"gammel": None, "ny": new_doc.get("dokumenttype")},
             "avsender_mottaker": {"gammel": None, "ny": new_doc.get("avsender_mottaker")},
-            "detalj_link": {"gammel": None, "ny": new_doc.get("detalj_link")},
+            "journal_link": {"gammel": None, "ny": new_doc.get("journal_link")},
             "dato": {"gammel": None, "ny": new_doc.get("dato")},
             "dato_iso": {"gammel": None, "ny": new_doc.get("dato_iso")},
             "filer_count": {"gammel": 0, "ny": len(new_doc.get("filer", []))}
         }
 
     changes = {}
-    for key in ["status", "tittel", "dokumenttype", "avsender_mottaker", "detalj_link", "dato", "dato_iso"]:
+    for key in COMPARED_FIELDS:
         if old.get(key) != new_doc.get(key):
             changes[key] = {"gammel": old.get(key), "ny": new_doc.get(key)}
 
@@ -28,8 +46,30 @@ def detect_changes(existing, new_doc):
             "ny": len(new_doc.get("filer", []))
         }
 
+    filer_diff = diff_files(old.get("filer", []), new_doc.get("filer", []))
+    if filer_diff:
+        changes["filer"] = filer_diff
+
     return False, changes
 
+
+def diff_files(old_files, new_files):
+    """
+    Sammenligner fil-lister på URL.
+    Returnerer {"lagt_til": [...], "fjernet": [...]} eller {} hvis like.
+    Rekkefølgen følger fil-listene, slik at diffen er deterministisk.
+    """
+    old_urls = [f.get("url") for f in old_files]
+    new_urls = [f.get("url") for f in new_files]
+    old_set, new_set = set(old_urls), set(new_urls)
+
+    added = [u for u in new_urls if u not in old_set]
+    removed = [u for u in old_urls if u not in new_set]
+
+    if not added and not removed:
+        return {}
+    return {"lagt_til": added, "fjernet": removed}
+
 def build_change_entry(doc_id, title, change_dict, change_type):
     return {
         "tidspunkt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
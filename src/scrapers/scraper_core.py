@@ -1,6 +1,8 @@
 import time
 from utils_playwright import safe_text, safe_goto
-from utils_dates import parse_date_from_page, format_date
+from utils_dates import parse_date_from_page
+from utils_documents import build_document
+from utils_http import get_file_fetcher
 
 BASE_URL = (
     "https://www.strand.kommune.no/tjenester/politikk-innsyn-og-medvirkning/"
@@ -21,14 +23,22 @@ def hent_side(page_num, browser, per_page, page=None, retries=5, timeout=10_000)
 
     url = BASE_URL.format(page=page_num, page_size=per_page)
 
+    # Egen fane lukkes igjen når siden er ferdig
+    owns_page = page is None
+    if owns_page:
+        page = browser.new_page()
+    try:
+        return _hent_side(page_num, url, page, retries, timeout)
+    finally:
+        if owns_page:
+            page.close()
+
+
+def _hent_side(page_num, url, page, retries, timeout):
     for attempt in range(1, retries + 1):
         try:
             print(f"[INFO] Åpner side {page_num} (forsøk {attempt}/{retries}): {url}")
 
-            # Gjenbruk page hvis mulig
-            if page is None:
-                page = browser.new_page()
-
             # Naviger
             if not safe_goto(page, url, retries=1):
                 raise RuntimeError("safe_goto feilet")
@@ -66,12 +76,6 @@ def hent_side(page_num, browser, per_page, page=None, retries=5, timeout=10_000)
                 avsender = safe_text(art, ".bc-content-teaser-meta-property--avsender dd")
                 mottaker = safe_text(art, ".bc-content-teaser-meta-property--mottaker dd")
 
-                am = (
-                    f"Avsender: {avsender}"
-                    if avsender
-                    else (f"Mottaker: {mottaker}" if mottaker else "")
-                )
-
                 # Hent detalj-link
                 detalj_link = ""
                 try:
@@ -83,9 +87,10 @@ def hent_side(page_num, browser, per_page, page=None, retries=5, timeout=10_000)
                 if detalj_link and not detalj_link.startswith("http"):
                     detalj_link = "https://www.strand.kommune.no" + detalj_link
 
-                # Hent filer (raskere, med gjenbruk av page)
-                filer = []
-                if detalj_link:
+                # Hent filer: først over HTTP, ellers via page (gjenbrukes)
+                filer = get_file_fetcher().fetch(detalj_link) if detalj_link else []
+                if filer is None:
+                    filer = []
                     try:
                         if safe_goto(page, detalj_link, retries=1):
                             page.wait_for_timeout(200)
@@ -105,19 +110,9 @@ def hent_side(page_num, browser, per_page, page=None, retries=5, timeout=10_000)
                         safe_goto(page, url, retries=1)
                         page.wait_for_timeout(100)
 
-                status = "Publisert" if filer else "Må bes om innsyn"
-
-                docs.append({
-                    "tittel": tittel,
-                    "dato": format_date(parsed),
-                    "dato_iso": parsed.isoformat() if parsed else None,
-                    "dokumentID": dokid,
-                    "dokumenttype": doktype,
-                    "avsender_mottaker": am,
-                    "journal_link": detalj_link,
-                    "filer": filer,
-                    "status": status,
-                })
+                docs.append(build_document(
+                    tittel, parsed, dokid, doktype, avsender, mottaker, detalj_link, filer
+                ))
 
             return docs
 
@@ -1,6 +1,11 @@
+import asyncio
+import time
+
 from utils_dates import parse_date_from_page, within_range
-from utils_playwright_async import safe_text, safe_goto
-from utils_dates import format_date
+from utils_playwright_async import safe_text, safe_goto, AsyncPageRecycler
+from utils_documents import build_document, with_files
+from utils_http import get_file_fetcher
+from utils_gaps import record_page
 
 BASE_URL = (
     "https://www.strand.kommune.no/tjenester/politikk-innsyn-og-medvirkning/"
@@ -9,6 +14,129 @@ BASE_URL = (
 )
 
 
+async def hent_filer_http_async(detalj_link):
+    """
+    Lett vei: henter fil-listen over HTTP (delt keep-alive-pool) uten å
+    navigere nettleseren. Returnerer None hvis kalleren må bruke nettleseren.
+    """
+    return await asyncio.to_thread(get_file_fetcher().fetch, detalj_link)
+
+
+async def hent_filer_async(page, detalj_link, dokid, timeout=10_000, wait_idle=False):
+    """
+    Navigerer page til detaljsiden og returnerer fil-listen.
+    wait_idle=True venter på nettverksro først (nødvendig når fanen ikke
+    allerede har lastet postliste-appen).
+    Returnerer None hvis siden ikke kunne lastes (logges).
+    """
+    filer = []
+    try:
+        ok = await safe_goto(page, detalj_link, retries=1, timeout=timeout)
+        if not ok:
+            return None
+
+        if wait_idle:
+            try:
+                await page.wait_for_load_state("networkidle", timeout=timeout)
+            except Exception:
+                pass
+        await page.wait_for_timeout(120)
+
+        links = await page.query_selector_all("a")
+        for fl in links:
+            href = await fl.get_attribute("href")
+            tekst = await fl.inner_text()
+
+            if href and "/api/presentation/v2/nye-innsyn/filer" in href:
+                abs_url = href if href.startswith("http") else "https://www.strand.kommune.no" + href
+                filer.append({
+                    "tekst": (tekst or "").strip(),
+                    "url": abs_url
+                })
+
+    except Exception as e:
+        print(f"[WARN] (async) Klarte ikke hente filer for {dokid}: {e}")
+        return None
+
+    return filer
+
+
+async def hent_detaljer_async(context, teasers, concurrency, timeout=10_000, planner=None, policy=None, on_result=None):
+    """
+    Henter filer for en liste teasere parallelt, begrenset av concurrency.
+    Hver worker gjenbruker én fane, som resirkuleres etter policy
+    (RecyclePolicy) mellom dokumenter. Returnerer komplette dokumenter i
+    samme rekkefølge som teasers. Feiler både HTTP- og nettleserhentingen,
+    utelates dokumentet (og sendes ikke til on_result), slik at det
+    lagrede dokumentet står urørt og hentes på nytt neste kjøring; en
+    feilet henting kan dermed aldri endre status eller fil-listen.
+
+    Med planner (DeadlinePlanner) hentes nye dokumenter kun så lenge
+    tidsbudsjettet tillater det; dokumenter som ikke ble hentet utelates
+    fra resultatet.
+
+    on_result kalles med hvert ferdige dokument etter hvert som de blir
+    klare (f.eks. BackgroundWriter.submit).
+    """
+    if not teasers:
+        return []
+
+    queue = asyncio.Queue()
+    for idx, t in enumerate(teasers):
+        queue.put_nowait((idx, t))
+
+    results = [None] * len(teasers)
+    failed = []
+
+    async def worker():
+        recycler = AsyncPageRecycler(context.browser, policy)
+        try:
+            while planner is None or planner.can_schedule("detalj"):
+                try:
+                    idx, t = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.monotonic()
+                filer = None
+                if t.get("journal_link"):
+                    filer = await hent_filer_http_async(t["journal_link"])
+                    if filer is None:
+                        filer = await hent_filer_async(
+                            await recycler.checkout(), t["journal_link"], t["dokumentID"],
+                            timeout=timeout, wait_idle=True,
+                        )
+                    if filer is None:
+                        failed.append(t["dokumentID"])
+                        print(f"[WARN] (async) Ingen fil-liste for {t['dokumentID']}; beholder lagret dokument")
+                else:
+                    # Uten detaljlenke finnes ingen fil-liste å hente
+                    filer = t.get("filer") or []
+                if filer is not None:
+                    results[idx] = with_files(t, filer)
+                    if on_result:
+                        on_result([results[idx]])
+                if planner:
+                    planner.record(time.monotonic() - started, "detalj")
+        finally:
+            await recycler.close()
+
+    workers = min(concurrency, len(teasers))
+    print(f"[INFO] (async) Henter detaljer for {len(teasers)} dokumenter med {workers} faner")
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    done, still_running = await asyncio.wait(tasks, timeout=planner.time_left() if planner else None)
+    if still_running:
+        print(f"[WARN] Tidsbudsjett brukt opp; avbryter {len(still_running)} detaljhentinger")
+        for t in still_running:
+            t.cancel()
+        await asyncio.gather(*still_running, return_exceptions=True)
+    for t in done:
+        if t.exception():
+            raise t.exception()
+    if failed:
+        print(f"[WARN] (async) {len(failed)} detaljsider feilet og hentes på nytt neste kjøring")
+    return [r for r in results if r is not None]
+
+
 async def hent_side_async(page_num, page, per_page, retries=5, timeout=10_000):
     """
     Henter en side med dokumenter (async).
@@ -51,12 +179,6 @@ async def hent_side_async(page_num, page, per_page, retries=5, timeout=10_000):
                 avsender = await safe_text(art, ".bc-content-teaser-meta-property--avsender dd")
                 mottaker = await safe_text(art, ".bc-content-teaser-meta-property--mottaker dd")
 
-                am = (
-                    f"Avsender: {avsender}"
-                    if avsender
-                    else (f"Mottaker: {mottaker}" if mottaker else "")
-                )
-
                 detalj_link = ""
                 try:
                     link_elem = await art.evaluate_handle("node => node.closest('a')")
@@ -68,45 +190,17 @@ async def hent_side_async(page_num, page, per_page, retries=5, timeout=10_000):
                 if detalj_link and not detalj_link.startswith("http"):
                     detalj_link = "https://www.strand.kommune.no" + detalj_link
 
-                filer = []
-                if detalj_link:
+                filer = await hent_filer_http_async(detalj_link) if detalj_link else []
+                if filer is None:
                     try:
-                        ok = await safe_goto(page, detalj_link, retries=1, timeout=timeout)
-                        if ok:
-                            await page.wait_for_timeout(120)
-
-                            links = await page.query_selector_all("a")
-                            for fl in links:
-                                href = await fl.get_attribute("href")
-                                tekst = await fl.inner_text()
-
-                                if href and "/api/presentation/v2/nye-innsyn/filer" in href:
-                                    abs_url = href if href.startswith("http") else "https://www.strand.kommune.no" + href
-                                    filer.append({
-                                        "tekst": (tekst or "").strip(),
-                                        "url": abs_url
-                                    })
-
-                    except Exception as e:
-                        print(f"[WARN] (async) Klarte ikke hente filer for {dokid}: {e}")
-
+                        filer = await hent_filer_async(page, detalj_link, dokid, timeout=timeout) or []
                     finally:
                         await safe_goto(page, url, retries=1, timeout=timeout)
                         await page.wait_for_timeout(80)
 
-                status = "Publisert" if filer else "Må bes om innsyn"
-
-                docs.append({
-                    "tittel": tittel,
-                    "dato": format_date(parsed),
-                    "dato_iso": parsed.isoformat() if parsed else None,
-                    "dokumentID": dokid,
-                    "dokumenttype": doktype,
-                    "avsender_mottaker": am,
-                    "journal_link": detalj_link,
-                    "filer": filer,
-                    "status": status,
-                })
+                docs.append(build_document(
+                    tittel, parsed, dokid, doktype, avsender, mottaker, detalj_link, filer
+                ))
 
             return docs
 
@@ -128,10 +222,12 @@ async def scrape_page_with_filter(
     index,
     total_pages,
     timeout=20000,
+    page_map=None,
 ):
     """
     Wrapper rundt hent_side_async() som:
       - henter en side
+      - registrerer sidens datoer/IDer i page_map (hvis gitt)
       - filtrerer dokumenter på dato
       - returnerer enten liste eller {"failed": page_num}
     """
@@ -150,6 +246,9 @@ async def scrape_page_with_filter(
         if not docs:
             return {"failed": page_num}
 
+        if page_map is not None:
+            record_page(page_map, page_num, per_page, docs)
+
         filtered = []
         for d in docs:
             parsed_date = parse_date_from_page(d.get("dato"))
@@ -1,6 +1,8 @@
 import time
 from utils_playwright import safe_goto, safe_text
-from utils_dates import parse_date_from_page, format_date
+from utils_dates import parse_date_from_page
+from utils_documents import build_document, with_files
+from utils_http import get_file_fetcher
 
 BASE_URL = (
     "https://www.strand.kommune.no/tjenester/politikk-innsyn-og-medvirkning/"
@@ -8,7 +10,12 @@ BASE_URL = (
     "?page={page}&pageSize=100"
 )
 
-def hent_side_incremental(page_num, browser):
+def hent_teasere_incremental(page_num, browser):
+    """
+    Leser kun listevisningen for en side (ingen detaljnavigasjon).
+    Returnerer kanoniske dokumenter med tom fil-liste; filer og status
+    fylles inn av hent_detaljer_incremental().
+    """
     url = BASE_URL.format(page=page_num)
     print(f"[INFO] Åpner side {page_num}: {url}")
 
@@ -35,7 +42,7 @@ def hent_side_incremental(page_num, browser):
 
     time.sleep(1)
 
-    docs = []
+    teasers = []
     artikler = page.query_selector_all("article.bc-content-teaser--item")
     print(f"[INFO] Fant {len(artikler)} artikler på side {page_num}")
 
@@ -46,19 +53,12 @@ def hent_side_incremental(page_num, browser):
 
         tittel = safe_text(art, ".bc-content-teaser-title-text")
         dato_raw = safe_text(art, ".bc-content-teaser-meta-property--dato dd")
-        dato_norsk, dato_iso = None, None
-
         parsed = parse_date_from_page(dato_raw)
-        if parsed:
-            dato_norsk = format_date(parsed)
-            dato_iso = parsed.isoformat()
 
         doktype = safe_text(art, ".SakListItem_sakListItemTypeText__16759c")
         avsender = safe_text(art, ".bc-content-teaser-meta-property--avsender dd")
         mottaker = safe_text(art, ".bc-content-teaser-meta-property--mottaker dd")
 
-        am = f"Avsender: {avsender}" if avsender else (f"Mottaker: {mottaker}" if mottaker else "")
-
         detalj_link = ""
         try:
             link_elem = art.evaluate_handle("node => node.closest('a')")
@@ -69,36 +69,55 @@ def hent_side_incremental(page_num, browser):
         if detalj_link and not detalj_link.startswith("http"):
             detalj_link = "https://www.strand.kommune.no" + detalj_link
 
-        filer = []
-        if detalj_link:
-            dp = browser.new_page()
-            if safe_goto(dp, detalj_link):
-                time.sleep(1)
-                try:
-                    for fl in dp.query_selector_all("a"):
-                        href = fl.get_attribute("href")
-                        tekst = fl.inner_text()
-                        if href and "/api/presentation/v2/nye-innsyn/filer" in href:
-                            abs_url = href if href.startswith("http") else "https://www.strand.kommune.no" + href
-                            filer.append({"tekst": (tekst or "").strip(), "url": abs_url})
-                except Exception as e:
-                    print(f"[WARN] Klarte ikke hente filer for {dokid}: {e}")
-            dp.close()
-
-        status = "Publisert" if filer else "Må bes om innsyn"
-
-        docs.append({
-            "tittel": tittel,
-            "dato": dato_norsk or "",
-            "dato_iso": dato_iso,
-            "dokumentID": dokid,
-            "dokumenttype": doktype,
-            "avsender_mottaker": am,
-            "side": page_num,
-            "detalj_link": detalj_link,
-            "filer": filer,
-            "status": status
-        })
+        teasers.append(build_document(
+            tittel, parsed, dokid, doktype, avsender, mottaker, detalj_link, []
+        ))
 
     page.close()
+    return teasers
+
+
+def hent_filer_incremental(browser, detalj_link, dokid):
+    """Åpner detaljsiden i en egen fane og returnerer fil-listen."""
+    filer = []
+    if not detalj_link:
+        return filer
+
+    dp = browser.new_page()
+    if safe_goto(dp, detalj_link):
+        time.sleep(1)
+        try:
+            for fl in dp.query_selector_all("a"):
+                href = fl.get_attribute("href")
+                tekst = fl.inner_text()
+                if href and "/api/presentation/v2/nye-innsyn/filer" in href:
+                    abs_url = href if href.startswith("http") else "https://www.strand.kommune.no" + href
+                    filer.append({"tekst": (tekst or "").strip(), "url": abs_url})
+        except Exception as e:
+            print(f"[WARN] Klarte ikke hente filer for {dokid}: {e}")
+    dp.close()
+    return filer
+
+
+def hent_detaljer_incremental(browser, teasers):
+    """
+    Henter filer for hver teaser og returnerer komplette dokumenter.
+    Prøver først HTTP-veien for hele siden parallelt; nettleseren brukes
+    bare for dokumentene der den feilet.
+    """
+    links = [t["journal_link"] for t in teasers]
+    via_http = get_file_fetcher().fetch_many([l for l in links if l])
+    http_by_link = dict(zip([l for l in links if l], via_http))
+
+    docs = []
+    for t in teasers:
+        filer = http_by_link.get(t["journal_link"])
+        if filer is None:
+            filer = hent_filer_incremental(browser, t["journal_link"], t["dokumentID"])
+        docs.append(with_files(t, filer))
     return docs
+
+
+def hent_side_incremental(page_num, browser):
+    teasers = hent_teasere_incremental(page_num, browser)
+    return hent_detaljer_incremental(browser, teasers)
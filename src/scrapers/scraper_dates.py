@@ -1,19 +1,38 @@
 import argparse
 import asyncio
-from utils_dates import parse_cli_date
+import json
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from utils_dates import parse_cli_date, parse_date_from_page, within_range, format_date
 from utils_files import (
     ensure_directories,
     load_config,
     merge_and_save_sharded,
     atomic_write,
-    load_archive_year,
+    load_archive_ids,
     append_missing,
     save_failed_pages,
     find_missing_docs,
+    save_partial,
+    load_partial,
+    partial_path,
+    load_resume_cursor,
+    save_resume_cursor,
+    clear_resume_cursor,
+    load_page_map,
+    save_page_map,
 )
-from utils_concurrency import compute_concurrency
+from utils_concurrency import compute_concurrency, page_range, partition_pages
 from utils_playwright_setup import create_playwright_context
 from scraper_core_async import scrape_page_with_filter
+from scraper_parallel import run_sharded_scrape
+from utils_deadline import DeadlinePlanner
+from utils_gaps import record_page, merge_page_maps
+from utils_playwright import RecyclePolicy
+from utils_playwright_async import AsyncPageRecycler
+from utils_writer import BackgroundWriter
 
 DEFAULT_CONFIG_FILE = "../config/config.json"
 FILTERED_FILE = "../../data/postliste_filtered.json"
@@ -24,27 +43,138 @@ async def run_scrape_async(
     end_date=None,
     config_path=DEFAULT_CONFIG_FILE,
     mode="publish",
+    workers=1,
+    partition=None,
+    budget_seconds=None,
+    resume=False,
+    pages_file=None,
 ):
     print(f"[INFO] Starter ASYNC PARALLELL scraper_dates i modus='{mode}'…")
 
     ensure_directories()
     cfg = load_config(config_path)
+    planner = DeadlinePlanner.from_config(cfg, budget_seconds)
+    policy = RecyclePolicy.from_config(cfg)
 
     start_page = int(cfg.get("start_page", 1))
     max_pages = int(cfg.get("max_pages", 100))
     per_page = int(cfg.get("per_page", 100))
-    step = 1 if max_pages > start_page else -1
-    total_pages = abs(max_pages - start_page) + 1
+
+    # Partisjon i/n: kun én sammenhengende bit av sideintervallet
+    pages = page_range(start_page, max_pages)
+    if pages_file:
+        # Eksplisitt sideliste (f.eks. fra gap_analyzer.py eller failed_pages)
+        pages = load_pages_file(pages_file)
+        print(f"[INFO] Leste {len(pages)} sider fra {pages_file}")
+    if partition:
+        pages = partition_pages(pages, partition[0] - 1, partition[1])
+
+    partial_meta = None
+    if partition:
+        partial_meta = {
+            "partition": {"index": partition[0], "count": partition[1]},
+            "mode": mode,
+            "start_date": format_date(start_date) or None,
+            "end_date": format_date(end_date) or None,
+            "start_page": start_page,
+            "max_pages": max_pages,
+            "per_page": per_page,
+            "pages": pages,
+        }
+
+    # Fortsett der en tidligere kjøring ble stoppet av tidsbudsjettet
+    resume_info = {
+        "name": cursor_name(mode, start_date, end_date, partition),
+        "resumed": False,
+        "failed_pages": [],
+    }
+    cursor = load_resume_cursor(resume_info["name"]) if resume else None
+    if cursor:
+        allowed = set(pages)
+        pages = [n for n in cursor.get("remaining_pages", []) if n in allowed]
+        resume_info["resumed"] = True
+        resume_info["failed_pages"] = cursor.get("failed_pages", [])
+        print(f"[INFO] Fortsetter fra resume-markør: {len(pages)} sider gjenstår")
+    elif resume:
+        print("[INFO] Ingen resume-markør funnet; kjører hele intervallet")
+
+    total_pages = len(pages)
 
     print("[INFO] Konfigurasjon:")
     print(f"       start_page  = {start_page}")
     print(f"       max_pages   = {max_pages}")
-    print(f"       step        = {step}")
     print(f"       total_pages = {total_pages}")
     print(f"       per_page    = {per_page}")
     print(f"       start_date  = {start_date}")
     print(f"       end_date    = {end_date}")
+    print(f"       workers     = {workers}")
+    if partition:
+        span = f"sider {pages[0]}–{pages[-1]}" if pages else "ingen sider"
+        print(f"       partition   = {partition[0]}/{partition[1]} ({span})")
+    if planner.enabled:
+        print(f"       budsjett    = {planner.budget:.0f} s (reserve {planner.flush_reserve:.0f} s)")
+
+    # Sidekart (side -> datoer/IDer) for gap_analyzer.py
+    page_map = {"pages": {}}
+
+    # Publish: sidene slås inn i hoveddatasettet i bakgrunnen mens scrapingen pågår
+    writer = None
+    if mode == "publish" and partial_meta is None:
+        writer = BackgroundWriter.from_config(cfg)
+        writer.start()
+
+    if workers > 1:
+        # Én nettleser per prosess; koordinatoren filtrerer og lagrer
+        results, failed_pages, remaining_pages = await asyncio.to_thread(
+            run_sharded_scrape, pages, per_page, workers, 20000, planner, policy
+        )
+        for page_num, docs in results.items():
+            record_page(page_map, page_num, per_page, docs)
+        all_docs = [
+            d
+            for page_num in pages
+            for d in results.get(page_num, [])
+            if within_range(parse_date_from_page(d.get("dato")), start_date, end_date)
+        ]
+        if writer:
+            writer.submit(all_docs)
+    else:
+        all_docs, failed_pages, remaining_pages = await scrape_pages(
+            pages, per_page, start_date, end_date, planner, policy, page_map,
+            on_batch=writer.submit if writer else None,
+        )
 
+    if partial_meta is not None:
+        # Delresultatet bærer sidekartet; merge_partials.py fletter det inn
+        partial_meta["page_map"] = page_map
+    else:
+        save_page_map(merge_page_maps(load_page_map(), page_map))
+
+    # Med en eksplisitt sideliste flettes feilede sider inn i failed_pages
+    retried_pages = None
+    if pages_file:
+        left = set(remaining_pages)
+        retried_pages = [n for n in pages if n not in left]
+
+    finalize_results(
+        all_docs, failed_pages, mode, start_date, partial_meta,
+        remaining_pages=remaining_pages, resume_info=resume_info, writer=writer,
+        retried_pages=retried_pages,
+    )
+
+    print(f"[INFO] Planlagte sider:  {total_pages}")
+    print(f"[INFO] Fullførte sider:  {total_pages - len(remaining_pages)}")
+    print(f"[INFO] Gjenstående sider: {len(remaining_pages)}")
+    planner.report()
+
+
+async def scrape_pages(pages, per_page, start_date, end_date, planner, policy, page_map, on_batch=None):
+    """
+    Én nettleser, CONCURRENCY workere som henter neste side fra en kø så
+    lenge tidsbudsjettet tillater det. Sider som fortsatt kjører ved fristen
+    avbrytes. Returnerer (dokumenter, feilede sider, gjenstående sider).
+    Dokumentene fra hver ferdige side sendes også til on_batch.
+    """
     # ---------------------------------------------------------
     # SETUP: concurrency + Playwright
     # ---------------------------------------------------------
@@ -55,33 +185,50 @@ async def run_scrape_async(
     semaphore = asyncio.Semaphore(CONCURRENCY)
 
     # ---------------------------------------------------------
-    # SCRAPE ALL PAGES
+    # SCRAPE PAGES (worker-pull)
     # ---------------------------------------------------------
-    async def task_for_page(page_num, idx):
-        page = await context.new_page()
+    pending = deque(enumerate(pages, start=1))
+    results = []
+    done_pages = set()
+
+    async def worker():
+        # Egen fane per worker som resirkuleres mellom listesider
+        recycler = AsyncPageRecycler(browser, policy)
         try:
-            return await scrape_page_with_filter(
-                page=page,
-                page_num=page_num,
-                per_page=per_page,
-                start_date=start_date,
-                end_date=end_date,
-                semaphore=semaphore,
-                index=idx,
-                total_pages=total_pages,
-            )
+            while pending and planner.can_schedule():
+                idx, page_num = pending.popleft()
+                started = time.monotonic()
+                page = await recycler.checkout()
+                batch = await scrape_page_with_filter(
+                    page=page,
+                    page_num=page_num,
+                    per_page=per_page,
+                    start_date=start_date,
+                    end_date=end_date,
+                    semaphore=semaphore,
+                    index=idx,
+                    total_pages=len(pages),
+                    page_map=page_map,
+                )
+                planner.record(time.monotonic() - started)
+                results.append(batch)
+                done_pages.add(page_num)
+                if on_batch and isinstance(batch, list):
+                    on_batch(batch)
         finally:
-            await page.close()
+            await recycler.close()
 
-    tasks = [
-        task_for_page(page_num, idx)
-        for idx, page_num in enumerate(
-            range(start_page, max_pages + step, step),
-            start=1,
-        )
-    ]
-
-    results = await asyncio.gather(*tasks)
+    tasks = [asyncio.create_task(worker()) for _ in range(min(CONCURRENCY, len(pages)))]
+    if tasks:
+        done, still_running = await asyncio.wait(tasks, timeout=planner.time_left())
+        if still_running:
+            print(f"[WARN] Tidsbudsjett brukt opp; avbryter {len(still_running)} sider som fortsatt kjører")
+            for t in still_running:
+                t.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
+        for t in done:
+            if t.exception():
+                print(f"[WARN] Worker feilet: {t.exception()}")
 
     await context.close()
     await browser.close()
@@ -99,9 +246,94 @@ async def run_scrape_async(
         elif isinstance(batch, list):
             all_docs.extend(batch)
 
+    remaining_pages = [n for n in pages if n not in done_pages]
+    return all_docs, failed_pages, remaining_pages
+
+
+def cursor_name(mode, start_date, end_date, partition):
+    """Navn på resume-markøren for en gitt kjøring (modus, datoer, partisjon)."""
+    start = start_date.isoformat() if start_date else "alle"
+    end = end_date.isoformat() if end_date else start
+    name = f"scraper_dates_{mode}_{start}_{end}"
+    if partition:
+        name += f"_p{partition[0]}of{partition[1]}"
+    return name
+
+
+def dedup_docs(docs):
+    """Fjerner duplikater på dokumentID; siste forekomst vinner."""
+    by_id = {}
+    for d in docs:
+        by_id[d["dokumentID"]] = d
+    return list(by_id.values())
+
+
+def finalize_results(
+    all_docs,
+    failed_pages,
+    mode,
+    start_date,
+    partial_meta=None,
+    remaining_pages=(),
+    resume_info=None,
+    writer=None,
+    retried_pages=None,
+):
+    """
+    Felles etterbehandling: dedup, repair-diff eller merge-og-lagring.
+    Med partial_meta skrives kun et delresultat til data/partials/;
+    sammenslåing til archive gjøres senere av merge_partials.py.
+    Med writer (BackgroundWriter) er dokumentene allerede sendt til
+    skrivetråden, og lagringen avsluttes med writer.close().
+
+    Er det sider igjen (tidsbudsjettet tok slutt) lagres en resume-markør
+    slik at neste kjøring med --resume fortsetter derfra. En fortsatt
+    kjøring slår sammen resultatet med det forrige.
+    """
+    resume_info = resume_info or {"name": None, "resumed": False, "failed_pages": []}
+    failed_pages = sorted(set(resume_info["failed_pages"]) | set(failed_pages))
+
+    if resume_info["resumed"]:
+        previous = []
+        if partial_meta is not None and partial_path(partial_meta).exists():
+            _meta, previous = load_partial(partial_path(partial_meta))
+        elif partial_meta is None and mode == "full" and Path(FILTERED_FILE).exists():
+            _meta, previous = load_partial(FILTERED_FILE)
+        if previous:
+            print(f"[INFO] Slår sammen med {len(previous)} dokumenter fra forrige kjøring")
+            all_docs = previous + list(all_docs)
+
+    all_docs = dedup_docs(all_docs)
+
     print(f"[INFO] Totalt hentet {len(all_docs)} dokumenter innenfor dato-range.")
     print(f"[INFO] Antall feilede sider: {len(failed_pages)}")
 
+    write_outputs(all_docs, failed_pages, mode, start_date, partial_meta, remaining_pages, writer, retried_pages)
+
+    if resume_info["name"]:
+        if remaining_pages:
+            save_resume_cursor(resume_info["name"], {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "remaining_pages": list(remaining_pages),
+                "failed_pages": failed_pages,
+            })
+        else:
+            clear_resume_cursor(resume_info["name"])
+
+
+def write_outputs(all_docs, failed_pages, mode, start_date, partial_meta, remaining_pages, writer=None, retried_pages=None):
+    """Skriver delresultat, repair-filer eller filtrert liste og shards."""
+    # ---------------------------------------------------------
+    # PARTISJON
+    # ---------------------------------------------------------
+    if partial_meta is not None:
+        meta = dict(partial_meta)
+        meta["created"] = datetime.now().isoformat(timespec="seconds")
+        meta["failed_pages"] = failed_pages
+        meta["remaining_pages"] = list(remaining_pages)
+        save_partial(meta, all_docs)
+        return
+
     # ---------------------------------------------------------
     # REPAIR MODE
     # ---------------------------------------------------------
@@ -110,13 +342,13 @@ async def run_scrape_async(
 
         year = start_date.year if start_date else "unknown"
 
-        archive_dict = load_archive_year(year)
-        missing_docs = find_missing_docs(all_docs, archive_dict)
+        archive_ids = load_archive_ids(year)
+        missing_docs = find_missing_docs(all_docs, archive_ids)
 
         print(f"[INFO] Fant {len(missing_docs)} nye manglende dokumenter.")
 
         append_missing(year, missing_docs)
-        save_failed_pages(year, failed_pages)
+        save_failed_pages(year, failed_pages, retried_pages)
 
         print("[INFO] Repair fullført.")
         return
@@ -127,14 +359,36 @@ async def run_scrape_async(
     atomic_write(FILTERED_FILE, all_docs)
 
     if mode == "publish":
-        from utils_files import load_all_postliste
-        existing_dict, _ = load_all_postliste()
-        merge_and_save_sharded(existing_dict, all_docs)
+        if writer is not None:
+            writer.close()
+        else:
+            from utils_files import load_all_postliste
+            existing_dict, _ = load_all_postliste()
+            merge_and_save_sharded(existing_dict, all_docs)
         print("[INFO] Oppdatert shard-basert hoveddatasett.")
     else:
         print("[INFO] FULL-modus: Oppdaterer ikke hoveddatasettet")
 
 
+def load_pages_file(path):
+    """Leser en sideliste: en JSON-liste, eller et objekt med "pages"."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = data.get("pages") or []
+    return sorted({int(p) for p in data})
+
+
+def parse_partition(spec):
+    """Tolker "i/n" (1-basert) til (i, n)."""
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ugyldig partisjon: {spec}. Bruk i/n, f.eks. 2/4")
+    if n < 1 or not 1 <= i <= n:
+        raise argparse.ArgumentTypeError(f"Ugyldig partisjon: {spec}. Krever 1 <= i <= n")
+    return i, n
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", default=DEFAULT_CONFIG_FILE)
@@ -143,11 +397,39 @@ def main():
         default="publish",
         choices=["full", "publish", "repair"],
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Antall worker-prosesser, hver med egen nettleser (1 = én prosess)",
+    )
+    parser.add_argument(
+        "--partition",
+        type=parse_partition,
+        help="Kjør kun bit i av n av sideintervallet (f.eks. 2/4) og skriv et delresultat",
+    )
+    parser.add_argument(
+        "--budget-seconds",
+        type=float,
+        help="Tidsbudsjett for kjøringen; overstyrer time_budget_seconds i config",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Fortsett fra resume-markøren til en kjøring som ble stoppet av tidsbudsjettet",
+    )
+    parser.add_argument(
+        "--pages-file",
+        help="JSON-fil med sidene som skal skrapes (liste eller {\"pages\": [...]}), i stedet for start_page–max_pages",
+    )
     parser.add_argument("start_date", nargs="?")
     parser.add_argument("end_date", nargs="?")
 
     args = parser.parse_args()
 
+    if args.partition and args.mode == "repair":
+        parser.error("--partition kan ikke brukes sammen med --mode repair")
+
     start_date = parse_cli_date(args.start_date) if args.start_date else None
     end_date = parse_cli_date(args.end_date) if args.end_date else start_date
 
@@ -157,6 +439,11 @@ def main():
             end_date=end_date,
             config_path=args.config,
             mode=args.mode,
+            workers=args.workers,
+            partition=args.partition,
+            budget_seconds=args.budget_seconds,
+            resume=args.resume,
+            pages_file=args.pages_file,
         )
     )
 
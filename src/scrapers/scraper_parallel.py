@@ -0,0 +1,163 @@
+import asyncio
+import multiprocessing as mp
+import queue as queue_mod
+import time
+
+from utils_concurrency import compute_concurrency, partition_pages
+from utils_playwright_setup import create_playwright_context
+from utils_playwright_async import AsyncPageRecycler
+from scraper_core_async import hent_side_async
+
+# Hvor lenge koordinatoren venter på køen før den sjekker om workerne lever
+POLL_SECONDS = 5
+
+
+async def _scrape_pages(worker_id, pages, per_page, concurrency, result_queue, timeout, stop_event, policy):
+    """
+    Kjører i worker-prosessen: egen nettleser, sender hver side tilbake
+    straks den er ferdig. Når stop_event er satt startes ingen nye sider.
+    """
+    p, browser, context = await create_playwright_context(shared=False)
+
+    # Én resirkulerende fane per samtidig side; køen begrenser concurrency
+    recyclers = asyncio.Queue()
+    for _ in range(concurrency):
+        recyclers.put_nowait(AsyncPageRecycler(browser, policy))
+
+    async def task_for_page(page_num):
+        recycler = await recyclers.get()
+        try:
+            if stop_event.is_set():
+                result_queue.put(("skipped", worker_id, page_num, None, 0.0))
+                return
+            started = time.monotonic()
+            try:
+                docs = await hent_side_async(
+                    page_num=page_num,
+                    page=await recycler.checkout(),
+                    per_page=per_page,
+                    timeout=timeout,
+                    retries=5,
+                )
+            except Exception as e:
+                print(f"[WARN] (worker {worker_id}) Side {page_num} feilet: {e}")
+                docs = None
+        finally:
+            recyclers.put_nowait(recycler)
+        result_queue.put(("page", worker_id, page_num, docs, time.monotonic() - started))
+
+    try:
+        await asyncio.gather(*(task_for_page(n) for n in pages))
+    finally:
+        while not recyclers.empty():
+            await recyclers.get_nowait().close()
+        await context.close()
+        await browser.close()
+        await p.stop()
+
+
+def _worker_main(worker_id, pages, per_page, concurrency, result_queue, timeout, stop_event, policy):
+    """Inngangspunkt for worker-prosessen."""
+    print(f"[INFO] Worker {worker_id} starter med {len(pages)} sider (concurrency={concurrency})")
+    try:
+        asyncio.run(_scrape_pages(worker_id, pages, per_page, concurrency, result_queue, timeout, stop_event, policy))
+    finally:
+        result_queue.put(("done", worker_id, None, None, 0.0))
+
+
+def run_sharded_scrape(pages, per_page, workers, timeout=20000, planner=None, policy=None):
+    """
+    Fordeler sidene på workers prosesser, hver med sin egen Chromium.
+    Resultater strømmes tilbake over en kø mens workerne jobber.
+
+    Med planner (DeadlinePlanner) får workerne beskjed om å slutte å starte
+    nye sider når tidsbudsjettet ikke rekker til flere, og workere som
+    fortsatt jobber ved fristen avsluttes. policy (RecyclePolicy) styrer
+    når workernes faner resirkuleres.
+
+    Returnerer (results, failed_pages, remaining_pages) der results er
+    { page_num: liste med dokumenter } i ufiltrert form, og remaining_pages
+    er sider som ikke ble kjørt. Dato-filter, dedup og lagring gjøres av
+    kalleren.
+    """
+    workers = max(1, min(workers, len(pages)))
+    per_worker = max(1, compute_concurrency() // workers)
+
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+    stop_event = ctx.Event()
+
+    procs = {}
+    assigned = {}
+    for wid in range(workers):
+        chunk = partition_pages(pages, wid, workers)
+        assigned[wid] = set(chunk)
+        proc = ctx.Process(
+            target=_worker_main,
+            args=(wid, chunk, per_page, per_worker, result_queue, timeout, stop_event, policy),
+            daemon=True,
+        )
+        proc.start()
+        procs[wid] = proc
+
+    print(f"[INFO] Startet {workers} worker-prosesser ({per_worker} faner hver) for {len(pages)} sider")
+
+    results = {}
+    failed = []
+    skipped = []
+    remaining = set(procs)
+    received = 0
+    deadline_hit = False
+
+    while remaining:
+        time_left = planner.time_left() if planner else None
+        if time_left is not None and time_left <= 0:
+            print("[WARN] Tidsbudsjett brukt opp; avslutter workere som fortsatt kjører")
+            deadline_hit = True
+            for wid in remaining:
+                procs[wid].terminate()
+            break
+
+        try:
+            kind, wid, page_num, docs, seconds = result_queue.get(
+                timeout=POLL_SECONDS if time_left is None else max(0.1, min(POLL_SECONDS, time_left))
+            )
+        except queue_mod.Empty:
+            for wid in list(remaining):
+                if not procs[wid].is_alive():
+                    print(f"[WARN] Worker {wid} avsluttet uten å melde fra (exitcode={procs[wid].exitcode})")
+                    remaining.discard(wid)
+            continue
+
+        if kind == "done":
+            remaining.discard(wid)
+            continue
+
+        assigned[wid].discard(page_num)
+        if kind == "skipped":
+            skipped.append(page_num)
+            continue
+
+        received += 1
+        if docs:
+            results[page_num] = docs
+        else:
+            failed.append(page_num)
+        print(f"[INFO] Mottatt side {page_num} fra worker {wid} ({received}/{len(pages)})")
+
+        if planner:
+            planner.record(seconds)
+            if not stop_event.is_set() and not planner.can_schedule():
+                stop_event.set()
+
+    for wid, proc in procs.items():
+        proc.join(timeout=10)
+        if deadline_hit:
+            # Sider som ikke ble ferdige før fristen kjøres neste gang
+            skipped.extend(assigned[wid])
+        else:
+            # Sider en død worker aldri rapporterte regnes som feilet
+            failed.extend(assigned[wid])
+
+    order = {p: i for i, p in enumerate(pages)}
+    return results, sorted(set(failed)), sorted(set(skipped), key=order.get)
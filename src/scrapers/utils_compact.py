@@ -0,0 +1,250 @@
+"""
+Kompakt lagringsformat for shards og archive-filer.
+
+Hver fil er selvbeskrivende JSON:
+
+  {
+    "format": "postliste-compact",
+    "version": 1,
+    "fields": [...],                 # kolonnene i hver rad
+    "prefixes": ["", "https://…"],   # URL-prefikser (indeks 0 = ingen)
+    "values": { "dokumenttype": [...], "avsender_mottaker": [...], "status": [...] },
+    "rows": [[tittel, dato_iso, dokumentID, type, avsmot, lprefix, lrest,
+              [[tekst, prefix, rest], …], status, hash], …]
+  }
+
+Felt med få ulike verdier lagres som indekser i "values", URL-er som
+(prefiks-indeks, resten), og dato utledes fra dato_iso. decode_documents
+gir tilbake nøyaktig de kanoniske dokumentene som ble kodet.
+web/java/compact.js dekoder samme format i nettleseren.
+"""
+import json
+from datetime import date
+from pathlib import Path
+
+from utils_dates import format_date
+from utils_documents import CANONICAL_FIELDS, normalize_documents
+
+COMPACT_FORMAT = "postliste-compact"
+COMPACT_VERSION = 1
+
+ROW_FIELDS = [
+    "tittel",
+    "dato_iso",
+    "dokumentID",
+    "dokumenttype",
+    "avsender_mottaker",
+    "journal_link.prefix",
+    "journal_link.rest",
+    "filer",
+    "status",
+    "hash",
+]
+
+# Felt som lagres som indekser i en verdiliste
+DICT_FIELDS = ("dokumenttype", "avsender_mottaker", "status")
+
+
+def url_prefix(url):
+    """
+    Delen av en URL som deles med mange andre: alt til og med siste "/"
+    før fragmentet (#/details/…), eller før siste sti-segment.
+    """
+    hash_pos = url.find("#")
+    end = url.rfind("/", 0, hash_pos if hash_pos >= 0 else len(url))
+    return url[:end + 1] if end >= 0 else ""
+
+
+class _Table:
+    """Verdiliste med oppslag verdi → indeks. bytes er omtrentlig JSON-størrelse."""
+
+    def __init__(self, initial=()):
+        self.values = []
+        self.index = {}
+        self.bytes = 0
+        for v in initial:
+            self.add(v)
+
+    def add(self, value):
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.values)
+            self.values.append(value)
+            self.bytes += len(json.dumps(value, ensure_ascii=False).encode("utf-8")) + 1
+        return i
+
+
+class CompactEncoder:
+    """
+    Bygger en kompakt fil rad for rad av kanoniske dokumenter
+    (normalize_document). add returnerer raden, slik at kallere kan
+    måle størrelsen underveis.
+    """
+
+    def __init__(self):
+        self.prefixes = _Table([""])
+        self.values = {f: _Table() for f in DICT_FIELDS}
+        self.rows = []
+
+    def _url(self, url):
+        prefix = url_prefix(url)
+        return self.prefixes.add(prefix), url[len(prefix):]
+
+    def _encode_row(self, doc):
+        link_prefix, link_rest = self._url(doc["journal_link"])
+        filer = []
+        for f in doc["filer"]:
+            p, rest = self._url(f["url"])
+            filer.append([f["tekst"], p, rest])
+        return [
+            doc["tittel"],
+            doc["dato_iso"],
+            doc["dokumentID"],
+            self.values["dokumenttype"].add(doc["dokumenttype"]),
+            self.values["avsender_mottaker"].add(doc["avsender_mottaker"]),
+            link_prefix,
+            link_rest,
+            filer,
+            self.values["status"].add(doc["status"]),
+            doc["hash"],
+        ]
+
+    def add(self, doc):
+        row = self._encode_row(doc)
+        self.rows.append(row)
+        return row
+
+    def header_bytes(self):
+        """Omtrentlig størrelse på alt unntatt radene."""
+        return 400 + self.prefixes.bytes + sum(t.bytes for t in self.values.values())
+
+    def payload(self):
+        return {
+            "format": COMPACT_FORMAT,
+            "version": COMPACT_VERSION,
+            "fields": ROW_FIELDS,
+            "prefixes": self.prefixes.values,
+            "values": {f: t.values for f, t in self.values.items()},
+            "rows": self.rows,
+        }
+
+
+def encode_documents(docs):
+    """Koder en liste kanoniske dokumenter til kompakt form."""
+    enc = CompactEncoder()
+    for d in docs:
+        enc.add(d)
+    return enc.payload()
+
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get("format") == COMPACT_FORMAT
+
+
+def decode_row(header, row):
+    """Ett kanonisk dokument fra en rad; header er filen (rows trengs ikke)."""
+    if header.get("version") != COMPACT_VERSION:
+        raise ValueError(f"Ukjent versjon {header.get('version')} av {COMPACT_FORMAT}")
+
+    prefixes = header["prefixes"]
+    values = header["values"]
+    tittel, iso, dokid, t, am, lp, lrest, filer, st, h = row
+    return dict(zip(CANONICAL_FIELDS, (
+        tittel,
+        format_date(date.fromisoformat(iso)) if iso else "",
+        iso,
+        dokid,
+        values["dokumenttype"][t],
+        values["avsender_mottaker"][am],
+        prefixes[lp] + lrest,
+        [{"tekst": tekst, "url": prefixes[p] + rest} for tekst, p, rest in filer],
+        values["status"][st],
+        h,
+    )))
+
+
+def decode_documents(data):
+    """Motsatt av encode_documents: returnerer kanoniske dokumenter i rekkefølge."""
+    if data.get("version") != COMPACT_VERSION:
+        raise ValueError(f"Ukjent versjon {data.get('version')} av {COMPACT_FORMAT}")
+    return [decode_row(data, row) for row in data["rows"]]
+
+
+def documents_from_json(data):
+    """Dokumentlisten i innlest JSON, enten den er kompakt eller en vanlig liste."""
+    if is_compact(data):
+        return decode_documents(data)
+    if isinstance(data, list):
+        return data
+    raise ValueError("inneholder verken en liste eller kompakt format")
+
+
+def read_documents(path):
+    """Leser en shard- eller archive-fil i begge formater."""
+    return documents_from_json(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def read_canonical_documents(path):
+    """
+    Som read_documents, men vanlige lister normaliseres. Kompakte filer
+    inneholder allerede kanoniske dokumenter og normaliseres ikke på nytt.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if is_compact(data):
+        return decode_documents(data)
+    return normalize_documents(documents_from_json(data))
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_row(row):
+    """En rad serialisert slik den står i filen (uten skilletegn)."""
+    return _dumps(row)
+
+
+def payload_bytes(payload, encoded_rows=None):
+    """
+    Serialiserer en kompakt fil med "rows" til slutt. Returnerer
+    (bytes, rows_start, lengths): radene ligger etter hverandre fra
+    rows_start, skilt med ett komma, og lengths er bytes per rad.
+    Resultatet er identisk med json.dumps av hele payloaden.
+    encoded_rows er radene ferdig serialisert (encode_row), hvis kalleren
+    allerede har dem.
+    """
+    header = {k: v for k, v in payload.items() if k != "rows"}
+    head = _dumps(header)[:-1] + b',"rows":['
+    rows = encoded_rows if encoded_rows is not None else [_dumps(row) for row in payload["rows"]]
+    return head + b",".join(rows) + b"]}", len(head), [len(r) for r in rows]
+
+
+def payload_lines(payload):
+    """
+    Linjeformatet for nettsiden: første linje er headeren (alt unntatt
+    "rows"), deretter én rad per linje. Kan parses linje for linje mens
+    filen lastes ned (web/java/compact.js).
+    """
+    header = {k: v for k, v in payload.items() if k != "rows"}
+    return b"".join(_dumps(line) + b"\n" for line in [header, *payload["rows"]])
+
+
+def write_payload(path, payload):
+    """Skriver en kompakt fil atomisk uten innrykk. Returnerer antall bytes."""
+    data, _, _ = payload_bytes(payload)
+    write_bytes(path, data)
+    return len(data)
+
+
+def write_bytes(path, data):
+    """Atomisk skriving av ferdigserialiserte bytes."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def write_compact(path, docs):
+    """Skriver kanoniske dokumenter kompakt og atomisk. Returnerer antall bytes."""
+    return write_payload(path, encode_documents(docs))
@@ -7,3 +7,22 @@ def compute_concurrency(min_workers=2, max_workers=6):
     """
     cpu = os.cpu_count() or 2
     return min(max_workers, max(min_workers, cpu - 1))
+
+
+def page_range(start_page, max_pages):
+    """Alle sider fra start_page til max_pages (begge inkludert), i config-rekkefølge."""
+    step = 1 if max_pages >= start_page else -1
+    return list(range(start_page, max_pages + step, step))
+
+
+def partition_pages(pages, index, count):
+    """
+    Deler en sideliste i count sammenhengende biter og returnerer bit nr.
+    index (0-basert). Bitene er like store ±1 og dekker hele listen.
+    """
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Ugyldig partisjon {index}/{count}")
+    size, rest = divmod(len(pages), count)
+    start = index * size + min(index, rest)
+    end = start + size + (1 if index < rest else 0)
+    return pages[start:end]
@@ -0,0 +1,94 @@
+import time
+
+# Reserve til å skrive shards, feilede sider og resume-markør etter stopp
+DEFAULT_FLUSH_RESERVE = 120.0
+
+# Antatt varighet per enhet før første måling (sekunder)
+DEFAULT_INITIAL_ESTIMATE = 30.0
+
+# Vekt på siste måling i glidende snitt (EWMA)
+EWMA_ALPHA = 0.3
+
+# Ny enhet planlegges kun hvis det er tid til estimat * SAFETY_FACTOR
+SAFETY_FACTOR = 1.5
+
+
+class DeadlinePlanner:
+    """
+    Holder styr på et tidsbudsjett for en kjøring.
+
+    Varighet per enhet (listeside, detaljside …) måles fortløpende og glattes
+    med EWMA. can_schedule() sier nei når det ikke lenger er tid til å
+    fullføre én enhet til før fristen minus flush-reserven; svaret er
+    deretter nei resten av kjøringen. Uten budsjett sier den alltid ja.
+    """
+
+    def __init__(
+        self,
+        budget_seconds=None,
+        flush_reserve=DEFAULT_FLUSH_RESERVE,
+        initial_estimate=DEFAULT_INITIAL_ESTIMATE,
+        alpha=EWMA_ALPHA,
+        clock=time.monotonic,
+    ):
+        self.budget = float(budget_seconds) if budget_seconds else None
+        self.flush_reserve = flush_reserve
+        self.initial_estimate = initial_estimate
+        self.alpha = alpha
+        self.clock = clock
+        self.started = clock()
+        self.estimates = {}
+        self.samples = {}
+        self.stopped = False
+
+    @classmethod
+    def from_config(cls, cfg, budget_seconds=None):
+        """Budsjett fra CLI har forrang foran time_budget_seconds i config."""
+        budget = budget_seconds or cfg.get("time_budget_seconds")
+        reserve = float(cfg.get("flush_reserve_seconds", DEFAULT_FLUSH_RESERVE))
+        return cls(budget, flush_reserve=reserve)
+
+    @property
+    def enabled(self):
+        return self.budget is not None
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def time_left(self):
+        """Sekunder igjen til arbeid (før flush-reserven), eller None uten budsjett."""
+        if not self.enabled:
+            return None
+        return max(0.0, self.budget - self.elapsed() - self.flush_reserve)
+
+    def record(self, seconds, kind="page"):
+        """Registrerer målt varighet for én fullført enhet."""
+        prev = self.estimates.get(kind)
+        self.estimates[kind] = seconds if prev is None else self.alpha * seconds + (1 - self.alpha) * prev
+        self.samples[kind] = self.samples.get(kind, 0) + 1
+
+    def estimate(self, kind="page"):
+        return self.estimates.get(kind, self.initial_estimate)
+
+    def can_schedule(self, kind="page"):
+        """True hvis én enhet til rekker å bli ferdig før fristen."""
+        if not self.enabled:
+            return True
+        if self.stopped:
+            return False
+        if self.time_left() < self.estimate(kind) * SAFETY_FACTOR:
+            self.stopped = True
+            print(
+                f"[WARN] Tidsbudsjett: stopper planlegging etter {self.elapsed():.0f} s "
+                f"({self.time_left():.0f} s igjen, estimat {self.estimate(kind):.1f} s per {kind})"
+            )
+            return False
+        return True
+
+    def report(self):
+        """Skriver hvor mye av budsjettet som ble brukt."""
+        if self.enabled:
+            print(
+                f"[INFO] Tidsbudsjett: {self.elapsed():.0f} s brukt av {self.budget:.0f} s"
+                f"{' (stoppet tidlig)' if self.stopped else ''}"
+            )
@@ -0,0 +1,172 @@
+"""
+Deltastrøm per kjøring (data/deltas/).
+
+Hver kjøring som endrer datasettet skriver én deltafil med løpenummer:
+
+  delta_<seq>.json  – { seq, tidspunkt, added, updated, removed }
+  manifest.json     – latest_seq og de siste deltaene (seq, fil, antall, bytes)
+
+added og updated er kanoniske dokumenter, removed er dokumentID-er.
+merge_and_save_sharded registrerer endringene etter hver lagring, så
+checkpoints fra skrivetråden havner i samme delta. Løpenummeret tildeles
+ved første endring i prosessen og er alltid latest_seq + 1.
+
+En klient som har datasettet per seq N henter deltaene med seq > N og
+bruker dem i rekkefølge. Er N eldre enn det eldste deltaet i manifestet,
+må hele datasettet lastes på nytt (shards / data/publish).
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+DELTA_FORMAT = "postliste-delta"
+DELTA_VERSION = 1
+MANIFEST_FORMAT = "postliste-deltas"
+MANIFEST_VERSION = 1
+
+# Antall deltaer som beholdes; eldre klienter laster alt på nytt
+KEEP_DELTAS = 60
+
+# Deltaet for kjøringen i denne prosessen
+_run = None
+
+
+def deltas_dir(data_dir):
+    return Path(data_dir) / "deltas"
+
+
+def manifest_path(data_dir):
+    return deltas_dir(data_dir) / "manifest.json"
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+def load_manifest(data_dir):
+    path = manifest_path(data_dir)
+    if path.exists():
+        try:
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+            if manifest.get("format") == MANIFEST_FORMAT:
+                return manifest
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese {path}: {e}")
+    return {"format": MANIFEST_FORMAT, "version": MANIFEST_VERSION, "latest_seq": 0, "deltas": []}
+
+
+def latest_seq(data_dir):
+    return load_manifest(data_dir)["latest_seq"]
+
+
+def _current_run(data_dir):
+    global _run
+    data_dir = Path(data_dir)
+    if _run is None or _run["data_dir"] != data_dir:
+        _run = {
+            "data_dir": data_dir,
+            "seq": latest_seq(data_dir) + 1,
+            "tidspunkt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "added": {},
+            "updated": {},
+            "removed": set(),
+        }
+    return _run
+
+
+def record_changes(data_dir, existing, docs):
+    """
+    Registrerer normaliserte dokumenter som er nye eller har ny hash i
+    forhold til existing ({ dokumentID: dokument }), og skriver deltaet
+    for kjøringen. Returnerer antall endrede dokumenter.
+    """
+    changed = [d for d in docs if (existing.get(d["dokumentID"]) or {}).get("hash") != d["hash"]]
+    if not changed:
+        return 0
+
+    run = _current_run(data_dir)
+    for d in changed:
+        dokid = d["dokumentID"]
+        run["removed"].discard(dokid)
+        # Nytt i denne kjøringen forblir "added" selv om det endres igjen
+        if dokid in existing and dokid not in run["added"]:
+            run["updated"][dokid] = d
+        else:
+            run["added"][dokid] = d
+    _save_run(run)
+    return len(changed)
+
+
+def record_removed(data_dir, ids):
+    """Registrerer dokumentID-er som er fjernet fra datasettet."""
+    ids = list(ids)
+    if not ids:
+        return
+    run = _current_run(data_dir)
+    for dokid in ids:
+        run["updated"].pop(dokid, None)
+        if run["added"].pop(dokid, None) is None:
+            run["removed"].add(dokid)
+    _save_run(run)
+
+
+def _save_run(run):
+    data_dir = run["data_dir"]
+    name = f"delta_{run['seq']:06d}.json"
+    path = deltas_dir(data_dir) / name
+    delta = {
+        "format": DELTA_FORMAT,
+        "version": DELTA_VERSION,
+        "seq": run["seq"],
+        "tidspunkt": run["tidspunkt"],
+        "added": list(run["added"].values()),
+        "updated": list(run["updated"].values()),
+        "removed": sorted(run["removed"]),
+    }
+    _write_json(path, delta)
+
+    manifest = load_manifest(data_dir)
+    entries = [e for e in manifest["deltas"] if e["seq"] != run["seq"]]
+    entries.append({
+        "seq": run["seq"],
+        "file": name,
+        "tidspunkt": run["tidspunkt"],
+        "added": len(delta["added"]),
+        "updated": len(delta["updated"]),
+        "removed": len(delta["removed"]),
+        "bytes": path.stat().st_size,
+    })
+    entries.sort(key=lambda e: e["seq"])
+
+    # Eldste deltaer ut
+    for old in entries[:-KEEP_DELTAS]:
+        (deltas_dir(data_dir) / old["file"]).unlink(missing_ok=True)
+    manifest["deltas"] = entries[-KEEP_DELTAS:]
+    manifest["latest_seq"] = max(manifest["latest_seq"], run["seq"])
+    _write_json(manifest_path(data_dir), manifest)
+    print(
+        f"[INFO] Delta {run['seq']}: {len(delta['added'])} nye, {len(delta['updated'])} endrede, "
+        f"{len(delta['removed'])} fjernede dokumenter"
+    )
+
+
+def iter_deltas(data_dir, since_seq):
+    """Deltaene med seq > since_seq i rekkefølge. Kaster ValueError hvis det mangler deltaer."""
+    manifest = load_manifest(data_dir)
+    entries = [e for e in manifest["deltas"] if e["seq"] > since_seq]
+    if entries and entries[0]["seq"] != since_seq + 1:
+        raise ValueError(f"Deltaene etter seq {since_seq} er ikke lenger tilgjengelige; last hele datasettet")
+    for e in entries:
+        yield json.loads((deltas_dir(data_dir) / e["file"]).read_text(encoding="utf-8"))
+
+
+def apply_delta(docs, delta):
+    """Bruker ett delta på { dokumentID: dokument } (endres på stedet)."""
+    for d in delta["added"] + delta["updated"]:
+        docs[d["dokumentID"]] = d
+    for dokid in delta["removed"]:
+        docs.pop(dokid, None)
+    return docs
@@ -0,0 +1,188 @@
+import hashlib
+import json
+
+from utils_dates import parse_date_from_page, format_date
+
+# Kanonisk skjema for én oppføring i postlisten. Alle scrapere og verktøy
+# skriver dokumenter med nøyaktig disse feltene, i denne rekkefølgen.
+CANONICAL_FIELDS = (
+    "tittel",
+    "dato",
+    "dato_iso",
+    "dokumentID",
+    "dokumenttype",
+    "avsender_mottaker",
+    "journal_link",
+    "filer",
+    "status",
+    "hash",
+)
+
+# Feltene som inngår i innholds-hashen (alt unntatt hash selv)
+HASHED_FIELDS = CANONICAL_FIELDS[:-1]
+
+# Feltene som er synlige i listevisningen (uten å åpne detaljsiden)
+TEASER_FIELDS = (
+    "dokumentID",
+    "tittel",
+    "dato_iso",
+    "dokumenttype",
+    "avsender_mottaker",
+    "journal_link",
+)
+
+# Eldre/alternative feltnavn → kanonisk feltnavn
+FIELD_ALIASES = {
+    "detalj_link": "journal_link",
+}
+
+STATUS_PUBLISERT = "Publisert"
+STATUS_INNSYN = "Må bes om innsyn"
+
+BASE_HOST = "https://www.strand.kommune.no"
+
+
+def _clean_str(v):
+    if v is None:
+        return ""
+    return str(v).strip()
+
+
+def absolute_url(href):
+    """Gjør relative lenker fra nettsiden absolutte."""
+    href = _clean_str(href)
+    if href and not href.startswith("http"):
+        return BASE_HOST + href
+    return href
+
+
+def normalize_files(filer):
+    """Normaliserer fil-listen til [{tekst, url}] uten duplikate URL-er."""
+    result = []
+    seen = set()
+    for f in filer or []:
+        if not isinstance(f, dict):
+            continue
+        url = absolute_url(f.get("url"))
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        result.append({"tekst": _clean_str(f.get("tekst")), "url": url})
+    return result
+
+
+def _hash_values(values):
+    payload = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def content_hash(doc):
+    """
+    Stabil hash over dokumentets kanoniske innhold. Dokumentet må allerede
+    være normalisert; feltrekkefølgen er fast via HASHED_FIELDS.
+    """
+    return _hash_values([doc.get(k) for k in HASHED_FIELDS])
+
+
+def teaser_hash(doc):
+    """Hash over feltene som vises i listevisningen."""
+    return _hash_values([doc.get(k) for k in TEASER_FIELDS])
+
+
+def fingerprint_page(teasers):
+    """Fingeravtrykk for en listeside: dokumentIDer og teaser-felter i rekkefølge."""
+    return _hash_values([teaser_hash(t) for t in teasers])
+
+
+def normalize_document(doc):
+    """
+    Returnerer en ny dict i kanonisk form:
+      - alias-felter (detalj_link) mappes til journal_link
+      - scraper-spesifikke felter (side osv.) fjernes
+      - dato og dato_iso utledes fra hverandre
+      - status utledes fra filer hvis den mangler
+      - hash beregnes på nytt over det kanoniske innholdet
+    Returnerer None hvis dokumentet mangler dokumentID.
+    """
+    if not isinstance(doc, dict):
+        return None
+
+    src = dict(doc)
+    for alias, target in FIELD_ALIASES.items():
+        if alias in src:
+            value = src.pop(alias)
+            if not src.get(target):
+                src[target] = value
+
+    dokid = _clean_str(src.get("dokumentID"))
+    if not dokid:
+        return None
+
+    parsed = parse_date_from_page(src.get("dato_iso")) or parse_date_from_page(
+        _clean_str(src.get("dato"))
+    )
+
+    filer = normalize_files(src.get("filer"))
+    status = _clean_str(src.get("status")) or (STATUS_PUBLISERT if filer else STATUS_INNSYN)
+
+    normalized = {
+        "tittel": _clean_str(src.get("tittel")),
+        "dato": format_date(parsed),
+        "dato_iso": parsed.isoformat() if parsed else None,
+        "dokumentID": dokid,
+        "dokumenttype": _clean_str(src.get("dokumenttype")),
+        "avsender_mottaker": _clean_str(src.get("avsender_mottaker")),
+        "journal_link": absolute_url(src.get("journal_link")),
+        "filer": filer,
+        "status": status,
+    }
+    normalized["hash"] = content_hash(normalized)
+    return normalized
+
+
+def normalize_documents(docs):
+    """Normaliserer en liste og hopper over ugyldige oppføringer."""
+    result = []
+    for d in docs or []:
+        nd = normalize_document(d)
+        if nd is not None:
+            result.append(nd)
+    return result
+
+
+def build_document(tittel, parsed_date, dokid, doktype, avsender, mottaker, journal_link, filer):
+    """Bygger et kanonisk dokument fra feltene som leses ut av en teaser."""
+    am = f"Avsender: {avsender}" if avsender else (f"Mottaker: {mottaker}" if mottaker else "")
+    return normalize_document({
+        "tittel": tittel,
+        "dato": format_date(parsed_date),
+        "dato_iso": parsed_date.isoformat() if parsed_date else None,
+        "dokumentID": dokid,
+        "dokumenttype": doktype,
+        "avsender_mottaker": am,
+        "journal_link": journal_link,
+        "filer": filer,
+        "status": "",
+    })
+
+
+def with_files(doc, filer):
+    """Returnerer dokumentet med ny fil-liste; status utledes på nytt."""
+    return normalize_document(dict(doc, filer=filer, status=""))
+
+
+def parse_dokument_id(dokid):
+    """Deler "2013/1234" i (2013, 1234). Returnerer None for andre formater."""
+    year, sep, seq = _clean_str(dokid).partition("/")
+    if not sep or not year.isdigit() or not seq.isdigit():
+        return None
+    return int(year), int(seq)
+
+
+def archive_sort_key(doc):
+    """
+    Deterministisk sorteringsnøkkel for arkivfiler (brukes med reverse=True):
+    nyeste dato først, deretter høyeste dokumentID innen samme dato.
+    """
+    parsed = parse_dokument_id(doc.get("dokumentID")) or (0, 0)
+    return (doc.get("dato_iso") or "", parsed, doc.get("dokumentID") or "")
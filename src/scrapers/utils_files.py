@@ -1,20 +1,88 @@
 import os
 import json
+import hashlib
+from collections import defaultdict
 from datetime import datetime, date
+from itertools import accumulate
 from pathlib import Path
 
+from utils_documents import normalize_document, normalize_documents, parse_dokument_id
+from utils_deltas import record_changes
+from utils_store import STORE_ENV, SqliteStore
+from utils_compact import (
+    CompactEncoder,
+    decode_documents,
+    is_compact,
+    encode_row,
+    payload_bytes,
+    read_canonical_documents,
+    write_bytes,
+    write_compact,
+)
+from utils_offsets import ShardReader, build_offsets, load_offsets, offsets_path, save_offsets
+
 # Rot for datafiler
 DATA_DIR = Path("../../data")
 
 # Endringslogg
 CHANGES_FILE = DATA_DIR / "changes.json"
 
+# Fingeravtrykk for listesider (update-modus)
+PAGE_FINGERPRINTS_FILE = DATA_DIR / "page_fingerprints.json"
+
+# Datoer og IDer sett på hver listeside (brukes av gap_analyzer.py)
+PAGE_MAP_FILE = DATA_DIR / "page_map.json"
+
+# Sist sjekket-dato per dokument for revisit-planleggeren
+REVISIT_STATE_FILE = DATA_DIR / "revisit_state.json"
+
+# Delresultater fra partisjonert fullscrape (slås sammen med merge_partials.py)
+PARTIALS_DIR = DATA_DIR / "partials"
+PARTIAL_FORMAT = "postliste-partial"
+PARTIAL_VERSION = 1
+
+# Resume-markører for kjøringer som stoppes av tidsbudsjettet
+CURSOR_DIR = DATA_DIR / "cursors"
+
+# Kompakte ID-sett per år (data/archive/ids_<year>.json)
+ARCHIVE_IDS_FORMAT = "postliste-ids"
+ARCHIVE_IDS_VERSION = 1
+
+# SQLite-lagring (POSTLISTE_STORE=sqlite), se utils_store.py
+STORE_DB_FILE = DATA_DIR / "postliste.db"
+_store = None
+
+# Åpne ShardReadere (utils_offsets): { sti: ((størrelse, mtime), reader) }
+_shard_reader_cache = {}
+
 # Sharding-konfig
 SHARD_PREFIX = "postliste_"
 SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
 SHARD_MAX_BYTES = 50 * 1024 * 1024  # 50 MB margin mot GitHubs 100 MB-grense
 
 
+def set_data_dir(path):
+    """
+    Flytter alle datafiler til en annen rot (f.eks. et syntetisk korpus
+    for benchmarks). Stier som er avledet av DATA_DIR oppdateres også.
+    """
+    global DATA_DIR, CHANGES_FILE, PAGE_FINGERPRINTS_FILE, PAGE_MAP_FILE, REVISIT_STATE_FILE
+    global PARTIALS_DIR, CURSOR_DIR, SHARD_INDEX_FILE, STORE_DB_FILE, _store
+
+    DATA_DIR = Path(path)
+    CHANGES_FILE = DATA_DIR / "changes.json"
+    PAGE_FINGERPRINTS_FILE = DATA_DIR / "page_fingerprints.json"
+    PAGE_MAP_FILE = DATA_DIR / "page_map.json"
+    REVISIT_STATE_FILE = DATA_DIR / "revisit_state.json"
+    PARTIALS_DIR = DATA_DIR / "partials"
+    CURSOR_DIR = DATA_DIR / "cursors"
+    SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
+    STORE_DB_FILE = DATA_DIR / "postliste.db"
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
 def ensure_directories():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -37,13 +105,39 @@ def load_config(path):
     return json.loads(Path(path).read_text(encoding="utf-8"))
 
 
-def atomic_write(path, data):
+def fsync_paths(paths):
+    """fsync av filer og katalogene de ligger i (etter atomisk replace)."""
+    dirs = set()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        dirs.add(os.path.dirname(os.path.abspath(path)))
+    for d in dirs:
+        try:
+            fd = os.open(d, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def atomic_write(path, data, indent=2):
     """Skriver JSON atomisk for å unngå korrupte filer."""
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
+    separators = None if indent is not None else (",", ":")
     tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=indent, separators=separators), encoding="utf-8")
     tmp.replace(path)
 
 
@@ -67,32 +161,207 @@ def load_archive_year(year):
 
     for f in archive_files:
         try:
-            with f.open("r", encoding="utf-8") as infile:
-                docs = json.load(infile)
-                for d in docs:
-                    if not isinstance(d, dict):
-                        continue
-                    dokid = d.get("dokumentID")
-                    if dokid:
-                        existing[dokid] = d
+            for d in read_canonical_documents(f):
+                existing[d["dokumentID"]] = d
         except Exception as e:
             print(f"[WARN] Klarte ikke å lese {f}: {e}")
 
     print(f"[INFO] Totalt {len(existing)} dokumenter funnet i archive for {year}")
     return existing
 
-def find_missing_docs(scraped_docs, archive_dict):
+def find_missing_docs(scraped_docs, archive_ids):
     """
     Returnerer liste over dokumenter som finnes i scraped_docs,
-    men ikke i archive_dict.
+    men ikke i archive_ids (sett av dokumentIDer eller dict fra
+    load_archive_year).
     """
     missing = []
     for d in scraped_docs:
         did = d.get("dokumentID")
-        if did and did not in archive_dict:
+        if did and did not in archive_ids:
             missing.append(d)
     return missing
 
+
+# ------------------------------------------------------------------
+#  Kompakte ID-sett for archive
+# ------------------------------------------------------------------
+
+def archive_ids_path(year):
+    return DATA_DIR / "archive" / f"ids_{year}.json"
+
+
+def _archive_file_year(path):
+    """Året i et archive-filnavn (postliste_<year>_<etikett>.json), ellers None."""
+    parts = Path(path).stem.split("_")
+    if len(parts) >= 3 and parts[0] == "postliste" and parts[1].isdigit():
+        return int(parts[1])
+    return None
+
+
+def _file_signature(path):
+    """Størrelse og SHA-1 av filinnholdet (krever ikke JSON-parsing)."""
+    data = Path(path).read_bytes()
+    return f"{len(data)}:{hashlib.sha1(data).hexdigest()}"
+
+
+def _archive_mtimes_path():
+    # Lokal cache i data/offsets/, som ikke committes (mtime endres ved checkout)
+    return DATA_DIR / "offsets" / "archive_mtimes.json"
+
+
+def _load_archive_mtimes():
+    """{ filnavn: { "size", "mtime_ns", "signature" } } fra den lokale cachen."""
+    path = _archive_mtimes_path()
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _archive_signature(path, mtimes):
+    """
+    Signaturen til en archive-fil. Som load_offsets: har filen samme
+    størrelse og mtime som i den lokale cachen, brukes signaturen derfra;
+    ellers regnes SHA-1 ut og cachen (mtimes) oppdateres.
+    """
+    path = Path(path)
+    stat = path.stat()
+    hit = mtimes.get(path.name)
+    if hit and hit.get("size") == stat.st_size and hit.get("mtime_ns") == stat.st_mtime_ns:
+        return hit["signature"]
+    signature = _file_signature(path)
+    mtimes[path.name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "signature": signature}
+    return signature
+
+
+def encode_ids(ids):
+    """
+    Komprimerer dokumentIDer til
+      { "seq": { "<år>": [første, delta, delta, …] }, "other": [...] }
+    Løpenumrene per år sorteres og lagres som differanser. IDer som ikke
+    er på formen <år>/<løpenummer> legges i "other".
+    """
+    by_year = defaultdict(set)
+    other = set()
+    for did in ids:
+        parsed = parse_dokument_id(did)
+        if parsed and f"{parsed[0]}/{parsed[1]}" == did:
+            by_year[parsed[0]].add(parsed[1])
+        else:
+            other.add(did)
+
+    seq = {}
+    for year, numbers in sorted(by_year.items()):
+        numbers = sorted(numbers)
+        seq[str(year)] = [numbers[0]] + [b - a for a, b in zip(numbers, numbers[1:])]
+    return {"seq": seq, "other": sorted(other)}
+
+
+def decode_ids(encoded):
+    """Motsatt av encode_ids: returnerer et sett av dokumentIDer."""
+    ids = set(encoded.get("other") or [])
+    for year, deltas in (encoded.get("seq") or {}).items():
+        ids.update(f"{year}/{n}" for n in accumulate(deltas))
+    return ids
+
+
+def _read_archive_ids(year):
+    """{ filnavn: { "signature", "seq", "other" } } fra ids_<year>.json."""
+    path = archive_ids_path(year)
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        print(f"[WARN] Klarte ikke å lese {path}: {e}")
+        return {}
+    if data.get("format") != ARCHIVE_IDS_FORMAT or data.get("version") != ARCHIVE_IDS_VERSION:
+        print(f"[WARN] Ukjent format i {path}; bygger ID-settet på nytt.")
+        return {}
+    return data.get("files") or {}
+
+
+def _save_archive_ids(year, files):
+    atomic_write(archive_ids_path(year), {
+        "format": ARCHIVE_IDS_FORMAT,
+        "version": ARCHIVE_IDS_VERSION,
+        "year": year,
+        "files": dict(sorted(files.items())),
+    }, indent=None)
+
+
+def load_archive_ids(year):
+    """
+    Returnerer settet av dokumentIDer i data/archive/postliste_<year>_*.json
+    uten å lese selve archive-filene når ids_<year>.json er oppdatert.
+
+    Hver archive-fil har en signatur (størrelse + SHA-1) i ID-filen. Filer
+    som er nye eller endret siden (f.eks. kopiert inn av en workflow) leses
+    på nytt, og ID-filen oppdateres. Filene hashes bare når størrelse eller
+    mtime avviker fra den lokale cachen i data/offsets/.
+    """
+    archive_files = sorted((DATA_DIR / "archive").glob(f"postliste_{year}_*.json"))
+    cached = _read_archive_ids(year)
+    mtimes = _load_archive_mtimes()
+    known_mtimes = json.dumps(mtimes, sort_keys=True)
+    files = {}
+    changed = False
+
+    for f in archive_files:
+        signature = _archive_signature(f, mtimes)
+        entry = cached.get(f.name)
+        if entry and entry.get("signature") == signature:
+            files[f.name] = entry
+            continue
+
+        print(f"[INFO] Oppdaterer ID-sett fra {f.name}")
+        try:
+            docs = read_canonical_documents(f)
+        except Exception as e:
+            print(f"[WARN] Klarte ikke å lese {f}: {e}")
+            continue
+        files[f.name] = {"signature": signature, **encode_ids(d["dokumentID"] for d in docs)}
+        changed = True
+
+    if changed or files.keys() != cached.keys():
+        _save_archive_ids(year, files)
+    if json.dumps(mtimes, sort_keys=True) != known_mtimes:
+        atomic_write(_archive_mtimes_path(), mtimes, indent=None)
+
+    ids = set()
+    for entry in files.values():
+        ids |= decode_ids(entry)
+
+    print(f"[INFO] {len(ids)} dokumentIDer i archive for {year} ({archive_ids_path(year).name})")
+    return ids
+
+
+def write_archive_file(path, docs):
+    """
+    Skriver en archive-fil i kompakt format (utils_compact) og oppdaterer
+    ID-settet for året, slik at load_archive_ids ikke trenger å lese
+    filen på nytt.
+    """
+    path = Path(path)
+    docs = normalize_documents(docs)
+    write_compact(path, docs)
+
+    year = _archive_file_year(path)
+    if year is None:
+        return
+    files = _read_archive_ids(year)
+    mtimes = _load_archive_mtimes()
+    files[path.name] = {
+        "signature": _archive_signature(path, mtimes),
+        **encode_ids(d["dokumentID"] for d in docs),
+    }
+    _save_archive_ids(year, files)
+    atomic_write(_archive_mtimes_path(), mtimes, indent=None)
+
 def append_missing(year, new_docs):
     """
     Append'er nye manglende dokumenter til missing_<year>.json
@@ -123,28 +392,27 @@ def append_missing(year, new_docs):
 
     merged_by_id = {}
 
-    for d in existing_docs:
-        if isinstance(d, dict):
-            did = d.get("dokumentID")
-            if did:
-                merged_by_id[did] = d
+    for d in normalize_documents(existing_docs):
+        merged_by_id[d["dokumentID"]] = d
 
-    for d in new_docs:
-        if isinstance(d, dict):
-            did = d.get("dokumentID")
-            if did:
-                merged_by_id[did] = d
+    for d in normalize_documents(new_docs):
+        merged_by_id[d["dokumentID"]] = d
 
     final_list = list(merged_by_id.values())
     atomic_write(missing_path, final_list)
     print(f"[INFO] Lagret/oppdatert missing_{year}.json med totalt {len(final_list)} dokumenter.")
 
 
-def save_failed_pages(year, failed_pages):
+def save_failed_pages(year, failed_pages, retried_pages=None):
     """
     Overskriver failed_pages_<year>.json med dagens liste
     over feilede sider.
 
+    Med retried_pages (kjøringer med en eksplisitt sideliste) flettes
+    listen inn i den eksisterende filen: sider som ble prøvd på nytt
+    fjernes, og nye feil legges til. Feilede sider utenfor sidelisten
+    beholdes.
+
     Resultat:
       data/archive/failed_pages_<year>.json
       gjenspeiler TIL ENHVER TID gjenværende feilede sider.
@@ -153,10 +421,62 @@ def save_failed_pages(year, failed_pages):
     archive_dir.mkdir(parents=True, exist_ok=True)
 
     failed_path = archive_dir / f"failed_pages_{year}.json"
+    if retried_pages is not None and failed_path.exists():
+        try:
+            existing = json.loads(failed_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese {failed_path}: {e}")
+            existing = []
+        failed_pages = sorted((set(existing) - set(retried_pages)) | set(failed_pages))
     atomic_write(failed_path, failed_pages)
     print(f"[INFO] Lagret failed_pages_{year}.json med {len(failed_pages)} sider.")
 
 
+def partial_path(meta):
+    """data/partials/partial_<start>_<end>_p<i>of<n>.json for et delresultat."""
+    part = meta["partition"]
+    start = meta.get("start_date") or "alle"
+    end = meta.get("end_date") or start
+    return PARTIALS_DIR / f"partial_{start}_{end}_p{part['index']}of{part['count']}.json"
+
+
+def save_partial(meta, docs):
+    """
+    Skriver et selvbeskrivende delresultat til data/partials/:
+      { "format", "version", <meta…>, "documents": [...] }
+    meta beskriver partisjon, sider, dato-intervall og feilede sider.
+    Returnerer stien til filen.
+    """
+    path = partial_path(meta)
+
+    payload = {"format": PARTIAL_FORMAT, "version": PARTIAL_VERSION}
+    payload.update(meta)
+    payload["documents"] = normalize_documents(docs)
+
+    atomic_write(path, payload)
+    print(f"[INFO] Lagret delresultat {path} med {len(payload['documents'])} dokumenter.")
+    return path
+
+
+def load_partial(path):
+    """
+    Leser et delresultat. Returnerer (meta, dokumenter).
+    Rene dokumentlister (f.eks. postliste_filtered.json) og arkivfiler i
+    kompakt format godtas også og får tom meta.
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, list):
+        return {}, normalize_documents(data)
+    if is_compact(data):
+        return {}, decode_documents(data)
+    if not isinstance(data, dict) or data.get("format") != PARTIAL_FORMAT:
+        raise ValueError(f"{path} er ikke et delresultat")
+    if data.get("version") != PARTIAL_VERSION:
+        raise ValueError(f"{path} har ukjent versjon {data.get('version')}")
+    meta = {k: v for k, v in data.items() if k not in ("format", "version", "documents")}
+    return meta, normalize_documents(data.get("documents"))
+
+
 # ------------------------------------------------------------------
 #  Sharding: postliste_1.json, postliste_2.json, ...
 # ------------------------------------------------------------------
@@ -182,10 +502,20 @@ def _write_shard_index(paths):
 
 def load_all_postliste():
     """
-    Leser ALLE postliste_N.json og returnerer:
+    Leser ALLE postliste_N.json (eller SQLite-lagringen) og returnerer:
       - dict { dokumentID: oppføring }
       - og en flat liste
+    Alle oppføringer normaliseres til kanonisk skjema ved innlesing.
     """
+    store = get_store()
+    if store is not None:
+        docs = store.load_all()
+        return {d["dokumentID"]: d for d in docs}, docs
+
+    return _load_shards()
+
+
+def _load_shards():
     ensure_directories()
     shards = _list_shard_paths()
     merged = {}
@@ -196,27 +526,27 @@ def load_all_postliste():
 
     for path in shards:
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            if not isinstance(data, list):
-                continue
-            for d in data:
-                if not isinstance(d, dict):
-                    continue
-                did = d.get("dokumentID")
-                if not did:
-                    continue
-                merged[did] = d
-            all_list.extend(data)
+            docs = read_canonical_documents(path)
+            for d in docs:
+                merged[d["dokumentID"]] = d
+            all_list.extend(docs)
         except Exception as e:
             print(f"[WARN] Klarte ikke lese shard {path}: {e}")
 
     return merged, all_list
 
 
-def save_postliste_sharded(all_docs):
+def save_postliste_sharded(all_docs, normalized=False):
     """
     Tar en liste med dokumenter (allerede sortert nyest først)
-    og skriver dem ut til postliste_N.json-filer under DATA_DIR.
+    og skriver dem ut til postliste_N.json-filer under DATA_DIR
+    i kompakt format (utils_compact). normalized=True betyr at
+    dokumentene allerede er kanoniske og ikke normaliseres på nytt.
+
+    Størrelsen til hver shard summeres rad for rad, og hver rad
+    serialiseres bare én gang, så skrivingen er lineær i antall
+    dokumenter. Hver shard får en offset-tabell i data/offsets/
+    (utils_offsets) for direkte oppslag.
     """
     ensure_directories()
 
@@ -234,45 +564,159 @@ def save_postliste_sharded(all_docs):
                 continue
         return date.min
 
-    all_docs_sorted = sorted(all_docs, key=sort_key, reverse=True)
+    if normalized:
+        # Kanonisk dato_iso er ISO-streng eller None og sorterer likt som sort_key
+        all_docs_sorted = sorted(all_docs, key=lambda d: d["dato_iso"] or "", reverse=True)
+    else:
+        all_docs_sorted = sorted(normalize_documents(all_docs), key=sort_key, reverse=True)
 
     shards = []
-    current = []
-    current_index = 1
 
-    def current_path(idx):
-        return DATA_DIR / f"{SHARD_PREFIX}{idx}.json"
+    def write_shard(encoder, encoded):
+        path = DATA_DIR / f"{SHARD_PREFIX}{len(shards) + 1}.json"
+        data, rows_start, lengths = payload_bytes(encoder.payload(), encoded)
+        write_bytes(path, data)
+        save_offsets(path, build_offsets(path, data, rows_start, lengths, encoder.rows))
+        shards.append(path)
+        print(f"[INFO] Skrev shard {path} med {len(encoder.rows)} dokumenter.")
 
+    encoder = CompactEncoder()
+    encoded = []
+    size = 0
     for doc in all_docs_sorted:
-        current.append(doc)
-        serialized = json.dumps(current, ensure_ascii=False)
-        if len(serialized.encode("utf-8")) > SHARD_MAX_BYTES:
-            last = current.pop()
-            path = current_path(current_index)
-            atomic_write(path, current)
-            shards.append(path)
-            print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
-            current_index += 1
-            current = [last]
-
-    if current:
-        path = current_path(current_index)
-        atomic_write(path, current)
-        shards.append(path)
-        print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
+        row = encoder.add(doc)
+        encoded.append(encode_row(row))
+        size += len(encoded[-1]) + 1
+        if len(encoder.rows) > 1 and size + encoder.header_bytes() > SHARD_MAX_BYTES:
+            encoder.rows.pop()
+            encoded.pop()
+            write_shard(encoder, encoded)
+            # Raden kodes på nytt mot den nye shardens verdilister
+            encoder = CompactEncoder()
+            encoded = [encode_row(encoder.add(doc))]
+            size = len(encoded[0]) + 1
+
+    if encoder.rows:
+        write_shard(encoder, encoded)
 
     _write_shard_index(shards)
-    total = sum(len(json.loads(p.read_text(encoding="utf-8"))) for p in shards)
-    print(f"[INFO] Totalt {total} dokumenter fordelt på {len(shards)} shards.")
+    print(f"[INFO] Totalt {len(all_docs_sorted)} dokumenter fordelt på {len(shards)} shards.")
+
+
+def shard_readers():
+    """
+    (sti, ShardReader) for hver shard; reader er None for shards som ikke
+    kan indekseres og må leses helt. Readere gjenbrukes så lenge shardet
+    har samme størrelse og mtime.
+    """
+    for path in _list_shard_paths():
+        if not path.exists():
+            continue
+        stat = path.stat()
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = _shard_reader_cache.get(path)
+        if cached is None or cached[0] != key:
+            if cached is not None and cached[1] is not None:
+                cached[1].close()
+            offsets = load_offsets(path)
+            cached = _shard_reader_cache[path] = (key, ShardReader(path, offsets) if offsets else None)
+        yield path, cached[1]
+
+
+def iter_postliste():
+    """
+    Strømmer alle dokumentene shard for shard (nyeste først) uten å holde
+    hele datasettet i minnet; indekserte shards dekodes rad for rad.
+    """
+    store = get_store()
+    if store is not None:
+        yield from store.load_all()
+        return
+
+    for path, reader in shard_readers():
+        if reader is None:
+            yield from read_canonical_documents(path)
+        else:
+            yield from reader
+
+
+def load_document(dokid):
+    """
+    Ett dokument fra shardene (eller SQLite-lagringen), uten å lese hele
+    shards. Returnerer None hvis dokumentID ikke finnes.
+    """
+    store = get_store()
+    if store is not None:
+        return store.get(dokid)
+
+    for path, reader in shard_readers():
+        if reader is None:
+            doc = next((d for d in read_canonical_documents(path) if d["dokumentID"] == dokid), None)
+        elif dokid in reader:
+            doc = reader.get(dokid)
+        else:
+            continue
+        if doc is not None:
+            return doc
+    return None
+
+
+def load_postliste_range(start, end):
+    """
+    Dokumenter med dato i [start, end] (datetime.date), nyeste først.
+    Shards utenfor datoområdet hoppes over, og bare radene i utsnittet
+    dekodes.
+    """
+    store = get_store()
+    if store is not None:
+        return store.date_range(start, end)
+
+    docs = []
+    for path, reader in shard_readers():
+        if reader is None:
+            lo, hi = start.isoformat(), end.isoformat()
+            docs.extend(d for d in read_canonical_documents(path) if d["dato_iso"] and lo <= d["dato_iso"] <= hi)
+        elif reader.overlaps(start, end):
+            docs.extend(reader.date_range(start, end))
+    return docs
 
 
 def merge_and_save_sharded(existing_dict, new_docs):
-    """Slår sammen eksisterende dokumenter (dict) med nye dokumenter (liste)."""
+    """
+    Slår sammen eksisterende dokumenter (dict fra load_all_postliste, altså
+    kanoniske) med nye dokumenter (liste). Bare de nye normaliseres.
+    Med SQLite-lagring upsertes bare dokumentene som er nye eller endret.
+    Nye og endrede dokumenter registreres i kjøringens delta (utils_deltas).
+    """
+    store = get_store()
+    if store is not None:
+        changed = [d for d in new_docs if existing_dict.get(d.get("dokumentID")) is not d]
+        written = store.upsert(changed)
+        print(f"[INFO] Lagret {written} nye/endrede dokumenter i {STORE_DB_FILE}.")
+        record_changes(DATA_DIR, existing_dict, normalize_documents(changed))
+        return
+
     updated = dict(existing_dict)
+    normalized = []
     for d in new_docs:
-        updated[d["dokumentID"]] = d
+        nd = normalize_document(d)
+        if nd is not None:
+            updated[nd["dokumentID"]] = nd
+            normalized.append(nd)
 
-    save_postliste_sharded(list(updated.values()))
+    save_postliste_sharded(list(updated.values()), normalized=True)
+    record_changes(DATA_DIR, existing_dict, normalized)
+
+
+def sync_dataset():
+    """fsync av shards, index og offset-tabeller (eller SQLite-lagringen)."""
+    store = get_store()
+    if store is not None:
+        store.sync()
+        return
+
+    shards = [p for p in _list_shard_paths() if p.exists()]
+    fsync_paths(shards + [offsets_path(p) for p in shards] + [SHARD_INDEX_FILE])
 
 
 # ---------------------------------------------------------
@@ -280,7 +724,15 @@ def merge_and_save_sharded(existing_dict, new_docs):
 # ---------------------------------------------------------
 
 def load_changes():
-    """Laster tidligere endringslogg fra changes.json."""
+    """Laster tidligere endringslogg fra changes.json (eller SQLite-lagringen)."""
+    store = get_store()
+    if store is not None:
+        return store.load_changes()
+
+    return _load_changes_file()
+
+
+def _load_changes_file():
     path = CHANGES_FILE
     if not path.exists():
         return []
@@ -291,7 +743,17 @@ def load_changes():
 
 
 def save_changes(changes):
-    """Lagrer endringslogg til changes.json."""
+    """Lagrer endringslogg til changes.json (eller SQLite-lagringen)."""
+    store = get_store()
+    if store is not None:
+        written = store.save_changes(changes)
+        print(f"[INFO] Lagret {written} nye endringshendelser i {STORE_DB_FILE}")
+        return
+
+    _save_changes_file(changes)
+
+
+def _save_changes_file(changes):
     path = CHANGES_FILE
     path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -300,3 +762,165 @@ def save_changes(changes):
         encoding="utf-8"
     )
     print(f"[INFO] Lagret {len(changes)} endringshendelser i {CHANGES_FILE}")
+
+
+# ---------------------------------------------------------
+#   SQLite-lagring (utils_store.py)
+# ---------------------------------------------------------
+
+def store_backend():
+    """ "sqlite" eller "json" (standard), fra POSTLISTE_STORE."""
+    return "sqlite" if os.environ.get(STORE_ENV, "").lower() == "sqlite" else "json"
+
+
+def get_store():
+    """
+    SqliteStore for DATA_DIR når POSTLISTE_STORE=sqlite, ellers None.
+    En tom database fylles fra shards og changes.json første gang.
+    """
+    global _store
+    if store_backend() != "sqlite":
+        return None
+    if _store is None:
+        _store = open_store()
+    return _store
+
+
+def open_store():
+    store = SqliteStore(STORE_DB_FILE)
+    if store.is_empty():
+        import_into_store(store)
+    return store
+
+
+def import_into_store(store):
+    """Leser shards og changes.json inn i databasen (upsert, kan kjøres flere ganger)."""
+    _, docs = _load_shards()
+    changes = _load_changes_file()
+    if not docs and not changes:
+        return
+    written = store.upsert(docs)
+    store.save_changes(changes)
+    print(f"[INFO] Importerte {written} dokumenter og {len(changes)} endringshendelser til {store.path}.")
+
+
+def export_store(store):
+    """Skriver shards og changes.json fra databasen, slik nettsiden leser dem."""
+    save_postliste_sharded(store.load_all())
+    _save_changes_file(store.load_changes())
+
+
+# ---------------------------------------------------------
+#   Fingeravtrykk for listesider (update-modus)
+# ---------------------------------------------------------
+
+def load_page_fingerprints():
+    """
+    Laster fingeravtrykk fra forrige kjøring:
+      {"pages": {side: fingeravtrykk}, "documents": {dokumentID: teaser_hash}}
+    """
+    default = {"pages": {}, "documents": {}}
+    path = PAGE_FINGERPRINTS_FILE
+    if not path.exists():
+        return default
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            return default
+        return {
+            "pages": data.get("pages") or {},
+            "documents": data.get("documents") or {},
+        }
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return default
+
+
+def save_page_fingerprints(fingerprints):
+    """Lagrer fingeravtrykk for listesider til page_fingerprints.json."""
+    atomic_write(PAGE_FINGERPRINTS_FILE, fingerprints)
+    print(f"[INFO] Lagret fingeravtrykk for {len(fingerprints.get('pages', {}))} sider.")
+
+
+# ---------------------------------------------------------
+#   Sidekart (listeside -> datoer/IDer)
+# ---------------------------------------------------------
+
+def load_page_map():
+    """Laster sidekartet: {"pages": {side: {first_date, last_date, …}}}."""
+    default = {"pages": {}}
+    path = PAGE_MAP_FILE
+    if not path.exists():
+        return default
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            return default
+        return {"pages": data.get("pages") or {}}
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return default
+
+
+def save_page_map(page_map):
+    """Lagrer sidekartet til page_map.json."""
+    atomic_write(PAGE_MAP_FILE, page_map)
+    print(f"[INFO] Lagret sidekart for {len(page_map.get('pages', {}))} sider.")
+
+
+# ---------------------------------------------------------
+#   Revisit-tilstand (prioritert ny-sjekk av dokumenter)
+# ---------------------------------------------------------
+
+def load_revisit_state():
+    """Laster { dokumentID: sist sjekket (ISO-dato) } fra revisit_state.json."""
+    path = REVISIT_STATE_FILE
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return {}
+
+
+def save_revisit_state(state):
+    """Lagrer revisit-tilstanden."""
+    atomic_write(REVISIT_STATE_FILE, state)
+    print(f"[INFO] Lagret revisit-tilstand for {len(state)} dokumenter.")
+
+
+# ---------------------------------------------------------
+#   Resume-markører (tidsbudsjett)
+# ---------------------------------------------------------
+
+def _cursor_path(name):
+    return CURSOR_DIR / f"{name}.json"
+
+
+def load_resume_cursor(name):
+    """Laster resume-markøren med gitt navn, eller None hvis den ikke finnes."""
+    path = _cursor_path(name)
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else None
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return None
+
+
+def save_resume_cursor(name, cursor):
+    """Lagrer hvor en avbrutt kjøring skal fortsette."""
+    atomic_write(_cursor_path(name), cursor)
+    print(f"[INFO] Lagret resume-markør {_cursor_path(name)}")
+
+
+def clear_resume_cursor(name):
+    """Fjerner resume-markøren når kjøringen er fullført."""
+    path = _cursor_path(name)
+    if path.exists():
+        path.unlink()
+        print(f"[INFO] Fjernet resume-markør {path}")
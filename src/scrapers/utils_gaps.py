@@ -0,0 +1,219 @@
+import math
+import statistics
+from datetime import date, timedelta
+
+from utils_documents import parse_dokument_id
+
+# Et hull i løpenummerserien regnes som mistenkelig når det er større enn
+# både MIN_ID_GAP og GAP_FACTOR * 95-persentilen av vanlige hull i året.
+# Postlisten publiserer bare en brøkdel av journalpostene, så små hull er
+# normale.
+MIN_ID_GAP = 50
+GAP_FACTOR = 3.0
+
+# Perioder uten dokumenter lenger enn dette (dager) regnes også som hull
+DATE_GAP_DAYS = 14
+
+# Ekstra sider på hver side av et estimert sideintervall
+PAGE_MARGIN = 1
+
+# Standard sidestørrelse når sidekartet oversettes til sider
+DEFAULT_PER_PAGE = 100
+
+
+# ---------------------------------------------------------
+#   Sidekart: hvilke datoer og IDer som ble sett på hver side
+# ---------------------------------------------------------
+
+def record_page(page_map, page_num, per_page, docs, observed=None):
+    """
+    Registrerer hva en listeside inneholdt:
+      { "per_page", "first_date", "last_date", "first_id", "last_id",
+        "count", "observed" }
+    Sider uten daterte dokumenter registreres ikke.
+    """
+    dated = [d for d in docs if d.get("dato_iso")]
+    if not dated:
+        return
+    dates = sorted(d["dato_iso"] for d in dated)
+    page_map["pages"][str(page_num)] = {
+        "per_page": per_page,
+        "first_date": dates[0],
+        "last_date": dates[-1],
+        "first_id": dated[0]["dokumentID"],
+        "last_id": dated[-1]["dokumentID"],
+        "count": len(docs),
+        "observed": (observed or date.today()).isoformat(),
+    }
+
+
+def merge_page_maps(target, other):
+    """Fletter other inn i target; nyeste observasjon per side vinner."""
+    for page, entry in (other.get("pages") or {}).items():
+        current = target["pages"].get(page)
+        if current is None or entry.get("observed", "") >= current.get("observed", ""):
+            target["pages"][page] = entry
+    return target
+
+
+# ---------------------------------------------------------
+#   Hull i løpenummerserien
+# ---------------------------------------------------------
+
+def year_sequence(docs, year):
+    """Sorterte (løpenummer, dato_iso) for dokumenter med dokumentID i året."""
+    seq = {}
+    for d in docs:
+        parsed = parse_dokument_id(d.get("dokumentID"))
+        if parsed and parsed[0] == year and d.get("dato_iso"):
+            seq[parsed[1]] = d["dato_iso"]
+    return sorted(seq.items())
+
+
+def gap_threshold(numbers, min_gap=MIN_ID_GAP, factor=GAP_FACTOR):
+    diffs = [b - a for a, b in zip(numbers, numbers[1:])]
+    if len(diffs) < 20:
+        return min_gap
+    p95 = statistics.quantiles(diffs, n=20)[-1]
+    return max(min_gap, factor * p95)
+
+
+def find_gaps(docs, year, min_gap=MIN_ID_GAP, factor=GAP_FACTOR, date_gap_days=DATE_GAP_DAYS, today=None):
+    """
+    Finner sannsynlige hull for ett år. Returnerer en liste med
+      { "type", "fra_id", "til_id", "fra_dato", "til_dato" }
+    der type er "id" (stort hopp i løpenummer), "dato" (lang periode
+    uten dokumenter), "start" eller "slutt" (mangler i starten/slutten
+    av året). Datoene avgrenser hvor de manglende dokumentene ligger.
+    """
+    today = today or date.today()
+    seq = year_sequence(docs, year)
+    year_start = date(year, 1, 1)
+    year_end = min(date(year, 12, 31), today)
+
+    if not seq:
+        return [{
+            "type": "start",
+            "fra_id": None,
+            "til_id": None,
+            "fra_dato": year_start.isoformat(),
+            "til_dato": year_end.isoformat(),
+        }]
+
+    numbers = [n for n, _ in seq]
+    threshold = gap_threshold(numbers, min_gap, factor)
+    max_days = timedelta(days=date_gap_days)
+    gaps = []
+
+    first_n, _ = seq[0]
+    first_d = min(d for _, d in seq)
+    if date.fromisoformat(first_d) - year_start > max_days or first_n > threshold:
+        gaps.append({
+            "type": "start",
+            "fra_id": None,
+            "til_id": f"{year}/{first_n}",
+            "fra_dato": year_start.isoformat(),
+            "til_dato": first_d,
+        })
+
+    # Store hopp i løpenummer (naboenes datoer avgrenser hullet)
+    for (n1, d1), (n2, d2) in zip(seq, seq[1:]):
+        if n2 - n1 > threshold:
+            lo, hi = sorted((d1, d2))
+            gaps.append({
+                "type": "id",
+                "fra_id": f"{year}/{n1}",
+                "til_id": f"{year}/{n2}",
+                "fra_dato": lo,
+                "til_dato": hi,
+            })
+
+    # Lange perioder uten dokumenter (i datorekkefølge, slik at enkelt-
+    # dokumenter med avvikende dato ikke gir falske hull)
+    by_date = sorted(seq, key=lambda x: (x[1], x[0]))
+    for (n1, d1), (n2, d2) in zip(by_date, by_date[1:]):
+        if date.fromisoformat(d2) - date.fromisoformat(d1) > max_days:
+            gaps.append({
+                "type": "dato",
+                "fra_id": f"{year}/{n1}",
+                "til_id": f"{year}/{n2}",
+                "fra_dato": d1,
+                "til_dato": d2,
+            })
+
+    last_n, _ = seq[-1]
+    last_d = max(d for _, d in seq)
+    if year_end - date.fromisoformat(last_d) > max_days:
+        gaps.append({
+            "type": "slutt",
+            "fra_id": f"{year}/{last_n}",
+            "til_id": None,
+            "fra_dato": last_d,
+            "til_dato": year_end.isoformat(),
+        })
+
+    return gaps
+
+
+# ---------------------------------------------------------
+#   Fra datoer til listesider
+# ---------------------------------------------------------
+
+def page_offsets(page_map, newer_counts):
+    """
+    Gjør sidekartet om til (offset_start, offset_slutt, første_dato, siste_dato)
+    i dagens liste. Offset er posisjonen i listen (nyeste først), justert for
+    dokumenter som har kommet til siden siden ble observert.
+    newer_counts(observed) gir antall dokumenter nyere enn en dato.
+    """
+    spans = []
+    for page, e in (page_map.get("pages") or {}).items():
+        per_page = int(e.get("per_page") or DEFAULT_PER_PAGE)
+        shift = newer_counts(e.get("observed"))
+        start = (int(page) - 1) * per_page + shift
+        spans.append((start, start + per_page, e["first_date"], e["last_date"]))
+    return sorted(spans)
+
+
+def pages_for_gaps(gaps, page_map, newer_counts, per_page=DEFAULT_PER_PAGE, margin=PAGE_MARGIN):
+    """
+    Estimerer hvilke listesider (med gitt per_page) som dekker datoene til
+    hullene. Sider som overlapper datointervallet velges direkte; ellers
+    interpoleres posisjonen mellom nærmeste observerte sider.
+    Returnerer en sortert liste med sidenumre.
+    """
+    spans = page_offsets(page_map, newer_counts)
+    if not spans:
+        return []
+
+    pages = set()
+    for g in gaps:
+        lo, hi = g["fra_dato"], g["til_dato"]
+        hits = [(s, e) for s, e, first, last in spans if first <= hi and last >= lo]
+        if not hits:
+            hits = [_interpolate(spans, lo), _interpolate(spans, hi)]
+        start = min(s for s, _ in hits)
+        end = max(e for _, e in hits)
+        first_page = max(1, start // per_page + 1 - margin)
+        last_page = math.ceil(end / per_page) + margin
+        pages.update(range(first_page, last_page + 1))
+
+    return sorted(pages)
+
+
+def _interpolate(spans, day):
+    """Anslår offset for en dato mellom to observerte sider (listen er nyeste først)."""
+    newer = [(s, e, first) for s, e, first, last in spans if first > day]
+    older = [(s, e, last) for s, e, first, last in spans if last < day]
+    if newer and older:
+        _s1, e1, d1 = max(newer, key=lambda x: x[0])
+        s2, _e2, d2 = min(older, key=lambda x: x[0])
+        t1, t2, t = (date.fromisoformat(x).toordinal() for x in (d1, d2, day))
+        frac = (t1 - t) / (t1 - t2) if t1 != t2 else 0.5
+        pos = int(e1 + frac * (s2 - e1))
+        return pos, pos
+    if newer:
+        _s, e, _d = max(newer, key=lambda x: x[0])
+        return e, e
+    s, _e, _d = min(older, key=lambda x: x[0])
+    return s, s
@@ -0,0 +1,252 @@
+import http.client
+import json
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from utils_documents import BASE_HOST, absolute_url
+
+FILE_URL_MARKER = "/api/presentation/v2/nye-innsyn/filer"
+
+# Mal for JSON-endepunktet som leverer metadata for én journalpost.
+# Endepunktet er ikke dokumentert av leverandøren og ikke verifisert mot
+# tjenesten, så HTTP-veien er bare på når miljøvariabelen
+# POSTLISTE_FILE_API er satt: til en mal, eller til "on" for malen under.
+# Plassholdere:
+#   {host}            – https://www.strand.kommune.no
+#   {journalpost_id}  – "d-…"-delen av detaljlenken
+#   {sak_id}          – "a-…"-delen av detaljlenken
+DEFAULT_FILE_API = "{host}/api/presentation/v2/nye-innsyn/journalposter/{journalpost_id}"
+FILE_API_ENV = "POSTLISTE_FILE_API"
+
+# Etter så mange feil på rad slås HTTP-veien av for resten av kjøringen,
+# slik at et endret/ukjent endepunkt ikke koster en ekstra runde per dokument.
+MAX_CONSECUTIVE_FAILURES = 5
+
+_DETAIL_RE = re.compile(r"#/details/(?P<sak>a-[^/]+)/(?P<jp>d-[^/?#]+)")
+
+# Nøkler som typisk inneholder visningsnavnet til en fil
+_NAME_KEYS = ("tekst", "tittel", "title", "navn", "name", "filnavn", "fileName", "beskrivelse")
+
+
+class HttpPool:
+    """
+    Enkel trådsikker pool av keep-alive-forbindelser mot én vert.
+    Forbindelser gjenbrukes mellom forespørsler og lukkes ved feil.
+    """
+
+    def __init__(self, base_url=BASE_HOST, max_connections=8, timeout=10):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self.stats = {"requests": 0, "connections_opened": 0, "failures": 0}
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.stats["connections_opened"] += 1
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+    def _release(self, conn, reusable):
+        if reusable:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def get(self, url, headers=None):
+        """GET mot poolens vert. Returnerer (status, body-bytes)."""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        hdrs = {"Connection": "keep-alive", "Accept": "application/json"}
+        hdrs.update(headers or {})
+
+        conn = self._acquire()
+        reusable = False
+        try:
+            conn.request("GET", path, headers=hdrs)
+            resp = conn.getresponse()
+            body = resp.read()
+            reusable = not resp.will_close
+            with self._lock:
+                self.stats["requests"] += 1
+            return resp.status, body
+        except Exception:
+            with self._lock:
+                self.stats["failures"] += 1
+            raise
+        finally:
+            self._release(conn, reusable)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def parse_detail_link(journal_link):
+    """Trekker ut (sak_id, journalpost_id) fra en detaljlenke, eller None."""
+    m = _DETAIL_RE.search(journal_link or "")
+    if not m:
+        return None
+    return m.group("sak"), m.group("jp")
+
+
+def journalpost_number(journal_link):
+    """Løpenummeret i journalpost-id-en, f.eks. "2006010880" fra "d-…-2006010880!Y2DnkP"."""
+    ids = parse_detail_link(journal_link)
+    if not ids:
+        return ""
+    m = re.search(r"-(\d+)!", ids[1])
+    return m.group(1) if m else ids[1]
+
+
+def file_api_template():
+    """Malen fra POSTLISTE_FILE_API, eller None når HTTP-veien ikke er slått på."""
+    value = os.environ.get(FILE_API_ENV, "").strip()
+    if not value or value == "off":
+        return None
+    return DEFAULT_FILE_API if value in ("on", "1") else value
+
+
+def build_file_api_url(journal_link, template=None, host=BASE_HOST):
+    ids = parse_detail_link(journal_link)
+    if not ids:
+        return None
+    template = template or file_api_template() or DEFAULT_FILE_API
+    sak_id, jp_id = ids
+    return template.format(host=host, sak_id=sak_id, journalpost_id=jp_id)
+
+
+def extract_files(payload):
+    """
+    Finner fil-lenker i et vilkårlig JSON-svar: alle strenger som peker på
+    filer-API-et, med visningsnavn fra nabofelt i samme objekt.
+    """
+    filer = []
+    seen = set()
+
+    def visit(node):
+        if isinstance(node, dict):
+            for v in node.values():
+                if isinstance(v, str) and FILE_URL_MARKER in v:
+                    url = absolute_url(v)
+                    if url not in seen:
+                        seen.add(url)
+                        tekst = next(
+                            (node[k] for k in _NAME_KEYS if isinstance(node.get(k), str) and FILE_URL_MARKER not in node[k]),
+                            "",
+                        )
+                        filer.append({"tekst": tekst.strip(), "url": url})
+                else:
+                    visit(v)
+        elif isinstance(node, list):
+            for v in node:
+                visit(v)
+
+    visit(payload)
+    return filer
+
+
+class FileFetcher:
+    """
+    Henter fil-lister over HTTP uten nettleser.
+    fetch() returnerer en ikke-tom liste ved suksess, eller None når den
+    lette veien feiler og kalleren skal falle tilbake til nettleseren.
+    Et svar uten filer regnes ikke som et svar: endepunktet er ukjent, og
+    en tom liste ville ellers fjerne filene fra dokumentet.
+
+    Uten template er veien av med mindre POSTLISTE_FILE_API er satt.
+    """
+
+    def __init__(self, pool=None, template=None, max_workers=8):
+        self.pool = pool or HttpPool(max_connections=max_workers)
+        self.template = template or file_api_template()
+        self.max_workers = max_workers
+        self.consecutive_failures = 0
+        self.disabled = self.template is None
+        self.stats = {"http_ok": 0, "http_failed": 0, "http_empty": 0}
+        self._lock = threading.Lock()
+
+    def _record(self, ok):
+        with self._lock:
+            if ok:
+                self.consecutive_failures = 0
+                self.stats["http_ok"] += 1
+            else:
+                self.consecutive_failures += 1
+                self.stats["http_failed"] += 1
+                if not self.disabled and self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                    self.disabled = True
+                    print(f"[WARN] HTTP-filhenting slått av etter {MAX_CONSECUTIVE_FAILURES} feil på rad; bruker nettleser.")
+
+    def fetch(self, journal_link):
+        if self.disabled:
+            return None
+        url = build_file_api_url(journal_link, self.template, host=self.pool.base_url)
+        number = journalpost_number(journal_link)
+        if not url or not number:
+            return None
+        try:
+            status, body = self.pool.get(url)
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}")
+            text = body.decode("utf-8")
+            # Svaret må handle om riktig journalpost (løpenummeret i d-id-en)
+            if number not in text:
+                raise RuntimeError("svaret gjelder ikke journalposten")
+            filer = extract_files(json.loads(text))
+        except Exception as e:
+            print(f"[WARN] HTTP-filhenting feilet for {url}: {e}")
+            self._record(False)
+            return None
+        if not filer:
+            # Ingen filer eller ukjent URL-format: la nettleseren avgjøre
+            with self._lock:
+                self.stats["http_empty"] += 1
+            return None
+        self._record(True)
+        return filer
+
+    def fetch_many(self, journal_links):
+        """Henter mange fil-lister parallelt (begrenset av max_workers)."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            return list(ex.map(self.fetch, journal_links))
+
+    def close(self):
+        self.pool.close()
+
+
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+
+def get_file_fetcher():
+    """Delt FileFetcher for prosessen (én pool for alle scraper-kjerner)."""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = FileFetcher()
+        return _default_fetcher
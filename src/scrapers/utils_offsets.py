@@ -0,0 +1,243 @@
+"""
+Offset-tabeller for kompakte shards (data/offsets/postliste_<n>.json).
+
+Shard-skriveren lagrer for hver shard hvor hver rad ligger i filen
+(rows_start + lengde per rad), dokumentID og datoordinal per rad, og
+minste/største dato i shardet. ShardReader mmap-er shardet og dekoder
+bare radene som trengs: oppslag på dokumentID og datoutsnitt (radene er
+sortert nyest først) uten å parse hele filen.
+
+I tillegg lagres sekundærindekser ("postings") for feltene i DICT_FIELDS:
+for hver indeks i shardets verdiliste, radene som har den verdien.
+utils_query bruker dem til å filtrere uten å dekode rader.
+
+Offset-filen har signaturen til shardet (størrelse, mtime og SHA-1).
+Er den utdatert eller mangler, bygges den på nytt fra shardet.
+"""
+import hashlib
+import json
+import mmap
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import cached_property
+from itertools import accumulate
+from pathlib import Path
+
+from utils_compact import DICT_FIELDS, ROW_FIELDS, decode_row, is_compact, payload_bytes
+
+OFFSETS_FORMAT = "postliste-offsets"
+OFFSETS_VERSION = 2
+
+# Kolonnen i en kompakt rad for hvert indekserte felt
+_POSTING_COLUMNS = {f: ROW_FIELDS.index(f) for f in DICT_FIELDS}
+
+
+def offsets_path(shard_path):
+    shard_path = Path(shard_path)
+    return shard_path.parent / "offsets" / shard_path.name
+
+
+def _ordinal(iso):
+    """Datoordinal for dato_iso, 0 når datoen mangler."""
+    try:
+        return date.fromisoformat(iso).toordinal() if iso else 0
+    except ValueError:
+        return 0
+
+
+def _signature(path, data=None):
+    stat = Path(path).stat()
+    data = Path(path).read_bytes() if data is None else data
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": hashlib.sha1(data).hexdigest()}
+
+
+def _postings(rows):
+    """{ felt: { verdiindeks: [rad, …] } } for feltene i DICT_FIELDS."""
+    postings = {f: {} for f in DICT_FIELDS}
+    for i, row in enumerate(rows):
+        for field, col in _POSTING_COLUMNS.items():
+            postings[field].setdefault(str(row[col]), []).append(i)
+    return postings
+
+
+def build_offsets(shard_path, data, rows_start, lengths, rows):
+    """Offset-tabell for et shard som nettopp er skrevet med data (payload_bytes)."""
+    ordinals = [_ordinal(row[1]) for row in rows]
+    dated = [o for o in ordinals if o]
+    return {
+        "format": OFFSETS_FORMAT,
+        "version": OFFSETS_VERSION,
+        "shard": Path(shard_path).name,
+        **_signature(shard_path, data),
+        "rows_start": rows_start,
+        "min_ordinal": min(dated, default=0),
+        "max_ordinal": max(dated, default=0),
+        "ids": [row[2] for row in rows],
+        "lengths": lengths,
+        "ordinals": ordinals,
+        "postings": _postings(rows),
+    }
+
+
+def save_offsets(shard_path, offsets):
+    path = offsets_path(shard_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(offsets, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+def scan_offsets(shard_path):
+    """
+    Bygger offset-tabellen ved å lese shardet. Returnerer None hvis
+    shardet ikke er kompakt eller ikke er skrevet av payload_bytes.
+    """
+    data = Path(shard_path).read_bytes()
+    payload = json.loads(data)
+    if not is_compact(payload):
+        return None
+    encoded, rows_start, lengths = payload_bytes(payload)
+    if encoded != data:
+        return None
+    return build_offsets(shard_path, data, rows_start, lengths, payload["rows"])
+
+
+def load_offsets(shard_path):
+    """
+    Offset-tabellen for et shard, bygget på nytt hvis den mangler eller er
+    utdatert. SHA-1 regnes bare ut når størrelsen stemmer men mtime ikke
+    gjør det (f.eks. etter git checkout). Returnerer None for shards som
+    ikke kan indekseres.
+    """
+    shard_path = Path(shard_path)
+    path = offsets_path(shard_path)
+    stat = shard_path.stat()
+    offsets = None
+    if path.exists():
+        try:
+            offsets = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese {path}: {e}")
+
+    if offsets and offsets.get("format") == OFFSETS_FORMAT and offsets.get("version") == OFFSETS_VERSION:
+        if offsets["size"] == stat.st_size:
+            if offsets["mtime_ns"] == stat.st_mtime_ns:
+                return offsets
+            if offsets["sha1"] == _signature(shard_path)["sha1"]:
+                offsets["mtime_ns"] = stat.st_mtime_ns
+                save_offsets(shard_path, offsets)
+                return offsets
+
+    print(f"[INFO] Bygger offset-tabell for {shard_path.name}")
+    offsets = scan_offsets(shard_path)
+    if offsets is not None:
+        save_offsets(shard_path, offsets)
+    return offsets
+
+
+class ShardReader:
+    """
+    Lesing av enkeltdokumenter og datoutsnitt fra ett kompakt shard via
+    mmap. Bare headeren (prefikser og verdilister) og radene som leses
+    parses.
+    """
+
+    def __init__(self, shard_path, offsets=None):
+        self.path = Path(shard_path)
+        self.offsets = offsets or load_offsets(self.path)
+        if self.offsets is None:
+            raise ValueError(f"{self.path} kan ikke indekseres (ikke kompakt format)")
+
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        start = self.offsets["rows_start"]
+        self.header = json.loads(self._mm[:start] + b"]}")
+
+        self._lengths = self.offsets["lengths"]
+
+    # Oppslagstabellene bygges først når de trengs, så en spørring som
+    # bare bruker postings ikke betaler for dem.
+
+    @cached_property
+    def _starts(self):
+        # Hver rad etterfølges av ett komma
+        start = self.offsets["rows_start"]
+        return [start] + [start + s for s in accumulate(n + 1 for n in self._lengths[:-1])]
+
+    @cached_property
+    def _positions(self):
+        return {dokid: i for i, dokid in enumerate(self.offsets["ids"])}
+
+    @cached_property
+    def _keys(self):
+        # Radene er sortert nyest først; negerte ordinaler er da stigende
+        return [-o for o in self.offsets["ordinals"]]
+
+    @cached_property
+    def _sorted(self):
+        keys = self._keys
+        return all(a <= b for a, b in zip(keys, keys[1:]))
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __iter__(self):
+        """Alle dokumentene i filrekkefølge, dekodet én rad om gangen."""
+        return (self.read_row(i) for i in range(len(self)))
+
+    def __contains__(self, dokid):
+        return dokid in self._positions
+
+    def read_row(self, i):
+        start = self._starts[i]
+        return decode_row(self.header, json.loads(self._mm[start:start + self._lengths[i]]))
+
+    def get(self, dokid):
+        """Dokumentet med dokumentID, eller None."""
+        i = self._positions.get(dokid)
+        return None if i is None else self.read_row(i)
+
+    def overlaps(self, start, end):
+        return bool(self.offsets["min_ordinal"]) and (
+            self.offsets["min_ordinal"] <= end.toordinal() and self.offsets["max_ordinal"] >= start.toordinal()
+        )
+
+    def date_rows(self, start=None, end=None):
+        """Radnumre med dato i [start, end] (date, begge valgfrie), i filrekkefølge."""
+        lo = start.toordinal() if start else 1
+        hi = end.toordinal() if end else date.max.toordinal()
+        if not self._sorted:
+            return [i for i, k in enumerate(self._keys) if lo <= -k <= hi]
+        return range(bisect_left(self._keys, -hi), bisect_right(self._keys, -lo))
+
+    def date_range(self, start, end):
+        """Dokumenter med dato i [start, end] (date), nyeste først."""
+        return [self.read_row(i) for i in self.date_rows(start, end)]
+
+    def value_rows(self, field, predicate):
+        """
+        Radnumre der feltet (i DICT_FIELDS) har en verdi som predicate
+        godtar. Bare shardets verdiliste testes; radene hentes fra postings.
+        """
+        postings = self.offsets["postings"][field]
+        rows = set()
+        for idx, value in enumerate(self.header["values"][field]):
+            if predicate(value):
+                rows.update(postings.get(str(idx), ()))
+        return rows
+
+    def dokument_id(self, i):
+        return self.offsets["ids"][i]
+
+    def ordinal(self, i):
+        return -self._keys[i]
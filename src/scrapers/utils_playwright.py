@@ -1,3 +1,4 @@
+import os
 import time
 
 def safe_goto(page, url, retries=4):
@@ -19,3 +20,125 @@ def safe_text(el, sel):
         return node.inner_text().strip() if node else ""
     except:
         return ""
+
+
+# ---------------------------------------------------------
+#   Resirkulering av faner (lange kjøringer)
+# ---------------------------------------------------------
+
+# Ny fane/context etter så mange navigasjoner …
+RECYCLE_AFTER_NAVIGATIONS = 200
+# … eller når renderer-prosessene våre samlet bruker mer enn dette (MB)
+RECYCLE_RSS_MB = 1500
+# RSS leses fra /proc kun hver n-te utsjekk
+RSS_CHECK_EVERY = 10
+# Minst så mange navigasjoner før en fane resirkuleres på grunn av minne
+MIN_NAVIGATIONS_BEFORE_RSS_RECYCLE = 20
+
+
+# Prosessen renderer-RSS måles under når vi er koblet til en delt
+# nettleserserver (se set_renderer_root); ellers denne prosessen
+_renderer_root_pid = None
+
+
+def set_renderer_root(pid):
+    """Setter standard root_pid for renderer_rss_mb() (None = denne prosessen)."""
+    global _renderer_root_pid
+    _renderer_root_pid = pid
+
+
+def _proc_parents():
+    """{ pid: ppid } for alle prosesser i /proc."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read().decode("utf-8", "replace")
+            # Feltene etter "(navn)" starter med tilstand og ppid
+            parents[int(entry)] = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return parents
+
+
+def renderer_rss_mb(root_pid=None):
+    """
+    Samlet RSS (MB) for Chromium renderer-prosesser (--type=renderer) som
+    er etterkommere av root_pid (standard: den delte nettleserserveren vi
+    er koblet til, ellers denne prosessen). Mot en delt server telles også
+    fanene til andre kjøringer som bruker den. Returnerer None der /proc
+    ikke finnes.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+
+    root_pid = root_pid or _renderer_root_pid or os.getpid()
+    parents = _proc_parents()
+    total_kb = 0
+
+    for pid in parents:
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if b"--type=renderer" not in f.read():
+                    continue
+        except OSError:
+            continue
+
+        # Kun prosesser under root_pid (andre workere har egne nettlesere)
+        ancestor = parents.get(pid)
+        while ancestor and ancestor != root_pid:
+            ancestor = parents.get(ancestor)
+        if ancestor != root_pid:
+            continue
+
+        try:
+            with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+
+    return round(total_kb / 1024, 1)
+
+
+class RecyclePolicy:
+    """Når en fane skal byttes ut: etter antall navigasjoner eller ved høy renderer-RSS."""
+
+    def __init__(self, max_navigations=RECYCLE_AFTER_NAVIGATIONS, max_rss_mb=RECYCLE_RSS_MB):
+        self.max_navigations = max_navigations
+        self.max_rss_mb = max_rss_mb
+        self.checkouts = 0
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(
+            max_navigations=int(cfg.get("recycle_after_navigations", RECYCLE_AFTER_NAVIGATIONS)),
+            max_rss_mb=float(cfg.get("recycle_rss_mb", RECYCLE_RSS_MB)),
+        )
+
+    def reason(self, navigations):
+        """Årsak til å resirkulere nå, eller None."""
+        self.checkouts += 1
+        if self.max_navigations and navigations >= self.max_navigations:
+            return f"{navigations} navigasjoner"
+        if (
+            self.max_rss_mb
+            and navigations >= MIN_NAVIGATIONS_BEFORE_RSS_RECYCLE
+            and self.checkouts % RSS_CHECK_EVERY == 0
+        ):
+            rss = renderer_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                return f"renderer-RSS {rss} MB"
+        return None
+
+
+def log_recycle(reason, before, after, recycles):
+    print(
+        f"[INFO] Resirkulerte fane/context ({reason}); renderer-RSS "
+        f"{before if before is not None else '?'} MB -> {after if after is not None else '?'} MB "
+        f"(resirkulering nr. {recycles})"
+    )
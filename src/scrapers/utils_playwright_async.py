@@ -1,4 +1,7 @@
 # utils_playwright_async.py
+from utils_playwright import RecyclePolicy, renderer_rss_mb, log_recycle
+from utils_playwright_setup import new_context
+
 
 async def safe_text(element, selector):
     """
@@ -53,3 +56,53 @@ async def safe_goto(page, url, retries=3, timeout=10000):
 
     print(f"[ERROR] safe_goto: Klarte ikke åpne URL etter {retries} forsøk: {url}")
     return False
+
+
+class AsyncPageRecycler:
+    """
+    Eier én fane i en egen context (med ressursblokkering) som byttes ut
+    ved checkout() når policyen (utils_playwright.RecyclePolicy) sier det. hent_side_async og andre kjerner får bare en
+    vanlig fane og merker ikke byttet.
+    """
+
+    def __init__(self, browser, policy=None):
+        self.browser = browser
+        self.policy = policy or RecyclePolicy()
+        self.context = None
+        self.page = None
+        self.navigations = 0
+        self.recycles = 0
+
+    def _on_navigated(self, frame):
+        if self.page is not None and frame == self.page.main_frame:
+            self.navigations += 1
+
+    async def _open(self):
+        self.context = await new_context(self.browser)
+        self.page = await self.context.new_page()
+        self.page.on("framenavigated", self._on_navigated)
+        self.navigations = 0
+
+    async def checkout(self):
+        """Returnerer fanen som skal brukes til neste oppgave."""
+        if self.page is None:
+            await self._open()
+            return self.page
+
+        reason = self.policy.reason(self.navigations)
+        if reason:
+            before = renderer_rss_mb()
+            await self.close()
+            await self._open()
+            self.recycles += 1
+            log_recycle(reason, before, renderer_rss_mb(), self.recycles)
+        return self.page
+
+    async def close(self):
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception as e:
+                print(f"[WARN] Klarte ikke lukke context: {e}")
+        self.context = None
+        self.page = None
@@ -1,13 +1,47 @@
 from playwright.async_api import async_playwright
 
-async def create_playwright_context(block_resources=True):
+from browser_server import get_browser_endpoint, get_server_pid
+from utils_playwright import set_renderer_root
+
+
+async def new_context(browser, block_resources=True):
+    """Ny context der bilder og media blokkeres (kan kalles flere ganger per nettleser)."""
+    context = await browser.new_context()
+
+    if block_resources:
+        async def _block(route):
+            if route.request.resource_type in ["image", "media"]:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", _block)
+
+    return context
+
+
+async def create_playwright_context(block_resources=True, shared=True):
     """
     Oppretter Playwright browser + context med optimaliserte innstillinger.
-    Returnerer (browser, context).
+    Kjører en delt nettleserserver (browser_server.py), kobles det til den
+    i stedet for å starte en ny Chromium; browser.close() kobler da bare fra.
+    Med shared=False startes alltid en egen Chromium (workerne i
+    scraper_parallel.py skal ikke dele én nettleser).
+    Returnerer (p, browser, context).
     """
 
     p = await async_playwright().start()
 
+    endpoint = get_browser_endpoint() if shared else None
+    if endpoint:
+        print(f"[INFO] Kobler til delt nettleserserver på {endpoint}")
+        browser = await p.chromium.connect_over_cdp(endpoint)
+        # Renderer-prosessene er barn av serveren, ikke av denne prosessen
+        set_renderer_root(get_server_pid(endpoint))
+        # Ruter er klientside og må installeres for hver tilkobling
+        context = await new_context(browser, block_resources)
+        return p, browser, context
+
     browser = await p.chromium.launch(
         headless=True,
         args=[
@@ -20,15 +54,6 @@ async def create_playwright_context(block_resources=True):
         ],
     )
 
-    context = await browser.new_context()
-
-    if block_resources:
-        async def _block(route):
-            if route.request.resource_type in ["image", "media"]:
-                await route.abort()
-            else:
-                await route.continue_()
-
-        await context.route("**/*", _block)
+    context = await new_context(browser, block_resources)
 
     return p, browser, context
@@ -0,0 +1,164 @@
+"""
+Spørringer mot shardene uten å lese hele datasettet.
+
+Filtrene løses mot offset-tabellene (utils_offsets): dato og år via de
+sorterte datoordinalene, dokumenttype, status og avsender/mottaker via
+postings over shardets verdilister. Bare radene som faktisk returneres
+dekodes. Shards uten offset-tabell leses helt og filtreres med
+Query.matches.
+"""
+from datetime import date, timedelta
+
+from utils_documents import parse_dokument_id
+from utils_files import read_canonical_documents, shard_readers
+
+SORT_FIELDS = ("dato", "dokumentID")
+
+
+def normalize_name(value):
+    """Sammenligningsnøkkel for navn og typer: små bokstaver, enkle mellomrom."""
+    return " ".join((value or "").casefold().split())
+
+
+class Query:
+    """
+    Filtre (alle valgfrie, kombineres med OG):
+      start, end     – datoområde (datetime.date), begge inkludert
+      year           – kalenderår for dato (snevrer inn start/end)
+      older_than     – bare dokumenter eldre enn så mange dager
+      dokumenttype   – lik verdi (uten hensyn til store/små bokstaver)
+      status         – delstreng, f.eks. "innsyn"
+      avsender       – delstreng i normalisert avsender/mottaker
+      tittel         – delstreng i tittel (krever dekoding av kandidatene)
+    sort er "dato" eller "dokumentID"; descending gir nyeste/høyeste først.
+    """
+
+    def __init__(
+        self,
+        start=None,
+        end=None,
+        year=None,
+        older_than=None,
+        dokumenttype=None,
+        status=None,
+        avsender=None,
+        tittel=None,
+        sort="dato",
+        descending=True,
+        limit=None,
+        today=None,
+    ):
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Ukjent sortering {sort}; bruk {', '.join(SORT_FIELDS)}")
+        if year is not None:
+            start = max(start or date.min, date(year, 1, 1))
+            end = min(end or date.max, date(year, 12, 31))
+        if older_than is not None:
+            cutoff = (today or date.today()) - timedelta(days=older_than + 1)
+            end = min(end or date.max, cutoff)
+        self.start = start
+        self.end = end
+        self.dokumenttype = normalize_name(dokumenttype) if dokumenttype else None
+        self.status = normalize_name(status) if status else None
+        self.avsender = normalize_name(avsender) if avsender else None
+        self.tittel = normalize_name(tittel) if tittel else None
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+
+    @property
+    def dated(self):
+        return self.start is not None or self.end is not None
+
+    def predicates(self):
+        """(felt, predikat på verdi) for filtrene som kan løses med postings."""
+        preds = []
+        if self.dokumenttype is not None:
+            preds.append(("dokumenttype", lambda v: normalize_name(v) == self.dokumenttype))
+        if self.status is not None:
+            preds.append(("status", lambda v: self.status in normalize_name(v)))
+        if self.avsender is not None:
+            preds.append(("avsender_mottaker", lambda v: self.avsender in normalize_name(v)))
+        return preds
+
+    def matches(self, doc):
+        """Hele filteret mot et dekodet dokument."""
+        if self.dated:
+            iso = doc.get("dato_iso")
+            if not iso:
+                return False
+            d = date.fromisoformat(iso)
+            if (self.start and d < self.start) or (self.end and d > self.end):
+                return False
+        if any(not pred(doc.get(field) or "") for field, pred in self.predicates()):
+            return False
+        return self.tittel is None or self.tittel in normalize_name(doc.get("tittel"))
+
+
+def _candidate_rows(reader, q):
+    """Radnumre i shardet som oppfyller dato- og verdifiltrene, i filrekkefølge."""
+    rows = reader.date_rows(q.start, q.end) if q.dated else range(len(reader))
+    for field, pred in q.predicates():
+        matched = reader.value_rows(field, pred)
+        if isinstance(rows, range):
+            rows = sorted(i for i in matched if i in rows)
+        else:
+            rows = [i for i in rows if i in matched]
+        if not rows:
+            break
+    return rows
+
+
+def _id_key(dokid):
+    return parse_dokument_id(dokid) or (0, 0), dokid
+
+
+def run_query(q):
+    """Genererer dokumentene som oppfyller q, sortert og begrenset etter q."""
+    if q.limit is not None and q.limit <= 0:
+        return
+    if q.sort == "dokumentID":
+        yield from _by_id(q)
+        return
+
+    # Shardene og radene er sortert nyest først
+    sources = list(shard_readers())
+    if not q.descending:
+        sources.reverse()
+
+    emitted = 0
+    for path, reader in sources:
+        if reader is None:
+            docs = [d for d in read_canonical_documents(path) if q.matches(d)]
+            items = docs if q.descending else reversed(docs)
+        else:
+            rows = _candidate_rows(reader, q)
+            items = (reader.read_row(i) for i in (rows if q.descending else reversed(rows)))
+        for doc in items:
+            if q.tittel is not None and q.tittel not in normalize_name(doc["tittel"]):
+                continue
+            if q.limit is not None and emitted >= q.limit:
+                return
+            yield doc
+            emitted += 1
+
+
+def _by_id(q):
+    """Sortering på dokumentID: kandidatene sorteres på ID før noe dekodes."""
+    candidates = []
+    for path, reader in shard_readers():
+        if reader is None:
+            candidates.extend((_id_key(d["dokumentID"]), d) for d in read_canonical_documents(path) if q.matches(d))
+        else:
+            candidates.extend((_id_key(reader.dokument_id(i)), (reader, i)) for i in _candidate_rows(reader, q))
+    candidates.sort(key=lambda c: c[0], reverse=q.descending)
+
+    emitted = 0
+    for _key, source in candidates:
+        doc = source if isinstance(source, dict) else source[0].read_row(source[1])
+        if q.tittel is not None and q.tittel not in normalize_name(doc["tittel"]):
+            continue
+        if q.limit is not None and emitted >= q.limit:
+            return
+        yield doc
+        emitted += 1
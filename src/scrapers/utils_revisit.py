@@ -0,0 +1,123 @@
+import heapq
+import math
+from collections import Counter
+from datetime import date
+
+from utils_dates import parse_date_from_page
+from utils_documents import STATUS_INNSYN
+
+# Vekter for prioritering av dokumenter som skal sjekkes på nytt
+STATUS_WEIGHT = {
+    STATUS_INNSYN: 1.0,   # kan bli publisert
+    "Publisert": 0.3,     # kan få flere filer
+}
+AGE_HALF_LIFE_DAYS = 45   # ferske dokumenter endrer seg oftest
+MAX_AGE_DAYS = 365        # eldre dokumenter sjekkes ikke
+RECHECK_FULL_DAYS = 14    # etter så mange dager er et dokument "helt modent" igjen
+
+# Endringer som er verdt å oppdage ved revisit
+VALUABLE_KEYS = ("status", "filer", "filer_count")
+
+
+def mine_change_rates(changes, existing_dict):
+    """
+    Leser endringsloggen og returnerer:
+      - per_doc:  { dokumentID: antall verdifulle UPDATE-hendelser }
+      - per_type: { dokumenttype: andel dokumenter av typen som har hatt
+                    en verdifull UPDATE }
+    """
+    per_doc = Counter()
+    for c in changes:
+        if not isinstance(c, dict) or c.get("type") != "UPDATE":
+            continue
+        endringer = c.get("endringer") or {}
+        if any(k in endringer for k in VALUABLE_KEYS):
+            per_doc[c.get("dokumentID")] += 1
+
+    docs_per_type = Counter()
+    changed_per_type = Counter()
+    for did, d in existing_dict.items():
+        t = d.get("dokumenttype") or ""
+        docs_per_type[t] += 1
+        if per_doc.get(did):
+            changed_per_type[t] += 1
+
+    per_type = {
+        t: changed_per_type[t] / n
+        for t, n in docs_per_type.items()
+        if n
+    }
+    return per_doc, per_type
+
+
+def revisit_priority(doc, today, last_checked, per_doc, per_type):
+    """
+    Prioritet for å sjekke et dokument på nytt. Høyere er viktigere.
+    Returnerer None for dokumenter som ikke skal sjekkes.
+
+      prioritet = (status * alder + typerate + dokumentrate) * modenhet
+
+    der alder avtar eksponentielt, og modenhet øker lineært med dager siden
+    forrige sjekk (1.0 for dokumenter som aldri er sjekket).
+    """
+    if not doc.get("journal_link"):
+        return None
+
+    parsed = parse_date_from_page(doc.get("dato_iso")) or parse_date_from_page(doc.get("dato"))
+    if not parsed:
+        return None
+
+    age_days = (today - parsed).days
+    if age_days < 0 or age_days > MAX_AGE_DAYS:
+        return None
+
+    status_w = STATUS_WEIGHT.get(doc.get("status"), 0.5)
+    age_w = math.exp(-math.log(2) * age_days / AGE_HALF_LIFE_DAYS)
+    type_w = per_type.get(doc.get("dokumenttype") or "", 0.0)
+    doc_w = min(per_doc.get(doc.get("dokumentID"), 0), 5) * 0.2
+
+    checked = parse_date_from_page(last_checked) if last_checked else None
+    if checked:
+        maturity = min((today - checked).days, RECHECK_FULL_DAYS) / RECHECK_FULL_DAYS
+    else:
+        maturity = 1.0
+
+    if maturity <= 0:
+        return None
+
+    return (status_w * age_w + type_w + doc_w) * maturity
+
+
+def build_revisit_queue(existing_dict, changes, state, budget, today=None, exclude=()):
+    """
+    Returnerer inntil budget dokumenter (høyest prioritet først) som bør
+    detaljhentes på nytt. exclude er dokumentIDer som allerede hentes i
+    denne kjøringen.
+    """
+    if budget <= 0:
+        return []
+
+    today = today or date.today()
+    exclude = set(exclude)
+    per_doc, per_type = mine_change_rates(changes, existing_dict)
+
+    scored = []
+    for did, doc in existing_dict.items():
+        if did in exclude:
+            continue
+        prio = revisit_priority(doc, today, state.get(did), per_doc, per_type)
+        if prio is not None:
+            scored.append((prio, did))
+
+    top = heapq.nlargest(budget, scored)
+    return [existing_dict[did] for _prio, did in top]
+
+
+def update_revisit_state(state, checked_ids, existing_dict, today=None):
+    """Registrerer dagens sjekk og rydder bort dokumenter som ikke lenger finnes."""
+    today = today or date.today()
+    stamp = today.isoformat()
+    new_state = {did: d for did, d in state.items() if did in existing_dict}
+    for did in checked_ids:
+        new_state[did] = stamp
+    return new_state
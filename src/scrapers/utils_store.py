@@ -0,0 +1,247 @@
+"""
+SQLite som alternativ lagring for postlisten.
+
+Velges med miljøvariabelen POSTLISTE_STORE=sqlite; da går
+load_all_postliste, merge_and_save_sharded, load_changes og save_changes
+i utils_files hit i stedet for til JSON-filene. Dokumenter upsertes og
+endringshendelser legges til, så en lagring koster i forhold til antall
+endrede dokumenter og ikke hele datasettet.
+
+Nettsiden leser fortsatt JSON-shards: utils_files.export_store skriver
+dem fra databasen (tools/sqlite_store.py export). Er databasen tom når
+den åpnes, importeres shards og changes.json automatisk.
+
+Tabeller:
+  documents     – én rad per dokumentID (kanoniske felt unntatt filer)
+  files         – filer per dokument, med posisjon
+  changes       – endringshendelser i rekkefølge (hele hendelsen som JSON)
+  documents_fts – FTS5 over tittel og avsender/mottaker (hvis tilgjengelig)
+"""
+import json
+import sqlite3
+from pathlib import Path
+
+from utils_documents import CANONICAL_FIELDS, normalize_document, parse_dokument_id
+
+STORE_ENV = "POSTLISTE_STORE"
+
+# Dokumentfeltene som er egne kolonner i documents (filer ligger i files)
+DOC_COLUMNS = [f for f in CANONICAL_FIELDS if f != "filer"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    dokumentID        TEXT PRIMARY KEY,
+    year              INTEGER,
+    seq               INTEGER,
+    tittel            TEXT NOT NULL,
+    dato              TEXT NOT NULL,
+    dato_iso          TEXT NOT NULL,
+    dokumenttype      TEXT NOT NULL,
+    avsender_mottaker TEXT NOT NULL,
+    journal_link      TEXT NOT NULL,
+    status            TEXT NOT NULL,
+    hash              TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_dato ON documents (dato_iso);
+CREATE INDEX IF NOT EXISTS idx_documents_year_seq ON documents (year, seq);
+
+CREATE TABLE IF NOT EXISTS files (
+    dokumentID TEXT NOT NULL REFERENCES documents (dokumentID) ON DELETE CASCADE,
+    pos        INTEGER NOT NULL,
+    tekst      TEXT NOT NULL,
+    url        TEXT NOT NULL,
+    PRIMARY KEY (dokumentID, pos)
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    id         INTEGER PRIMARY KEY,
+    tidspunkt  TEXT,
+    type       TEXT,
+    dokumentID TEXT,
+    entry      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_dokid ON changes (dokumentID);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5 (
+    tittel, avsender_mottaker, content='documents', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS documents_fts_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, tittel, avsender_mottaker)
+    VALUES (new.rowid, new.tittel, new.avsender_mottaker);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_fts_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, tittel, avsender_mottaker)
+    VALUES ('delete', old.rowid, old.tittel, old.avsender_mottaker);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_fts_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, tittel, avsender_mottaker)
+    VALUES ('delete', old.rowid, old.tittel, old.avsender_mottaker);
+    INSERT INTO documents_fts (rowid, tittel, avsender_mottaker)
+    VALUES (new.rowid, new.tittel, new.avsender_mottaker);
+END;
+"""
+
+
+def _year_seq(dokid):
+    return parse_dokument_id(dokid) or (None, None)
+
+
+class SqliteStore:
+    """Dokumenter og endringslogg i én SQLite-fil."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Skrivetråden (utils_writer) bruker samme forbindelse som hovedtråden
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self.fts = self._create_fts()
+
+    def _create_fts(self):
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"[WARN] FTS5 er ikke tilgjengelig i denne SQLite-versjonen ({e}); søk bruker LIKE.")
+            return False
+
+    def close(self):
+        self.conn.close()
+
+    def sync(self):
+        """Flytter WAL-innholdet inn i databasefilen og synker til disk."""
+        self.conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def is_empty(self):
+        docs = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        changes = self.conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+        return docs == 0 and changes == 0
+
+    # -------------------------------------------------
+    #  Dokumenter
+    # -------------------------------------------------
+
+    def _select(self, where="", params=()):
+        """Kanoniske dokumenter for en WHERE-betingelse, nyeste først."""
+        files = {}
+        for dokid, tekst, url in self.conn.execute(
+            f"SELECT f.dokumentID, f.tekst, f.url FROM files f JOIN documents d USING (dokumentID) "
+            f"{where} ORDER BY f.dokumentID, f.pos",
+            params,
+        ):
+            files.setdefault(dokid, []).append({"tekst": tekst, "url": url})
+
+        docs = []
+        cols = ", ".join(f"d.{c}" for c in DOC_COLUMNS)
+        for row in self.conn.execute(
+            f"SELECT {cols} FROM documents d {where} ORDER BY d.dato_iso DESC, d.year DESC, d.seq DESC",
+            params,
+        ):
+            doc = dict(zip(DOC_COLUMNS, row))
+            doc["filer"] = files.get(doc["dokumentID"], [])
+            docs.append({f: doc[f] for f in CANONICAL_FIELDS})
+        return docs
+
+    def load_all(self):
+        """Alle dokumenter som kanoniske dicts, nyeste først."""
+        return self._select()
+
+    def get(self, dokid):
+        """Ett dokument, eller None."""
+        docs = self._select("WHERE d.dokumentID = ?", (dokid,))
+        return docs[0] if docs else None
+
+    def date_range(self, start, end):
+        """Dokumenter med dato i [start, end] (datetime.date), nyeste først."""
+        return self._select("WHERE d.dato_iso BETWEEN ? AND ?", (start.isoformat(), end.isoformat()))
+
+    def hashes(self):
+        """{ dokumentID: hash } for alle lagrede dokumenter."""
+        return dict(self.conn.execute("SELECT dokumentID, hash FROM documents"))
+
+    def upsert(self, docs):
+        """
+        Setter inn eller oppdaterer dokumenter i én transaksjon.
+        Dokumenter med samme hash som det lagrede hoppes over.
+        Returnerer antall rader som faktisk ble skrevet.
+        """
+        placeholders = ", ".join("?" for _ in range(len(DOC_COLUMNS) + 2))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in DOC_COLUMNS + ["year", "seq"] if c != "dokumentID")
+        sql = (
+            f"INSERT INTO documents ({', '.join(DOC_COLUMNS)}, year, seq) VALUES ({placeholders}) "
+            f"ON CONFLICT (dokumentID) DO UPDATE SET {updates} WHERE documents.hash != excluded.hash"
+        )
+
+        written = 0
+        with self.conn:
+            for d in docs:
+                nd = normalize_document(d)
+                if nd is None:
+                    continue
+                cur = self.conn.execute(sql, [nd[c] for c in DOC_COLUMNS] + list(_year_seq(nd["dokumentID"])))
+                if cur.rowcount == 0:
+                    continue
+                written += 1
+                self.conn.execute("DELETE FROM files WHERE dokumentID = ?", (nd["dokumentID"],))
+                self.conn.executemany(
+                    "INSERT INTO files (dokumentID, pos, tekst, url) VALUES (?, ?, ?, ?)",
+                    [(nd["dokumentID"], i, f["tekst"], f["url"]) for i, f in enumerate(nd["filer"])],
+                )
+        return written
+
+    def search(self, query, limit=50):
+        """
+        Fulltekstsøk i tittel og avsender/mottaker. query følger FTS5-syntaks
+        (uten FTS5: delstreng). Returnerer dokumentIDer, beste treff først.
+        """
+        if self.fts:
+            rows = self.conn.execute(
+                "SELECT d.dokumentID FROM documents_fts f JOIN documents d ON d.rowid = f.rowid "
+                "WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit),
+            )
+        else:
+            pattern = f"%{query}%"
+            rows = self.conn.execute(
+                "SELECT dokumentID FROM documents WHERE tittel LIKE ? OR avsender_mottaker LIKE ? "
+                "ORDER BY dato_iso DESC LIMIT ?",
+                (pattern, pattern, limit),
+            )
+        return [r[0] for r in rows]
+
+    # -------------------------------------------------
+    #  Endringslogg
+    # -------------------------------------------------
+
+    def load_changes(self):
+        return [json.loads(e) for (e,) in self.conn.execute("SELECT entry FROM changes ORDER BY id")]
+
+    def save_changes(self, changes):
+        """
+        Endringsloggen er append-only: bare hendelser etter de lagrede
+        settes inn. Er listen forkortet eller endret bakover, skrives den
+        på nytt i sin helhet. Returnerer antall hendelser som ble skrevet.
+        """
+        count, last = self.conn.execute(
+            "SELECT COUNT(*), (SELECT entry FROM changes ORDER BY id DESC LIMIT 1) FROM changes"
+        ).fetchone()
+        start = count
+        if count and (len(changes) < count or json.loads(last) != changes[count - 1]):
+            start = 0
+
+        with self.conn:
+            if start == 0 and count:
+                self.conn.execute("DELETE FROM changes")
+            self.conn.executemany(
+                "INSERT INTO changes (tidspunkt, type, dokumentID, entry) VALUES (?, ?, ?, ?)",
+                [
+                    (c.get("tidspunkt"), c.get("type"), c.get("dokumentID"), json.dumps(c, ensure_ascii=False))
+                    for c in changes[start:]
+                ],
+            )
+        return len(changes) - start
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+
+import utils_files
+from utils_documents import normalize_document
+
+# Sekunder mellom checkpoints til disk mens scrapingen pågår
+DEFAULT_CHECKPOINT_SECONDS = 60.0
+
+_STOP = object()
+
+
+class BackgroundWriter(threading.Thread):
+    """
+    Write-behind for hoveddatasettet: scraperne legger ferdige dokumenter
+    på en kø (submit), og tråden slår dem sammen med eksisterende
+    dokumenter og skriver checkpoints via merge_and_save_sharded mens
+    scrapingen fortsetter. close() tømmer køen, skriver det siste og
+    gjør fsync.
+
+    existing er { dokumentID: dokument } fra load_all_postliste. Er den
+    None, leses datasettet i tråden, slik at innlesingen også skjer
+    parallelt med scrapingen.
+
+    Med changes (endringsloggen fra load_changes) eier tråden også
+    endringsloggen: hendelser sendt med submit lagres i samme checkpoint
+    som dokumentene sine, og før dem, slik at et avbrudd etter et
+    checkpoint ikke mister hendelsene.
+    """
+
+    def __init__(self, existing=None, checkpoint_seconds=DEFAULT_CHECKPOINT_SECONDS, changes=None):
+        super().__init__(name="postliste-writer", daemon=True)
+        self.existing = existing
+        self.checkpoint_seconds = checkpoint_seconds
+        self.changes = None if changes is None else list(changes)
+        self.queue = queue.Queue()
+        self.pending = {}
+        self.pending_changes = []
+        self.stats = {"documents": 0, "checkpoints": 0, "write_seconds": 0.0}
+        self.error = None
+
+    @classmethod
+    def from_config(cls, cfg, existing=None, changes=None):
+        return cls(
+            existing,
+            checkpoint_seconds=float(cfg.get("checkpoint_seconds", DEFAULT_CHECKPOINT_SECONDS)),
+            changes=changes,
+        )
+
+    def submit(self, docs, changes=()):
+        """
+        Legger dokumenter (og endringshendelsene deres) i kø for lagring.
+        Trådsikker og blokkerer ikke.
+        """
+        if self.error is not None:
+            return
+        if changes and self.changes is None:
+            raise ValueError("Endringshendelser krever at writer er opprettet med changes")
+        self.queue.put((list(docs), list(changes)))
+
+    def run(self):
+        try:
+            if self.existing is None:
+                self.existing, _ = utils_files.load_all_postliste()
+            # Egen kopi; kalleren kan fortsatt bruke sin
+            self.existing = dict(self.existing)
+            last_checkpoint = time.monotonic()
+            while True:
+                timeout = max(0.0, last_checkpoint + self.checkpoint_seconds - time.monotonic())
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+                if item:
+                    self._merge(*item)
+                if (self.pending or self.pending_changes) and time.monotonic() - last_checkpoint >= self.checkpoint_seconds:
+                    self._checkpoint()
+                    last_checkpoint = time.monotonic()
+
+            self._checkpoint()
+        except Exception as e:
+            self.error = e
+            print(f"[ERROR] Skrivetråden feilet: {e}")
+
+    def _merge(self, docs, changes):
+        for d in docs:
+            nd = normalize_document(d)
+            if nd is not None:
+                self.pending[nd["dokumentID"]] = nd
+        self.pending_changes.extend(changes)
+
+    def _checkpoint(self):
+        if not self.pending and not self.pending_changes:
+            return
+        started = time.monotonic()
+        # Hendelsene først: et avbrudd mellom de to skrivingene gir i verste
+        # fall en hendelse som oppdages på nytt, aldri en tapt hendelse
+        if self.pending_changes:
+            self.changes.extend(self.pending_changes)
+            utils_files.save_changes(self.changes)
+        batch = list(self.pending.values())
+        if batch:
+            utils_files.merge_and_save_sharded(self.existing, batch)
+            self.existing.update(self.pending)
+        self.stats["documents"] += len(batch)
+        self.stats["checkpoints"] += 1
+        self.stats["write_seconds"] += time.monotonic() - started
+        print(
+            f"[INFO] Checkpoint: {len(batch)} dokumenter og {len(self.pending_changes)} "
+            f"endringshendelser lagret i bakgrunnen"
+        )
+        self.pending = {}
+        self.pending_changes = []
+
+    def close(self):
+        """
+        Skriver det som gjenstår, venter på tråden og gjør fsync av
+        datasettet. Returnerer det sammenslåtte datasettet
+        ({ dokumentID: dokument }). Feil i tråden kastes her.
+        """
+        self.queue.put(_STOP)
+        self.join()
+        if self.error is not None:
+            raise self.error
+        utils_files.sync_dataset()
+        print(
+            f"[INFO] Skrivetråd ferdig: {self.stats['documents']} dokumenter, "
+            f"{self.stats['checkpoints']} checkpoints, {self.stats['write_seconds']:.1f} s skriving"
+        )
+        return self.existing
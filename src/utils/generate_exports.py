@@ -0,0 +1,163 @@
+"""
+Genererer ferdige, gzip-komprimerte eksportfiler i data/exports/:
+
+  postliste_alle.csv.gz / .jsonl.gz     – hele datasettet
+  postliste_<år>.csv.gz / .jsonl.gz     – per år (dato)
+  type_<dokumenttype>.csv.gz / …        – per dokumenttype
+  status_<status>.csv.gz / …            – per status
+  index.json                            – oversikt (tittel, antall, bytes)
+
+Dokumentene strømmes fra shardene (iter_postliste) og skrives rett til
+alle filene de hører hjemme i, så hele datasettet holdes aldri i minnet.
+CSV-kolonnene er de samme som eksporten i web/java/export.js. gzip-
+filene skrives uten tidsstempel, slik at uendrede data gir like filer.
+
+Kjøres av generate_html.py i publish-workflowene, eller alene:
+  python src/utils/generate_exports.py
+"""
+import csv
+import gzip
+import io
+import json
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scrapers"))
+import utils_files  # noqa: E402
+
+DATA_DIR = Path("data")
+EXPORT_DIR = DATA_DIR / "exports"
+EXPORT_INDEX_FILE = EXPORT_DIR / "index.json"
+
+CSV_HEADER = ["Dato", "DokumentID", "Tittel", "Dokumenttype", "Avsender/Mottaker", "Status", "Journalpostlenke"]
+
+_TRANSLIT = str.maketrans({"æ": "ae", "ø": "o", "å": "a"})
+
+
+def slugify(value):
+    """Filnavnvennlig nøkkel: "Må bes om innsyn" → "ma-bes-om-innsyn"."""
+    slug = re.sub(r"[^a-z0-9]+", "-", (value or "").casefold().translate(_TRANSLIT)).strip("-")
+    return slug or "ukjent"
+
+
+def csv_row(doc):
+    return [
+        doc["dato"],
+        doc["dokumentID"],
+        " ".join(doc["tittel"].split()),
+        doc["dokumenttype"],
+        doc["avsender_mottaker"],
+        doc["status"],
+        doc["journal_link"],
+    ]
+
+
+class _ExportFile:
+    """Én gzip-fil som skrives strømmende til en .tmp-fil."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.tmp = path.with_name(path.name + ".tmp")
+        self.raw = open(self.tmp, "wb")
+        # mtime=0 og tomt filnavn: samme innhold gir samme bytes
+        self.gz = gzip.GzipFile(filename="", mode="wb", fileobj=self.raw, mtime=0)
+        self.text = io.TextIOWrapper(self.gz, encoding="utf-8", newline="")
+        self.fmt = fmt
+        self.count = 0
+        if fmt == "csv":
+            self.csv = csv.writer(self.text, quoting=csv.QUOTE_ALL, lineterminator="\n")
+            self.csv.writerow(CSV_HEADER)
+
+    def write(self, doc, row):
+        if self.fmt == "csv":
+            self.csv.writerow(row)
+        else:
+            self.text.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        self.text.close()
+        self.raw.close()
+        self.tmp.replace(self.path)
+        return self.path.stat().st_size
+
+
+class _Preset:
+    """En eksport (f.eks. "2013" eller status "Publisert") i begge formater."""
+
+    def __init__(self, group, key, title, stem):
+        self.group = group
+        self.key = key
+        self.title = title
+        self.stem = stem
+        self.files = {fmt: _ExportFile(EXPORT_DIR / f"{stem}.{fmt}.gz", fmt) for fmt in ("csv", "jsonl")}
+
+    def write(self, doc, row):
+        for f in self.files.values():
+            f.write(doc, row)
+
+    def close(self):
+        sizes = {fmt: f.close() for fmt, f in self.files.items()}
+        return {
+            "group": self.group,
+            "key": self.key,
+            "title": self.title,
+            "count": self.files["csv"].count,
+            "files": {fmt: {"name": f.path.name, "bytes": sizes[fmt]} for fmt, f in self.files.items()},
+        }
+
+
+GROUP_ORDER = ("alle", "år", "dokumenttype", "status")
+
+
+def _sort_key(entry):
+    """Gruppene i fast rekkefølge, år nyeste først, ellers alfabetisk."""
+    year = -int(entry["key"]) if entry["group"] == "år" and entry["key"].isdigit() else 0
+    return GROUP_ORDER.index(entry["group"]), year, entry["key"]
+
+
+def generate_exports():
+    """Skriver alle eksportene og index.json. Returnerer oversikten."""
+    utils_files.set_data_dir(DATA_DIR)
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Nøkkel er filnavnet, så verdier som gir samme slug havner i samme fil
+    presets = {}
+
+    def preset(group, key, title, stem):
+        p = presets.get(stem)
+        if p is None:
+            p = presets[stem] = _Preset(group, key, title, stem)
+        return p
+
+    all_docs = preset("alle", "", "Hele postlisten", "postliste_alle")
+    try:
+        for doc in utils_files.iter_postliste():
+            row = csv_row(doc)
+            year = doc["dato_iso"][:4] if doc["dato_iso"] else "ukjent"
+            all_docs.write(doc, row)
+            preset("år", year, year, f"postliste_{year}").write(doc, row)
+            if doc["dokumenttype"]:
+                t = doc["dokumenttype"]
+                preset("dokumenttype", t, t, f"type_{slugify(t)}").write(doc, row)
+            preset("status", doc["status"], doc["status"], f"status_{slugify(doc['status'])}").write(doc, row)
+    finally:
+        entries = [p.close() for p in presets.values()]
+
+    entries.sort(key=_sort_key)
+
+    # Eksporter fra tidligere kjøringer som ikke lenger finnes
+    current = {f["name"] for e in entries for f in e["files"].values()}
+    for stale in EXPORT_DIR.glob("*.gz"):
+        if stale.name not in current:
+            stale.unlink()
+
+    EXPORT_INDEX_FILE.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+    total = entries[0]["count"] if entries else 0
+    print(f"[INFO] Skrev {len(entries)} eksporter ({total} dokumenter) til {EXPORT_DIR}")
+    return entries
+
+
+if __name__ == "__main__":
+    generate_exports()
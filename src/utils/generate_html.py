@@ -1,11 +1,47 @@
+import html
 import os
+import re
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from generate_exports import generate_exports
+from generate_publish import generate_publish
+from prerender import prerender_first_page
+
 # Filstier
 OUTPUT_FILE = "web/postliste.html"
 TEMPLATE_FILE = "web/postliste_template.html"
 
+# Eksportfilene sett fra web/postliste.html
+EXPORT_URL = "../data/exports"
+
+GROUP_TITLES = {"alle": "Alt", "år": "Per år", "dokumenttype": "Per dokumenttype", "status": "Per status"}
+
+
+def format_size(n):
+    return f"{n / (1024 * 1024):.1f} MB" if n >= 1024 * 1024 else f"{max(1, round(n / 1024))} KB"
+
+
+def render_exports(entries):
+    """HTML-liste med nedlastingslenker for eksportene fra generate_exports."""
+    groups = {}
+    for e in entries:
+        groups.setdefault(e["group"], []).append(e)
+
+    parts = ['<details class="exports">', "    <summary>Last ned postlisten (CSV / JSON Lines, gzip)</summary>"]
+    for group, items in groups.items():
+        parts.append(f'    <div class="export-group"><h3>{GROUP_TITLES.get(group, group)}</h3><ul>')
+        for e in items:
+            links = " · ".join(
+                f'<a href="{EXPORT_URL}/{f["name"]}" download>{fmt.upper()}</a> ({format_size(f["bytes"])})'
+                for fmt, f in e["files"].items()
+            )
+            parts.append(f"      <li>{html.escape(e['title'])} – {e['count']} dokumenter: {links}</li>")
+        parts.append("    </ul></div>")
+    parts.append("  </details>")
+    return "\n".join(parts)
+
+
 def generate_html():
     updated = datetime.now(ZoneInfo("Europe/Oslo")).strftime("%d.%m.%Y %H:%M")
 
@@ -13,12 +49,21 @@ def generate_html():
     with open(TEMPLATE_FILE, "r", encoding="utf-8") as f:
         template = f.read()
 
-    # Sett inn kun {updated}
-    html = template.replace("{updated}", updated)
+    # Shards med innholdshash og gzip/brotli-varianter til data/publish/
+    generate_publish()
+
+    # Ferdige eksporter per år/type/status fra shardene
+    exports = render_exports(generate_exports())
+
+    # Nyeste kort, sammendrag og paginering, så siden har innhold før JS
+    values = {"updated": updated, "exports": exports, **prerender_first_page()}
+
+    # Sett inn alle plassholderne i én runde (innholdet kan selv inneholde klammer)
+    html_out = re.sub(r"\{(\w+)\}", lambda m: values.get(m.group(1), m.group(0)), template)
 
     # Lagre ferdig HTML
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write(html)
+        f.write(html_out)
 
     print(f"[INFO] Lagret HTML til {OUTPUT_FILE}")
 
@@ -0,0 +1,143 @@
+"""
+Publiseringsartefakter for shardene i data/publish/:
+
+  postliste_<n>.<hash>.jsonl      – shardet i linjeformat (utils_compact.payload_lines):
+                                    header på første linje, så én rad per linje
+  postliste_<n>.<hash>.jsonl.gz   – gzip-variant (nivå 9, uten tidsstempel)
+  postliste_<n>.<hash>.jsonl.br   – brotli-variant (krever pakken brotli)
+  manifest.json                   – shardnavn → publisert fil, hash, antall rader
+                                    og størrelser, og delta_seq (siste delta i
+                                    data/deltas/)
+
+<hash> er SHA-256 av shardet. Et filnavn med hash endrer aldri innhold,
+så nettsiden kan cache shardet for alltid og bare laste ned shards som
+har fått ny hash. Linjeformatet lar datatråden i nettleseren
+(web/java/data_worker.js) dekode rader mens filen lastes ned, i stedet
+for å vente på hele filen og parse den i ett stykke.
+postliste_index.json er fortsatt listen over arbeidsshardene som
+scraperne og verktøyene leser; manifestet er nettsidens inngang.
+
+Shards med samme hash som forrige kjøring hoppes over, så bare endrede
+shards kodes og komprimeres på nytt. Servere med forhåndskomprimerte
+filer (f.eks. nginx gzip_static/brotli_static) leverer .gz/.br direkte.
+
+Kjøres av generate_html.py i publish-workflowene, eller alene:
+  python src/utils/generate_publish.py
+"""
+import gzip
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scrapers"))
+import utils_files  # noqa: E402
+from utils_compact import encode_documents, is_compact, payload_lines  # noqa: E402
+from utils_documents import normalize_documents  # noqa: E402
+from utils_deltas import latest_seq  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DATA_DIR = Path("data")
+PUBLISH_DIR = DATA_DIR / "publish"
+MANIFEST_FILE = PUBLISH_DIR / "manifest.json"
+
+MANIFEST_FORMAT = "postliste-publish"
+MANIFEST_VERSION = 2
+
+# Antall hex-tegn fra SHA-256 i filnavnet
+HASH_LENGTH = 16
+
+
+def _write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _variants(name):
+    return {"gzip": PUBLISH_DIR / f"{name}.gz", "br": PUBLISH_DIR / f"{name}.br"}
+
+
+def _compress(encoding, data):
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def publish_shard(shard_path):
+    """Skriver artefaktene for ett shard (hvis de mangler) og returnerer manifestoppføringen."""
+    digest = hashlib.sha256(shard_path.read_bytes()).hexdigest()
+    name = f"{shard_path.stem}.{digest[:HASH_LENGTH]}.jsonl"
+    target = PUBLISH_DIR / name
+
+    written = False
+    if target.exists():
+        data = target.read_bytes()
+    else:
+        payload = json.loads(shard_path.read_text(encoding="utf-8"))
+        if not is_compact(payload):
+            payload = encode_documents(normalize_documents(payload))
+        data = payload_lines(payload)
+        _write_atomic(target, data)
+        written = True
+    entry = {
+        "name": shard_path.name,
+        "file": name,
+        "sha256": digest,
+        "rows": data.count(b"\n") - 1,
+        "bytes": len(data),
+    }
+    for encoding, path in _variants(name).items():
+        if not path.exists():
+            if encoding == "br" and brotli is None:
+                continue
+            _write_atomic(path, _compress(encoding, data))
+            written = True
+        entry[f"{encoding}_bytes"] = path.stat().st_size
+    return entry, written
+
+
+def generate_publish():
+    """Publiserer alle shardene og skriver manifest.json. Returnerer manifestet."""
+    utils_files.set_data_dir(DATA_DIR)
+    PUBLISH_DIR.mkdir(parents=True, exist_ok=True)
+    if brotli is None:
+        print("[WARN] brotli er ikke installert; lager bare gzip-varianter")
+
+    shards = []
+    changed = 0
+    for path in utils_files._list_shard_paths():
+        if not path.exists():
+            print(f"[WARN] {path} står i shard-indeksen, men finnes ikke")
+            continue
+        entry, written = publish_shard(path)
+        shards.append(entry)
+        changed += written
+
+    # Artefakter for shardinnhold som ikke lenger publiseres
+    current = {MANIFEST_FILE.name}
+    for entry in shards:
+        current.add(entry["file"])
+        current.update(p.name for p in _variants(entry["file"]).values())
+    for stale in PUBLISH_DIR.iterdir():
+        if stale.is_file() and stale.name not in current:
+            stale.unlink()
+
+    # delta_seq: siste delta (utils_deltas) som shardene inneholder
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "delta_seq": latest_seq(DATA_DIR),
+        "shards": shards,
+    }
+    _write_atomic(MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    print(f"[INFO] Publiserte {len(shards)} shards til {PUBLISH_DIR} ({changed} nye/endrede)")
+    return manifest
+
+
+if __name__ == "__main__":
+    generate_publish()
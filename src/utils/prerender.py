@@ -0,0 +1,110 @@
+"""
+Ferdigrendret første side for postliste.html.
+
+Lager de nyeste kortene, sammendraget og pagineringen med samme markup
+som renderPage i web/java/render.js, slik at siden viser innhold før
+script.js har lastet shardene. Når dataene er lastet, rendrer
+render.js siden på nytt oppå den statiske markupen.
+
+De nyeste dokumentene hentes via utils_query (datosortert, bare radene
+som vises dekodes), så arbeidet avhenger ikke av datasettets størrelse.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scrapers"))
+import utils_files  # noqa: E402
+from utils_query import Query, run_query  # noqa: E402
+
+DATA_DIR = Path("data")
+
+# Samme som window.perPage i web/script.js
+PER_PAGE = 50
+
+# (delstreng i dokumenttype, css-klasse, ikon), samme rekkefølge som render.js
+_TYPES = [
+    ("Inngående", "type-inngående", "📬"),
+    ("Utgående", "type-utgående", "📤"),
+    ("Sakskart", "type-sakskart", "📑"),
+    ("Møtebok", "type-møtebok", "📘"),
+    ("Møteprotokoll", "type-møteprotokoll", "📜"),
+    ("Saksfremlegg", "type-saksfremlegg", "📝"),
+    ("Internt", "type-internt", "📂"),
+]
+
+
+def escape_html(s):
+    if not s:
+        return ""
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def _type_style(doktype):
+    for needle, css, icon in _TYPES:
+        if needle in doktype:
+            return css, icon
+    return "", "📄"
+
+
+def render_card(d):
+    doktype = d.get("dokumenttype") or ""
+    type_class, type_icon = _type_style(doktype)
+    status_class = "status-publisert" if d.get("status") == "Publisert" else "status-innsyn"
+    link = escape_html(d.get("journal_link") or d.get("detalj_link") or "")
+
+    files_html = ""
+    if d.get("status") == "Publisert" and d.get("filer"):
+        files_html = "<ul class='files'>" + "".join(
+            f"\n        <li><a href='{escape_html(f['url'])}' target='_blank'>{escape_html(f.get('tekst')) or 'Fil'}</a></li>\n      "
+            for f in d["filer"]
+        ) + "</ul>"
+    elif link:
+        files_html = f"<p><a href='{link}' target='_blank'>Be om innsyn</a></p>"
+
+    am = escape_html(d["avsender_mottaker"]) + " – " if d.get("avsender_mottaker") else ""
+    footer = (
+        f"<p class='footer-link'><a href='{link}' target='_blank' aria-label='Åpne journalposten'>Se journalposten</a></p>"
+        if link
+        else ""
+    )
+
+    return f"""
+      <article class='card'>
+        <h3>{escape_html(d.get("tittel"))}</h3>
+        <p class='meta'>
+          {escape_html(d.get("dato"))} – {escape_html(str(d.get("dokumentID") or ""))} – {am}
+          <span class='{type_class}'>{type_icon} {escape_html(doktype)}</span>
+        </p>
+        <p>Status: <span class='{status_class}'>{escape_html(d.get("status"))}</span></p>
+        {files_html}
+        {footer}
+      </article>"""
+
+
+def render_pagination(total, per_page=PER_PAGE):
+    """Side 1 som renderPagination lager den; knappene virker først etter hydrering."""
+    max_page = -(-total // per_page) or 1
+    return (
+        "<button disabled>◀ Forrige</button>"
+        f"<span> Side 1 av {max_page} </span>"
+        "<button disabled>Neste ▶</button>"
+    )
+
+
+def count_documents():
+    total = 0
+    for path, reader in utils_files.shard_readers():
+        total += len(reader) if reader is not None else len(utils_files.read_canonical_documents(path))
+    return total
+
+
+def prerender_first_page(per_page=PER_PAGE):
+    """{ cards, summary, pagination } for første side uten filtre (nyeste først)."""
+    utils_files.set_data_dir(DATA_DIR)
+    docs = list(run_query(Query(limit=per_page)))
+    total = count_documents()
+    return {
+        "cards": "".join(render_card(d) for d in docs),
+        "summary": f"Viser {total} av {total}",
+        "pagination": render_pagination(total, per_page),
+    }
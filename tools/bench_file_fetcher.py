@@ -0,0 +1,163 @@
+"""
+Benchmark av HTTP-filhenting mot en lokal stand-in-server.
+
+Sammenligner per dokument:
+  - pooled:   FileFetcher med keep-alive-pool og parallelle forespørsler
+  - fresh:    ny TCP-forbindelse per dokument, sekvensielt
+  - browser:  Playwright-navigasjon til en lokal detaljside (kun hvis
+              playwright er installert)
+
+Bruk:
+  python tools/bench_file_fetcher.py --docs 200 --latency-ms 20 --workers 8
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_http import FileFetcher, HttpPool  # noqa: E402
+
+TEMPLATE = "{host}/api/presentation/v2/nye-innsyn/journalposter/{journalpost_id}"
+
+
+def make_handler(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            jp = self.path.rsplit("/", 1)[-1]
+            if self.path.startswith("/details/"):
+                body = (
+                    "<html><body>"
+                    f"<a href='/api/presentation/v2/nye-innsyn/filer/v-1!{jp}?pid=29'>Fil (pdf, 10KB)</a>"
+                    "</body></html>"
+                ).encode("utf-8")
+                ctype = "text/html; charset=utf-8"
+            else:
+                body = json.dumps({
+                    "id": jp,
+                    "filer": [{
+                        "tittel": "Fil (pdf, 10KB)",
+                        "url": f"/api/presentation/v2/nye-innsyn/filer/v-1!{jp}?pid=29",
+                    }],
+                }).encode("utf-8")
+                ctype = "application/json"
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def journal_links(n):
+    return [
+        "https://www.strand.kommune.no/#/details/"
+        f"a-bench-2020{i:06d}!AAAAAA/d-bench-2020{i:06d}!BBBBBB"
+        for i in range(n)
+    ]
+
+
+def bench_pooled(base_url, links, workers):
+    fetcher = FileFetcher(pool=HttpPool(base_url, max_connections=workers), template=TEMPLATE, max_workers=workers)
+    t0 = time.perf_counter()
+    results = fetcher.fetch_many(links)
+    elapsed = time.perf_counter() - t0
+    fetcher.close()
+    ok = sum(1 for r in results if r)
+    return {"seconds": elapsed, "ok": ok, "connections": fetcher.pool.stats["connections_opened"]}
+
+
+def bench_fresh(host, port, links):
+    t0 = time.perf_counter()
+    ok = 0
+    for link in links:
+        jp = link.rsplit("/", 1)[-1]
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request("GET", f"/api/presentation/v2/nye-innsyn/journalposter/{jp}", headers={"Connection": "close"})
+        resp = conn.getresponse()
+        if resp.status == 200 and json.loads(resp.read()).get("filer"):
+            ok += 1
+        conn.close()
+    return {"seconds": time.perf_counter() - t0, "ok": ok, "connections": len(links)}
+
+
+def bench_browser(base_url, links):
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        return None
+
+    t0 = time.perf_counter()
+    ok = 0
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
+        page = browser.new_page()
+        for link in links:
+            jp = link.rsplit("/", 1)[-1]
+            page.goto(f"{base_url}/details/{jp}", wait_until="domcontentloaded")
+            if any("/nye-innsyn/filer" in (a.get_attribute("href") or "") for a in page.query_selector_all("a")):
+                ok += 1
+        browser.close()
+    return {"seconds": time.perf_counter() - t0, "ok": ok, "connections": None}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", help="Skriv resultater som JSON til denne filen")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    host, port = server.server_address
+    base_url = f"http://{host}:{port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    links = journal_links(args.docs)
+    print(f"=== Benchmark: {args.docs} dokumenter, {args.latency_ms} ms serverlatens ===")
+
+    results = {
+        "docs": args.docs,
+        "latency_ms": args.latency_ms,
+        "workers": args.workers,
+        "pooled": bench_pooled(base_url, links, args.workers),
+        "fresh": bench_fresh(host, port, links),
+        "browser": bench_browser(base_url, links),
+    }
+    server.shutdown()
+
+    baseline = results["browser"] or results["fresh"]
+    for name in ("pooled", "fresh", "browser"):
+        r = results[name]
+        if r is None:
+            print(f"  {name:8s}: hoppet over (playwright ikke installert)")
+            continue
+        per_doc = r["seconds"] / args.docs * 1000
+        r["ms_per_doc"] = round(per_doc, 3)
+        r["speedup_vs_baseline"] = round(baseline["seconds"] / r["seconds"], 2) if r["seconds"] else None
+        print(
+            f"  {name:8s}: {r['seconds']:.3f} s totalt, {per_doc:.2f} ms/dokument, "
+            f"{r['ok']}/{args.docs} ok, forbindelser={r['connections']}, "
+            f"speedup={r['speedup_vs_baseline']}x"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"[INFO] Resultater lagret til {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Benchmark av lagringslaget mot syntetiske korpus i flere størrelser.
+
+For hver skala genereres et korpus (tools/gen_synthetic_corpus.py), og
+hver operasjon kjøres i en egen prosess mot det med utils_files pekt dit
+(set_data_dir). Per operasjon måles veggtid, topp-RSS under selve operasjonen (samplet
+i en egen tråd) og antall bytes skrevet til data-katalogen.
+
+  python tools/bench_storage.py --scales 1 10 --output bench_storage.json
+  python tools/bench_storage.py --scales 1 --baseline bench_storage.json
+  python tools/bench_storage.py --scales 1 10 --store sqlite
+
+Med --baseline sammenlignes veggtid mot en tidligere resultatfil, og
+skriptet avslutter med kode 1 hvis en operasjon er tregere enn
+--tolerance tillater (eller ikke lenger fullfører innen --timeout).
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent
+SCRAPERS_DIR = TOOLS_DIR.parent / "src" / "scrapers"
+sys.path.insert(0, str(SCRAPERS_DIR))
+sys.path.insert(0, str(TOOLS_DIR))
+
+from gen_synthetic_corpus import ARCHIVE_DIR, generate_corpus, load_profile, write_corpus  # noqa: E402
+from utils_store import STORE_ENV  # noqa: E402
+
+# Rekkefølgen betyr noe: operasjonene som skriver kjøres sist
+OPERATIONS = (
+    "load_all_postliste",
+    "load_archive_year",
+    "load_archive_ids_cold",
+    "load_archive_ids",
+    "detect_changes",
+    "save_postliste_sharded",
+    "merge_and_save_sharded",
+)
+
+# Andel av dokumentene som endres/legges til i detect_changes og merge
+CHANGE_EVERY = 100
+
+# Forskjeller under dette regnes ikke som regresjon
+MIN_REGRESSION_SECONDS = 0.05
+
+
+# ---------------------------------------------------------
+#   Målinger (kjøres i worker-prosess)
+# ---------------------------------------------------------
+
+def _snapshot(data_dir):
+    return {
+        p: (p.stat().st_size, p.stat().st_mtime_ns)
+        for p in Path(data_dir).rglob("*") if p.is_file()
+    }
+
+
+def _bytes_written(before, after):
+    return sum(size for p, (size, mtime) in after.items() if before.get(p) != (size, mtime))
+
+
+# Hvor ofte RSS samples mens en operasjon kjører
+RSS_SAMPLE_SECONDS = 0.005
+
+
+def _rss_mb():
+    """Nåværende RSS (MB) fra /proc/self/statm, eller None der den ikke finnes."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class RssSampler:
+    """
+    Topp-RSS mens with-blokken kjører, samplet i en bakgrunnstråd.
+    ru_maxrss kan ikke brukes: den er prosessens topp så langt, så
+    forberedelsene (lasting av korpuset) dominerer målingen.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.before = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = _rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.before = _rss_mb()
+        self.peak = self.before
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return False
+
+    @property
+    def delta(self):
+        if self.peak is None or self.before is None:
+            return None
+        return self.peak - self.before
+
+
+def _changed_batch(docs):
+    """Hvert CHANGE_EVERY-te dokument endres, og like mange nye legges til."""
+    batch = []
+    for i, d in enumerate(docs):
+        if i % CHANGE_EVERY == 0:
+            batch.append(dict(d, tittel=d["tittel"] + " (endret)", hash=""))
+            year, seq = d["dokumentID"].split("/")
+            batch.append(dict(d, dokumentID=f"{year}/{int(seq) + 10_000_000}", hash=""))
+        else:
+            batch.append(d)
+    return batch
+
+
+def _prepare(name, year):
+    """Returnerer (funksjon, antall dokumenter) for operasjonen; oppsett måles ikke."""
+    import utils_files
+    from scraper_changes import detect_changes
+    from utils_compact import read_documents
+
+    # Med SQLite-lagring skjer importen fra shards før målingen
+    utils_files.get_store()
+
+    if name == "load_all_postliste":
+        count = sum(len(read_documents(p)) for p in utils_files._list_shard_paths())
+        return utils_files.load_all_postliste, count
+
+    if name == "load_archive_year":
+        return lambda: utils_files.load_archive_year(year), None
+
+    if name == "load_archive_ids_cold":
+        utils_files.archive_ids_path(year).unlink(missing_ok=True)
+        return lambda: utils_files.load_archive_ids(year), None
+
+    if name == "load_archive_ids":
+        utils_files.load_archive_ids(year)
+        return lambda: utils_files.load_archive_ids(year), None
+
+    existing, docs = utils_files.load_all_postliste()
+
+    if name == "detect_changes":
+        batch = _changed_batch(docs)
+
+        def run():
+            for d in batch:
+                detect_changes(existing, d)
+        return run, len(batch)
+
+    if name == "save_postliste_sharded":
+        return lambda: utils_files.save_postliste_sharded(docs), len(docs)
+
+    if name == "merge_and_save_sharded":
+        new_docs = [d for i, d in enumerate(_changed_batch(docs)) if i % CHANGE_EVERY <= 1]
+        return lambda: utils_files.merge_and_save_sharded(existing, new_docs), len(new_docs)
+
+    raise ValueError(f"Ukjent operasjon {name}")
+
+
+def run_operation(name, data_dir, year, conn):
+    """Worker: kjører én operasjon og sender resultatet tilbake."""
+    import utils_files
+
+    utils_files.set_data_dir(data_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn, docs = _prepare(name, year)
+        before = _snapshot(data_dir)
+        with RssSampler() as rss:
+            t0 = time.perf_counter()
+            fn()
+            seconds = time.perf_counter() - t0
+        written = _bytes_written(before, _snapshot(data_dir))
+
+    conn.send({
+        "status": "ok",
+        "seconds": round(seconds, 4),
+        "docs": docs,
+        "us_per_doc": round(seconds / docs * 1e6, 2) if docs else None,
+        "peak_rss_mb": None if rss.peak is None else round(rss.peak, 1),
+        "peak_rss_delta_mb": None if rss.delta is None else round(rss.delta, 1),
+        "bytes_written": written,
+    })
+
+
+def measure(name, data_dir, year, timeout):
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=run_operation, args=(name, str(data_dir), year, child))
+    proc.start()
+    child.close()
+
+    if parent.poll(timeout):
+        try:
+            result = parent.recv()
+        except EOFError:
+            result = {"status": "error", "seconds": None}
+    else:
+        proc.terminate()
+        result = {"status": "timeout", "seconds": None}
+    proc.join()
+    if result["status"] == "error":
+        result["exitcode"] = proc.exitcode
+    return result
+
+
+# ---------------------------------------------------------
+#   Kjøring og sammenligning
+# ---------------------------------------------------------
+
+def bench_scale(profile, scale, seed, timeout, corpus_root):
+    corpus_dir = Path(corpus_root) / f"scale_{scale:g}"
+    if not (corpus_dir / "postliste_index.json").exists():
+        t0 = time.perf_counter()
+        corpus = generate_corpus(profile, scale=scale, seed=seed)
+        total = write_corpus(corpus_dir, corpus)
+        print(f"[INFO] Generert korpus {scale:g}× ({total} dokumenter) på {time.perf_counter() - t0:.1f} s")
+        del corpus
+
+    # Operasjonene kjøres mot en kopi, slik at korpuset forblir urørt
+    work_dir = Path(corpus_root) / f"work_{scale:g}"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    shutil.copytree(corpus_dir, work_dir)
+
+    year = max(profile["per_year"], key=profile["per_year"].get)
+    size = sum(p.stat().st_size for p in corpus_dir.rglob("*.json"))
+    results = {}
+    for name in OPERATIONS:
+        r = measure(name, work_dir, year, timeout)
+        results[name] = r
+        if r["status"] == "ok":
+            delta = r["peak_rss_delta_mb"]
+            rss = f"{delta:7.1f}" if delta is not None else f"{'?':>7s}"
+            print(
+                f"  {scale:>5g}× {name:24s} {r['seconds']:9.3f} s  "
+                f"RSS +{rss} MB  skrevet {r['bytes_written'] / 1e6:8.1f} MB"
+            )
+        else:
+            print(f"  {scale:>5g}× {name:24s} {r['status'].upper()} (grense {timeout} s)")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return {"scale": scale, "year": year, "corpus_bytes": size, "operations": results}
+
+
+def compare(results, baseline, tolerance):
+    """Returnerer liste med regresjoner mot baseline."""
+    base = {
+        (s["scale"], name): r
+        for s in baseline.get("scales", []) for name, r in s["operations"].items()
+    }
+    regressions = []
+    for s in results["scales"]:
+        for name, r in s["operations"].items():
+            b = base.get((s["scale"], name))
+            if not b or b.get("status") != "ok":
+                continue
+            if r["status"] != "ok":
+                regressions.append(f"{s['scale']:g}× {name}: {r['status']} (baseline {b['seconds']} s)")
+                continue
+            limit = b["seconds"] * (1 + tolerance)
+            if r["seconds"] > limit and r["seconds"] - b["seconds"] > MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    f"{s['scale']:g}× {name}: {r['seconds']:.3f} s mot {b['seconds']:.3f} s "
+                    f"(+{(r['seconds'] / b['seconds'] - 1) * 100:.0f} %)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark av lagringslaget mot syntetiske korpus")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10],
+                        help="Korpusstørrelser som ganger dagens volum (f.eks. 1 10 100)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=600, help="Maks sekunder per operasjon")
+    parser.add_argument("--corpus-dir", help="Behold genererte korpus her mellom kjøringer")
+    parser.add_argument("--archive", default=str(ARCHIVE_DIR), help="Archive-katalog profilen leses fra")
+    parser.add_argument("--store", choices=("json", "sqlite"), default="json",
+                        help="Lagring som måles (setter POSTLISTE_STORE for operasjonene)")
+    parser.add_argument("--output", help="Skriv resultater som JSON til denne filen")
+    parser.add_argument("--baseline", help="Tidligere resultatfil å sammenligne mot")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Tillatt relativ økning i veggtid før det regnes som regresjon")
+    args = parser.parse_args()
+
+    os.environ[STORE_ENV] = args.store
+    profile = load_profile(args.archive)
+    corpus_root = args.corpus_dir or tempfile.mkdtemp(prefix="postliste-bench-")
+
+    print(f"=== Lagringsbenchmark ({args.store}): skala {', '.join(f'{s:g}×' for s in args.scales)} ===")
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "store": args.store,
+        "base_docs": sum(profile["per_year"].values()),
+        "scales": [],
+    }
+    try:
+        for scale in args.scales:
+            results["scales"].append(bench_scale(profile, scale, args.seed, args.timeout, corpus_root))
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_root, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"[INFO] Resultater lagret til {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("[ERROR] Ytelsesregresjoner mot baseline:")
+            for line in regressions:
+                print(f"         {line}")
+            sys.exit(1)
+        print(f"[INFO] Ingen regresjoner mot {args.baseline} (toleranse {args.tolerance * 100:.0f} %)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Konverterer shards og archive-filer mellom vanlig JSON-liste og kompakt
+format (src/scrapers/utils_compact.py).
+
+  python tools/compact_storage.py            # til kompakt format
+  python tools/compact_storage.py --expand   # tilbake til innrykket liste
+
+Dokumentene normaliseres underveis, så innholdet er det samme i begge
+formater. Filer som allerede har ønsket format hoppes over.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_compact import documents_from_json, is_compact, write_compact  # noqa: E402
+from utils_documents import normalize_documents  # noqa: E402
+
+DATA_DIR = Path("data")
+ARCHIVE_DIR = DATA_DIR / "archive"
+SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
+
+
+def atomic_write(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def storage_files():
+    """Shards fra index og archive-filene (ikke missing-filer eller ID-sett)."""
+    paths = []
+    if SHARD_INDEX_FILE.exists():
+        paths.extend(DATA_DIR / name for name in json.loads(SHARD_INDEX_FILE.read_text(encoding="utf-8")))
+    paths.extend(sorted(ARCHIVE_DIR.glob("postliste_*_*.json")))
+    return [p for p in paths if p.exists()]
+
+
+def convert(path, expand=False):
+    """Returnerer (bytes før, bytes etter) eller None hvis filen allerede har formatet."""
+    before = path.stat().st_size
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if is_compact(data) != expand:
+        return None
+
+    docs = normalize_documents(documents_from_json(data))
+    if expand:
+        atomic_write(path, docs)
+    else:
+        write_compact(path, docs)
+    return before, path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Konverterer shards og archive-filer til/fra kompakt format")
+    parser.add_argument("--expand", action="store_true", help="Skriv vanlige, innrykkede JSON-lister")
+    args = parser.parse_args()
+
+    total_before = total_after = 0
+    for path in storage_files():
+        result = convert(path, expand=args.expand)
+        if result is None:
+            print(f"[INFO] {path}: uendret")
+            continue
+        before, after = result
+        total_before += before
+        total_after += after
+        print(f"[INFO] {path}: {before / 1024:.0f} KB → {after / 1024:.0f} KB")
+
+    if total_before:
+        print(f"[INFO] Totalt {total_before / 1024:.0f} KB → {total_after / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Genererer et syntetisk postliste-korpus i en egen data-katalog.
+
+Dokumentene følger feltene og størrelsesfordelingen i data/archive/*.json:
+ekte dokumenter brukes som maler for dokumenttype, status, antall filer og
+tittellengde, mens titler bygges av ord fra ekte titler. dokumentID-er er
+stigende løpenumre per år i datorekkefølge, som på nettsiden.
+
+  python tools/gen_synthetic_corpus.py --scale 10 --out /tmp/korpus
+  python tools/gen_synthetic_corpus.py --docs 50000 --out /tmp/korpus
+
+Katalogen får samme oppsett og format som data/: archive/postliste_<år>_H1/H2.json,
+postliste_<n>.json og postliste_index.json. --scale 1 gir like mange
+dokumenter per år som arkivet har i dag.
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+import utils_files  # noqa: E402
+from utils_compact import read_documents, write_compact  # noqa: E402
+from utils_documents import content_hash, normalize_documents  # noqa: E402
+
+DATA_DIR = Path("data")
+ARCHIVE_DIR = DATA_DIR / "archive"
+
+LINK_PREFIX = (
+    "https://www.strand.kommune.no/tjenester/politikk-innsyn-og-medvirkning/"
+    "postliste-dokumenter-og-vedtak/sok-i-post-dokumenter-og-saker/#/details/"
+)
+FILE_PREFIX = "https://www.strand.kommune.no/api/presentation/v2/nye-innsyn/filer/"
+GUID = "6965376f__8677__47ea__a757__23e14c179149"
+TOKEN_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+# ---------------------------------------------------------
+#   Profil fra ekte data
+# ---------------------------------------------------------
+
+def load_profile(archive_dir=ARCHIVE_DIR):
+    """
+    Leser archive-filene og returnerer en profil:
+      templates: ekte dokumenter (maler for type, status, filer, lengder)
+      vocabulary: ord fra ekte titler
+      per_year: { år: antall unike dokumenter }
+    """
+    docs = {}
+    for path in sorted(Path(archive_dir).glob("postliste_*_*.json")):
+        try:
+            for d in normalize_documents(read_documents(path)):
+                docs[d["dokumentID"]] = d
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese {path}: {e}")
+
+    templates = [d for d in docs.values() if d.get("dato_iso")]
+    if not templates:
+        raise SystemExit(f"[ERROR] Fant ingen daterte dokumenter i {archive_dir}")
+
+    vocabulary = [w for d in templates for w in d["tittel"].split()]
+    per_year = Counter(int(d["dato_iso"][:4]) for d in templates)
+    return {"templates": templates, "vocabulary": vocabulary, "per_year": dict(per_year)}
+
+
+# ---------------------------------------------------------
+#   Generering
+# ---------------------------------------------------------
+
+def _token(rng, n=6):
+    return "".join(rng.choice(TOKEN_CHARS) for _ in range(n))
+
+
+def synth_document(rng, profile, year, seq, day):
+    """Ett syntetisk dokument basert på en tilfeldig ekte mal."""
+    template = rng.choice(profile["templates"])
+    words = max(1, len(template["tittel"].split()))
+    tittel = " ".join(rng.choice(profile["vocabulary"]) for _ in range(words))
+
+    case = rng.randint(1, 999999)
+    filer = []
+    for n, _f in enumerate(template["filer"], start=1):
+        kb = int(rng.lognormvariate(4.5, 1.2)) + 1
+        filer.append({
+            "tekst": f"{tittel if n == 1 else _title_variant(rng, profile)} (pdf, {kb}KB)",
+            "url": f"{FILE_PREFIX}v-{GUID}-{case}_{n}_A!d-{year}{seq:06d}!{_token(rng)}?pid=29",
+        })
+
+    doc = {
+        "tittel": tittel,
+        "dato": day.strftime("%d.%m.%Y"),
+        "dato_iso": day.isoformat(),
+        "dokumentID": f"{year}/{seq}",
+        "dokumenttype": template["dokumenttype"],
+        "avsender_mottaker": template["avsender_mottaker"],
+        "journal_link": (
+            f"{LINK_PREFIX}a-{GUID}-{year - rng.randint(0, 2)}{case:06d}!{_token(rng)}"
+            f"/d-{GUID}-{year}{seq:06d}!{_token(rng)}"
+        ),
+        "filer": filer,
+        "status": template["status"],
+    }
+    doc["hash"] = content_hash(doc)
+    return doc
+
+
+def _title_variant(rng, profile):
+    return " ".join(rng.choice(profile["vocabulary"]) for _ in range(rng.randint(2, 8)))
+
+
+def generate_year(rng, profile, year, count):
+    """count dokumenter for ett år, med stigende løpenumre i datorekkefølge."""
+    start = date(year, 1, 1)
+    days = (date(year, 12, 31) - start).days
+    dates = sorted(start + timedelta(days=rng.randint(0, days)) for _ in range(count))
+
+    # Samme tetthet i løpenumrene som i dag, men aldri tettere enn 1
+    base = profile["per_year"].get(year) or count
+    spacing = max(1, round(35 * base / count))
+
+    seq = rng.randint(1, 1000)
+    docs = []
+    for day in dates:
+        seq += rng.randint(1, 2 * spacing - 1) if spacing > 1 else 1
+        docs.append(synth_document(rng, profile, year, seq, day))
+    return docs
+
+
+def generate_corpus(profile, scale=1.0, docs=None, seed=1):
+    """
+    Returnerer { år: [dokumenter] } nyeste først. Antall per år følger
+    dagens fordeling ganget med scale, eller fordeles på docs totalt.
+    """
+    rng = random.Random(seed)
+    per_year = profile["per_year"]
+    total = sum(per_year.values())
+    if docs is not None:
+        scale = docs / total
+
+    corpus = {}
+    for year in sorted(per_year):
+        count = max(1, round(per_year[year] * scale))
+        corpus[year] = sorted(
+            generate_year(rng, profile, year, count),
+            key=lambda d: (d["dato_iso"], int(d["dokumentID"].split("/")[1])),
+            reverse=True,
+        )
+    return corpus
+
+
+# ---------------------------------------------------------
+#   Skriving
+# ---------------------------------------------------------
+
+def write_corpus(out_dir, corpus):
+    """
+    Skriver korpuset som en data-katalog i samme kompakte format som
+    scraperne: archive-filer per halvår og shards med hele datasettet.
+    Returnerer antall dokumenter.
+    """
+    out_dir = Path(out_dir)
+    archive_dir = out_dir / "archive"
+
+    for year, docs in corpus.items():
+        h1 = [d for d in docs if int(d["dato_iso"][5:7]) <= 6]
+        h2 = [d for d in docs if int(d["dato_iso"][5:7]) > 6]
+        write_compact(archive_dir / f"postliste_{year}_H1.json", h1)
+        write_compact(archive_dir / f"postliste_{year}_H2.json", h2)
+
+    all_docs = [d for year in sorted(corpus, reverse=True) for d in corpus[year]]
+    utils_files.set_data_dir(out_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        utils_files.save_postliste_sharded(all_docs)
+    return len(all_docs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genererer et syntetisk postliste-korpus")
+    parser.add_argument("--out", required=True, help="Data-katalog som skal skrives (f.eks. /tmp/korpus)")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", type=float, default=1.0, help="Ganger dagens volum per år (standard 1)")
+    size.add_argument("--docs", type=int, help="Totalt antall dokumenter")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--archive", default=str(ARCHIVE_DIR), help="Archive-katalog profilen leses fra")
+    args = parser.parse_args()
+
+    profile = load_profile(args.archive)
+    corpus = generate_corpus(profile, scale=args.scale, docs=args.docs, seed=args.seed)
+    total = write_corpus(args.out, corpus)
+    print(f"[INFO] Skrev {total} syntetiske dokumenter for {len(corpus)} år til {args.out}")
+
+
+if __name__ == "__main__":
+    main()
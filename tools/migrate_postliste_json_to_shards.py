@@ -1,7 +1,12 @@
 import json
+import sys
 from pathlib import Path
 from datetime import datetime, date
 
+# Gjenbruk den kanoniske normalisereren fra scraperne
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_documents import normalize_documents  # noqa: E402
+
 DATA_DIR = Path("data")
 LEGACY_FILE = DATA_DIR / "postliste.json"
 
@@ -51,13 +56,8 @@ def main():
 
     # Dedup basert på dokumentID
     merged = {}
-    for d in data:
-        if not isinstance(d, dict):
-            continue
-        did = d.get("dokumentID")
-        if not did:
-            continue
-        merged[did] = d
+    for d in normalize_documents(data):
+        merged[d["dokumentID"]] = d
 
     docs = list(merged.values())
     docs_sorted = sorted(docs, key=sort_key, reverse=True)
@@ -0,0 +1,131 @@
+import json
+import sys
+from pathlib import Path
+
+# Gjenbruk den kanoniske normalisereren fra scraperne
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_documents import normalize_documents, FIELD_ALIASES  # noqa: E402
+from utils_compact import decode_documents, is_compact, write_compact  # noqa: E402
+
+DATA_DIR = Path("data")
+ARCHIVE_DIR = DATA_DIR / "archive"
+SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
+CHANGES_FILE = DATA_DIR / "changes.json"
+
+
+def atomic_write(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def load_json_list(path):
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(data, list):
+            return data
+        print(f"[WARN] Filen {path} inneholder ikke en liste – hopper over.")
+        return None
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return None
+
+
+def load_documents(path):
+    """Returnerer (dokumenter, kompakt) for en shard/archive-fil, eller (None, False)."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return None, False
+    if is_compact(data):
+        return decode_documents(data), True
+    if isinstance(data, list):
+        return data, False
+    print(f"[WARN] Filen {path} inneholder ikke en liste – hopper over.")
+    return None, False
+
+
+def document_files():
+    """Alle filer som inneholder dokumentlister: shards, archive og missing."""
+    paths = []
+    if SHARD_INDEX_FILE.exists():
+        try:
+            paths.extend(DATA_DIR / name for name in json.loads(SHARD_INDEX_FILE.read_text(encoding="utf-8")))
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese shard-index: {e}")
+    paths.extend(sorted(ARCHIVE_DIR.glob("postliste_*.json")))
+    paths.extend(sorted(ARCHIVE_DIR.glob("missing_*.json")))
+    return [p for p in paths if p.exists()]
+
+
+def normalize_file(path):
+    """Normaliserer én fil i samme format. Returnerer (antall, endret, droppet)."""
+    data, compact = load_documents(path)
+    if data is None:
+        return 0, False, 0
+
+    normalized = normalize_documents(data)
+    dropped = len(data) - len(normalized)
+    # Sammenlign serialisert, slik at også feltrekkefølge telles som endring
+    changed = json.dumps(normalized, ensure_ascii=False) != json.dumps(data, ensure_ascii=False)
+    if changed:
+        if compact:
+            write_compact(path, normalized)
+        else:
+            atomic_write(path, normalized)
+    return len(normalized), changed, dropped
+
+
+def normalize_changes():
+    """Gir alias-felter i endringsloggen kanonisk navn (detalj_link → journal_link)."""
+    if not CHANGES_FILE.exists():
+        return 0
+
+    changes = load_json_list(CHANGES_FILE)
+    if changes is None:
+        return 0
+
+    renamed = 0
+    for c in changes:
+        endringer = c.get("endringer") if isinstance(c, dict) else None
+        if not isinstance(endringer, dict):
+            continue
+        if not any(alias in endringer and target not in endringer for alias, target in FIELD_ALIASES.items()):
+            continue
+        # Bygges på nytt slik at feltet beholder plassen sin
+        renamed_fields = {}
+        for key, value in endringer.items():
+            target = FIELD_ALIASES.get(key)
+            if target and target not in endringer:
+                renamed_fields[target] = value
+                renamed += 1
+            else:
+                renamed_fields[key] = value
+        c["endringer"] = renamed_fields
+
+    if renamed:
+        atomic_write(CHANGES_FILE, changes)
+    return renamed
+
+
+def main():
+    print("=== Normaliserer dokumenter til kanonisk skjema ===")
+
+    for path in document_files():
+        count, changed, dropped = normalize_file(path)
+        status = "✔ NORMALISERT" if changed else "OK (uendret)"
+        print(f"\nFil: {path}")
+        print(f"  Oppføringer: {count}")
+        if dropped:
+            print(f"  Fjernet (mangler dokumentID): {dropped}")
+        print(f"  STATUS: {status}")
+
+    renamed = normalize_changes()
+    print(f"\n[INFO] Endringslogg: {renamed} felt omdøpt til kanonisk navn.")
+
+
+if __name__ == "__main__":
+    main()
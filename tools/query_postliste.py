@@ -0,0 +1,110 @@
+"""
+Spørringer mot datasettet fra kommandolinjen (src/scrapers/utils_query.py).
+
+  python tools/query_postliste.py --avsender "statens vegvesen" --year 2012
+  python tools/query_postliste.py --status innsyn --older-than 90 --format csv
+  python tools/query_postliste.py --type "utgående dokument" --from 01.03.2013 --to 31.03.2013 --sort dokumentID --asc
+
+Filtrene løses mot offset-tabellene og sekundærindeksene i data/offsets/,
+så bare treffene dekodes. Resultatet strømmes som JSON Lines (standard)
+eller CSV til stdout; antall treff og tidsbruk skrives til stderr.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+import utils_files  # noqa: E402
+from utils_dates import parse_date_from_page  # noqa: E402
+from utils_documents import CANONICAL_FIELDS  # noqa: E402
+from utils_query import SORT_FIELDS, Query, run_query  # noqa: E402
+
+DATA_DIR = Path("data")
+
+DEFAULT_CSV_FIELDS = ["dato", "dokumentID", "dokumenttype", "status", "avsender_mottaker", "tittel", "journal_link"]
+
+
+def cli_date(value):
+    parsed = parse_date_from_page(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"Ugyldig dato: {value}. Bruk dd.mm.åååå eller åååå-mm-dd")
+    return parsed
+
+
+def cli_limit(value):
+    try:
+        limit = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ugyldig grense: {value}. Bruk et heltall")
+    if limit < 0:
+        raise argparse.ArgumentTypeError(f"Ugyldig grense: {value}. Kan ikke være negativ")
+    return limit
+
+
+def row_value(doc, field):
+    if field == "filer":
+        return " ".join(f["url"] for f in doc["filer"])
+    return doc.get(field) or ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spørringer mot postlisten via sekundærindeksene")
+    parser.add_argument("--from", dest="start", type=cli_date, help="Fra og med dato")
+    parser.add_argument("--to", dest="end", type=cli_date, help="Til og med dato")
+    parser.add_argument("--year", type=int, help="Kalenderår for dato")
+    parser.add_argument("--older-than", type=int, metavar="DAGER", help="Bare dokumenter eldre enn så mange dager")
+    parser.add_argument("--type", dest="dokumenttype", help="Dokumenttype (lik verdi, f.eks. \"Inngående dokument\")")
+    parser.add_argument("--status", help="Delstreng i status (f.eks. innsyn)")
+    parser.add_argument("--avsender", help="Delstreng i avsender/mottaker")
+    parser.add_argument("--tittel", help="Delstreng i tittel")
+    parser.add_argument("--sort", choices=SORT_FIELDS, default="dato")
+    parser.add_argument("--asc", action="store_true", help="Eldste/laveste først")
+    parser.add_argument("--limit", type=cli_limit, help="Høyst så mange dokumenter (0 gir ingen)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--fields", help=f"Kommaseparerte felt (standard: alle for jsonl, {','.join(DEFAULT_CSV_FIELDS)} for csv)")
+    args = parser.parse_args()
+
+    fields = args.fields.split(",") if args.fields else None
+    unknown = [f for f in fields or [] if f not in CANONICAL_FIELDS]
+    if unknown:
+        parser.error(f"Ukjente felt: {', '.join(unknown)}")
+
+    utils_files.set_data_dir(DATA_DIR)
+    q = Query(
+        start=args.start,
+        end=args.end,
+        year=args.year,
+        older_than=args.older_than,
+        dokumenttype=args.dokumenttype,
+        status=args.status,
+        avsender=args.avsender,
+        tittel=args.tittel,
+        sort=args.sort,
+        descending=not args.asc,
+        limit=args.limit,
+    )
+
+    started = time.perf_counter()
+    count = 0
+    if args.format == "csv":
+        fields = fields or DEFAULT_CSV_FIELDS
+        writer = csv.writer(sys.stdout)
+        writer.writerow(fields)
+        for doc in run_query(q):
+            writer.writerow([row_value(doc, f) for f in fields])
+            count += 1
+    else:
+        for doc in run_query(q):
+            if fields:
+                doc = {f: doc[f] for f in fields}
+            sys.stdout.write(json.dumps(doc, ensure_ascii=False) + "\n")
+            count += 1
+
+    print(f"[INFO] {count} treff på {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Vedlikehold av SQLite-lagringen (src/scrapers/utils_store.py).
+
+  python tools/sqlite_store.py import           # shards + changes.json → data/postliste.db
+  python tools/sqlite_store.py export           # data/postliste.db → shards + changes.json
+  python tools/sqlite_store.py search "bygg*"   # fulltekstsøk i tittel og avsender/mottaker
+  python tools/sqlite_store.py stats
+
+Scraperne bruker databasen når POSTLISTE_STORE=sqlite. Nettsiden leser
+fortsatt shards, så export må kjøres før publisering.
+"""
+import argparse
+import contextlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+import utils_files  # noqa: E402
+from utils_store import SqliteStore  # noqa: E402
+
+DATA_DIR = Path("data")
+
+
+def cmd_import(store, args):
+    utils_files.import_into_store(store)
+
+
+def cmd_export(store, args):
+    utils_files.export_store(store)
+
+
+def cmd_search(store, args):
+    ids = store.search(args.query, limit=args.limit)
+    if not ids:
+        print("[INFO] Ingen treff.")
+        return
+    docs = {d["dokumentID"]: d for d in store.load_all()}
+    for dokid in ids:
+        d = docs[dokid]
+        print(f"{dokid:>12}  {d['dato_iso'] or '':10}  {d['tittel']}  ({d['avsender_mottaker']})")
+
+
+def cmd_stats(store, args):
+    conn = store.conn
+    for table in ("documents", "files", "changes"):
+        print(f"[INFO] {table}: {conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]} rader")
+    print(f"[INFO] FTS5: {'ja' if store.fts else 'nei'}")
+    print(f"[INFO] Størrelse: {store.path.stat().st_size / 1024:.0f} KB ({store.path})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import, eksport og søk i SQLite-lagringen")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("import", help="Les shards og changes.json inn i databasen")
+    sub.add_parser("export", help="Skriv shards og changes.json fra databasen")
+    search = sub.add_parser("search", help="Fulltekstsøk (FTS5-syntaks)")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    sub.add_parser("stats", help="Antall rader per tabell")
+    args = parser.parse_args()
+
+    utils_files.set_data_dir(DATA_DIR)
+    store = SqliteStore(utils_files.STORE_DB_FILE)
+    with contextlib.closing(store):
+        {"import": cmd_import, "export": cmd_export, "search": cmd_search, "stats": cmd_stats}[args.command](store, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+Validerer hele datasettet i én runde:
+
+  - archive-filer  data/archive/postliste_<år>_<H1|H2|Q1–Q4|full>.json
+  - missing-filer  data/archive/missing_<år>.json
+  - shards         data/postliste_<n>.json + data/postliste_index.json
+  - legacy         data/postliste.json (hvis den fortsatt finnes)
+
+Hver fil leses og sjekkes av en egen prosess (én fil per worker), og
+resultatene slås sammen til én rapport:
+
+  - år/periode: dato_iso stemmer med årstall og etikett i filnavnet
+  - duplikater: innen hver fil, på tvers av shards og innen hver
+    archive-inndeling (H, Q, full); konflikter mellom lagrene
+  - skjema: dokumentet er i kanonisk form (normalize_document)
+  - index: alle shards i index finnes, alle shards på disk er i index
+  - migrering: alle dokumenter i legacy-filen finnes i shards
+
+  python tools/validate_dataset.py
+  python tools/validate_dataset.py --report validation_report.json
+  python tools/validate_dataset.py --fix
+
+Avslutter med kode 1 hvis det finnes feil (etter eventuelle fikser).
+Erstatter verify_archive_years.py, fix_archive_years.py,
+find_duplicates.py og verify_migration.py.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Gjenbruk den kanoniske normalisereren fra scraperne
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_documents import CANONICAL_FIELDS, normalize_document  # noqa: E402
+from utils_compact import documents_from_json, is_compact, write_compact  # noqa: E402
+
+DATA_DIR = Path("data")
+ARCHIVE_DIR = DATA_DIR / "archive"
+SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
+LEGACY_FILE = DATA_DIR / "postliste.json"
+
+SHARD_MAX_BYTES = 50 * 1024 * 1024
+
+SHARD_RE = re.compile(r"^postliste_(\d+)\.json$")
+ARCHIVE_RE = re.compile(r"^postliste_(\d{4})_(H[12]|Q[1-4]|full)\.json$")
+MISSING_RE = re.compile(r"^missing_(\d{4})\.json$")
+
+# Maks antall eksempler per funn i rapporten
+MAX_EXAMPLES = 20
+
+
+def atomic_write(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def label_months(label):
+    """Måneder en archive-etikett dekker."""
+    if label == "full":
+        return range(1, 13)
+    n = int(label[1])
+    if label[0] == "H":
+        return range(6 * (n - 1) + 1, 6 * n + 1)
+    return range(3 * (n - 1) + 1, 3 * n + 1)
+
+
+# ---------------------------------------------------------
+#   Finn filer
+# ---------------------------------------------------------
+
+def load_index():
+    """Returnerer (liste av shard-navn, feilmelding eller None)."""
+    if not SHARD_INDEX_FILE.exists():
+        return [], "postliste_index.json finnes ikke"
+    try:
+        names = json.loads(SHARD_INDEX_FILE.read_text(encoding="utf-8"))
+    except Exception as e:
+        return [], f"kan ikke leses: {e}"
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        return [], "har feil format (forventer liste av filnavn)"
+    return names, None
+
+
+def discover_files(index_names):
+    """
+    Returnerer oppgaver (type, sti, år, etikett) for alle filer som skal
+    sjekkes. Shards som ligger på disk men ikke i index tas med som
+    type "shard_uindeksert".
+    """
+    tasks = []
+    for path in sorted(ARCHIVE_DIR.glob("*.json")):
+        m = ARCHIVE_RE.match(path.name)
+        if m:
+            tasks.append(("archive", str(path), int(m.group(1)), m.group(2)))
+            continue
+        m = MISSING_RE.match(path.name)
+        if m:
+            tasks.append(("missing", str(path), int(m.group(1)), None))
+
+    indexed = set(index_names)
+    for name in index_names:
+        path = DATA_DIR / name
+        if path.exists():
+            tasks.append(("shard", str(path), None, None))
+    for path in sorted(DATA_DIR.glob("postliste_*.json")):
+        if SHARD_RE.match(path.name) and path.name not in indexed:
+            tasks.append(("shard_uindeksert", str(path), None, None))
+
+    if LEGACY_FILE.exists():
+        tasks.append(("legacy", str(LEGACY_FILE), None, None))
+    return tasks
+
+
+# ---------------------------------------------------------
+#   Sjekk av én fil (kjøres i worker-prosess)
+# ---------------------------------------------------------
+
+def scan_file(task):
+    """
+    Leser én fil og returnerer en kompakt oppsummering:
+      docs:         [(dokumentID, indeks, hash)]
+      invalid:      indekser som ikke er dokumenter med dokumentID
+      schema:       indekser som ikke er i kanonisk form
+      schema_fields: { felt: antall } for felter som avviker fra kanonisk form
+      wrong_year:   indekser med dato_iso utenfor årstallet i filnavnet
+      wrong_period: indekser med dato utenfor etiketten (H1, Q3, …)
+    """
+    kind, path, year, label = task
+    result = {
+        "kind": kind,
+        "path": path,
+        "year": year,
+        "label": label,
+        "bytes": os.path.getsize(path),
+        "count": 0,
+        "error": None,
+        "docs": [],
+        "invalid": [],
+        "schema": [],
+        "schema_fields": {},
+        "wrong_year": [],
+        "wrong_period": [],
+    }
+
+    try:
+        data = documents_from_json(json.loads(Path(path).read_text(encoding="utf-8")))
+    except Exception as e:
+        result["error"] = f"kan ikke leses: {e}"
+        return result
+
+    result["count"] = len(data)
+    months = label_months(label) if label else None
+
+    for i, doc in enumerate(data):
+        nd = normalize_document(doc)
+        if nd is None:
+            result["invalid"].append(i)
+            continue
+        if nd != doc or tuple(doc) != CANONICAL_FIELDS:
+            result["schema"].append(i)
+            fields = [f for f in set(doc) | set(nd) if doc.get(f) != nd.get(f)] or ["rekkefølge"]
+            for f in fields:
+                result["schema_fields"][f] = result["schema_fields"].get(f, 0) + 1
+        result["docs"].append((nd["dokumentID"], i, nd["hash"]))
+
+        if year is None:
+            continue
+        iso = nd["dato_iso"]
+        if not iso or int(iso[:4]) != year:
+            result["wrong_year"].append(i)
+        elif months and int(iso[5:7]) not in months:
+            result["wrong_period"].append(i)
+
+    return result
+
+
+# ---------------------------------------------------------
+#   Sammenstilling
+# ---------------------------------------------------------
+
+class Report:
+    def __init__(self):
+        self.issues = []
+
+    def add(self, severity, check, message, path=None, examples=None, count=None):
+        examples = list(examples or [])
+        self.issues.append({
+            "severity": severity,
+            "check": check,
+            "path": path,
+            "message": message,
+            "count": count if count is not None else len(examples) or 1,
+            "examples": examples[:MAX_EXAMPLES],
+        })
+
+    def count(self, severity):
+        return sum(1 for i in self.issues if i["severity"] == severity)
+
+
+def store_of(kind):
+    return "shards" if kind == "shard" else kind
+
+
+def duplicate_group(res):
+    """Filer i samme gruppe skal ikke dele dokumentIDer."""
+    if res["kind"] == "shard":
+        return "shards"
+    if res["kind"] == "archive":
+        scheme = "full" if res["label"] == "full" else res["label"][0]
+        return f"archive:{res['year']}:{scheme}"
+    return res["path"]
+
+
+def check_index(report, index_names, index_error):
+    if index_error:
+        report.add("error", "index", f"postliste_index.json {index_error}", path=str(SHARD_INDEX_FILE))
+        return
+
+    seen = set()
+    for name in index_names:
+        if name in seen:
+            report.add("error", "index", f"{name} står flere ganger i index", path=str(SHARD_INDEX_FILE))
+        seen.add(name)
+        if not SHARD_RE.match(name):
+            report.add("error", "index", f"{name} er ikke et gyldig shard-navn", path=str(SHARD_INDEX_FILE))
+        elif not (DATA_DIR / name).exists():
+            report.add("error", "index", f"{name} står i index, men finnes ikke", path=str(SHARD_INDEX_FILE))
+
+    numbers = [int(SHARD_RE.match(n).group(1)) for n in index_names if SHARD_RE.match(n)]
+    if numbers != sorted(numbers):
+        report.add("warn", "index", "shards står ikke i numerisk rekkefølge", path=str(SHARD_INDEX_FILE))
+
+
+def analyze(results, index_names, index_error):
+    """
+    Kjører sjekkene på tvers av filene. Returnerer (Report, fix_plan) der
+    fix_plan er { sti: { "drop": set(indekser), "normalize": bool } }.
+    """
+    report = Report()
+    plan = defaultdict(lambda: {"drop": set(), "normalize": False})
+
+    check_index(report, index_names, index_error)
+
+    for res in results:
+        path = res["path"]
+        if res["error"]:
+            report.add("error", "fil", res["error"], path=path)
+            continue
+        if res["kind"] == "shard_uindeksert":
+            report.add("error", "index", "shard finnes på disk, men ikke i index", path=path)
+        if res["kind"].startswith("shard") and res["bytes"] > SHARD_MAX_BYTES:
+            report.add("warn", "index", f"shard er større enn {SHARD_MAX_BYTES // (1024 * 1024)} MB", path=path)
+        if res["count"] == 0 and res["kind"] == "archive":
+            report.add("warn", "år", "tom archive-fil", path=path)
+
+        if res["invalid"]:
+            report.add(
+                "error", "skjema", "oppføringer uten dokumentID", path=path,
+                examples=[f"indeks {i}" for i in res["invalid"]],
+            )
+            plan[path]["drop"].update(res["invalid"])
+        if res["schema"]:
+            by_index = {i: did for did, i, _h in res["docs"]}
+            fields = ", ".join(f"{f} ({n})" for f, n in sorted(res["schema_fields"].items()))
+            report.add(
+                "warn", "skjema", f"dokumenter er ikke i kanonisk form: {fields}", path=path,
+                examples=[by_index[i] for i in res["schema"]],
+            )
+            plan[path]["normalize"] = True
+        if res["wrong_year"]:
+            by_index = {i: did for did, i, _h in res["docs"]}
+            report.add(
+                "error", "år", f"dokumenter med dato utenfor {res['year']}", path=path,
+                examples=[by_index[i] for i in res["wrong_year"]],
+            )
+            if res["kind"] == "archive":
+                plan[path]["drop"].update(res["wrong_year"])
+        if res["wrong_period"]:
+            by_index = {i: did for did, i, _h in res["docs"]}
+            report.add(
+                "warn", "år", f"dokumenter med dato utenfor {res['label']}", path=path,
+                examples=[by_index[i] for i in res["wrong_period"]],
+            )
+
+    ok = [r for r in results if not r["error"]]
+
+    # Duplikater innen hver gruppe: første forekomst beholdes, men
+    # forekomster i riktig periode går foran feilplasserte
+    groups = defaultdict(list)
+    for res in ok:
+        groups[duplicate_group(res)].append(res)
+    for group, members in sorted(groups.items()):
+        occurrences = []
+        for res in members:
+            misplaced = set(res["wrong_period"])
+            drop = plan[res["path"]]["drop"]
+            occurrences.extend(
+                (i in misplaced, res["path"], did, i)
+                for did, i, _h in res["docs"] if i not in drop
+            )
+        occurrences.sort(key=lambda o: o[0])
+
+        first = {}
+        dupes = defaultdict(list)
+        for _misplaced, path, did, i in occurrences:
+            if did in first:
+                dupes[did].append(f"{Path(path).name}[{i}]")
+                plan[path]["drop"].add(i)
+            else:
+                first[did] = f"{Path(path).name}[{i}]"
+        if dupes:
+            report.add(
+                "error", "duplikat", f"{len(dupes)} dokumentIDer forekommer flere ganger i {group}",
+                examples=[f"{did}: {first[did]}, {', '.join(locs)}" for did, locs in sorted(dupes.items())],
+                count=len(dupes),
+            )
+
+    # På tvers av lagrene
+    hashes = defaultdict(lambda: defaultdict(set))  # did -> lager -> {hash}
+    for res in ok:
+        for did, _i, h in res["docs"]:
+            hashes[did][store_of(res["kind"])].add(h)
+
+    conflicts = sorted(
+        did for did, stores in hashes.items()
+        if len(set().union(*stores.values())) > 1
+    )
+    if conflicts:
+        report.add(
+            "warn", "duplikat", "dokumentIDer med ulikt innhold i forskjellige filer",
+            examples=conflicts, count=len(conflicts),
+        )
+
+    for res in ok:
+        if res["kind"] != "missing":
+            continue
+        stale = [(did, i) for did, i, _h in res["docs"] if "archive" in hashes[did]]
+        if stale:
+            report.add(
+                "warn", "duplikat", "dokumenter i missing-filen finnes allerede i archive",
+                path=res["path"], examples=[did for did, _i in stale],
+            )
+            plan[res["path"]]["drop"].update(i for _did, i in stale)
+
+    legacy_ids = {did for did, stores in hashes.items() if "legacy" in stores}
+    if legacy_ids:
+        not_migrated = sorted(did for did in legacy_ids if "shards" not in hashes[did])
+        if not_migrated:
+            report.add(
+                "error", "migrering", "dokumenter i postliste.json mangler i shards",
+                path=str(LEGACY_FILE), examples=not_migrated, count=len(not_migrated),
+            )
+
+    plan = {p: a for p, a in plan.items() if a["drop"] or a["normalize"]}
+    return report, plan
+
+
+# ---------------------------------------------------------
+#   Fikser
+# ---------------------------------------------------------
+
+def fix_file(task):
+    """
+    Fjerner oppføringer og/eller normaliserer én fil i samme format som den
+    hadde (kompakt eller vanlig liste). Returnerer (sti, beholdt, fjernet).
+    """
+    path, drop, normalize = task
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    data = documents_from_json(raw)
+    kept = []
+    for i, doc in enumerate(data):
+        if i in drop:
+            continue
+        kept.append(normalize_document(doc) if normalize else doc)
+    if is_compact(raw):
+        write_compact(path, kept)
+    else:
+        atomic_write(path, kept)
+    return path, len(kept), len(data) - len(kept)
+
+
+def fix_index(results):
+    """Skriver index på nytt med alle lesbare shards i numerisk rekkefølge."""
+    names = sorted(
+        (Path(r["path"]).name for r in results if r["kind"].startswith("shard") and not r["error"]),
+        key=lambda n: int(SHARD_RE.match(n).group(1)),
+    )
+    atomic_write(SHARD_INDEX_FILE, names)
+    return names
+
+
+def apply_fixes(pool_map, results, plan, report):
+    fixes = []
+    tasks = [(p, a["drop"], a["normalize"]) for p, a in sorted(plan.items())]
+    for path, kept, removed in pool_map(fix_file, tasks):
+        fixes.append({"path": path, "kept": kept, "removed": removed})
+        print(f"[INFO] Fikset {path}: beholdt {kept}, fjernet {removed}")
+
+    if any(i["check"] == "index" and i["severity"] == "error" for i in report.issues):
+        names = fix_index(results)
+        fixes.append({"path": str(SHARD_INDEX_FILE), "shards": names})
+        print(f"[INFO] Skrev {SHARD_INDEX_FILE} på nytt med {len(names)} shards")
+    return fixes
+
+
+# ---------------------------------------------------------
+#   Main
+# ---------------------------------------------------------
+
+def run(workers, fix=False):
+    start = time.monotonic()
+    index_names, index_error = load_index()
+    tasks = discover_files(index_names)
+    # Største filer først gir jevnere fordeling på workerne
+    tasks.sort(key=lambda t: os.path.getsize(t[1]), reverse=True)
+
+    print(f"[INFO] Validerer {len(tasks)} filer med {workers} worker(e)…")
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pool_map = (lambda fn, items: pool.map(fn, items, chunksize=1)) if pool else map
+    try:
+        results = list(pool_map(scan_file, tasks))
+        results.sort(key=lambda r: (r["kind"], r["path"]))
+        report, plan = analyze(results, index_names, index_error)
+
+        fixes = []
+        if fix and (plan or index_error or report.count("error")):
+            fixes = apply_fixes(pool_map, results, plan, report)
+            index_names, index_error = load_index()
+            results = list(pool_map(scan_file, discover_files(index_names)))
+            results.sort(key=lambda r: (r["kind"], r["path"]))
+            report, _plan = analyze(results, index_names, index_error)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    ids = {did for r in results for did, _i, _h in r["docs"]}
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "workers": workers,
+        "seconds": round(time.monotonic() - start, 3),
+        "summary": {
+            "files": len(results),
+            "documents": sum(r["count"] for r in results),
+            "unique_ids": len(ids),
+            "errors": report.count("error"),
+            "warnings": report.count("warn"),
+        },
+        "files": [
+            {k: r[k] for k in ("kind", "path", "year", "label", "bytes", "count", "error")}
+            for r in results
+        ],
+        "issues": report.issues,
+        "fixes": fixes,
+    }
+
+
+def print_report(result):
+    for issue in result["issues"]:
+        tag = "[ERROR]" if issue["severity"] == "error" else "[WARN]"
+        where = f" ({issue['path']})" if issue["path"] else ""
+        count = f" – {issue['count']} stk" if issue["examples"] else ""
+        print(f"{tag} {issue['check']}: {issue['message']}{where}{count}")
+        for ex in issue["examples"][:5]:
+            print(f"         {ex}")
+
+    s = result["summary"]
+    print(
+        f"[INFO] {s['files']} filer, {s['documents']} oppføringer, {s['unique_ids']} unike dokumentIDer "
+        f"på {result['seconds']} s"
+    )
+    if s["errors"]:
+        print(f"STATUS: ❗ {s['errors']} feil, {s['warnings']} advarsler")
+    else:
+        print(f"STATUS: ✔ OK ({s['warnings']} advarsler)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validerer archive, missing, shards og index i én runde")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Antall prosesser (standard: antall kjerner)")
+    parser.add_argument("--report", help="Skriv rapporten som JSON til denne filen")
+    parser.add_argument("--fix", action="store_true",
+                        help="Fjern duplikater og feil år, normaliser dokumenter og skriv index på nytt")
+    args = parser.parse_args()
+
+    result = run(max(1, args.workers), fix=args.fix)
+    print_report(result)
+
+    if args.report:
+        atomic_write(args.report, result)
+        print(f"[INFO] Rapport skrevet til {args.report}")
+
+    sys.exit(1 if result["summary"]["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+// ===============================
+//  compact.js
+//  Dekoder kompakt lagringsformat (postliste-compact), også
+//  linje for linje fra data/publish/
+//  Samme format som src/scrapers/utils_compact.py
+// ===============================
+
+const COMPACT_FORMAT = "postliste-compact";
+const COMPACT_VERSION = 1;
+
+function formatDate(iso) {
+    // "2013-06-30" → "30.06.2013"
+    return iso ? `${iso.slice(8, 10)}.${iso.slice(5, 7)}.${iso.slice(0, 4)}` : "";
+}
+
+function checkHeader(data) {
+    if (!data || data.format !== COMPACT_FORMAT) {
+        throw new Error("Ukjent dataformat");
+    }
+    if (data.version !== COMPACT_VERSION) {
+        throw new Error(`Ukjent versjon ${data.version} av ${COMPACT_FORMAT}`);
+    }
+}
+
+// Funksjon som dekoder én rad med prefiksene og verdilistene i headeren
+export function rowDecoder(header) {
+    checkHeader(header);
+
+    const prefixes = header.prefixes;
+    const types = header.values.dokumenttype;
+    const senders = header.values.avsender_mottaker;
+    const statuses = header.values.status;
+
+    return ([tittel, iso, dokid, t, am, lp, lrest, filer, st, hash]) => ({
+        tittel,
+        dato: formatDate(iso),
+        dato_iso: iso,
+        dokumentID: dokid,
+        dokumenttype: types[t],
+        avsender_mottaker: senders[am],
+        journal_link: prefixes[lp] + lrest,
+        filer: filer.map(([tekst, p, rest]) => ({ tekst, url: prefixes[p] + rest })),
+        status: statuses[st],
+        hash
+    });
+}
+
+// Returnerer en liste med dokumenter, enten filen er kompakt eller en vanlig liste
+export function decodeDocuments(data) {
+    if (Array.isArray(data)) {
+        return data;
+    }
+    const decode = rowDecoder(data);
+    return data.rows.map(decode);
+}
+
+// Leser linjeformatet fra data/publish/ (header på første linje, så én rad
+// per linje) mens det lastes ned. onDocs kalles med dokumentene fra hver bit.
+export async function streamDocuments(response, onDocs) {
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let decode = null;
+    let rest = "";
+    for (;;) {
+        const { done, value } = await reader.read();
+        const text = rest + (value || "");
+        const lines = text.split("\n");
+        rest = done ? "" : lines.pop();
+
+        const docs = [];
+        for (const line of lines) {
+            if (!line) continue;
+            if (decode) docs.push(decode(JSON.parse(line)));
+            else decode = rowDecoder(JSON.parse(line));
+        }
+        if (docs.length) onDocs(docs);
+        if (done) return;
+    }
+}
@@ -0,0 +1,94 @@
+// ===============================
+//  data_client.js
+//  Hovedtrådens side av data_worker.js: sender forespørsler og
+//  returnerer promises med svarene.
+// ===============================
+
+let worker = null;
+let nextId = 1;
+const pending = new Map();
+const listeners = { progress: [], ready: [], error: [] };
+let loadError = null;
+
+// Datasettet kunne ikke lastes: varsle lytterne og avvis ventende forespørsler
+function fail(message) {
+  if (loadError) return;
+  loadError = { type: "error", message };
+  listeners.error.forEach(fn => fn(loadError));
+  for (const p of pending.values()) p.reject(new Error(message));
+  pending.clear();
+}
+
+function getWorker() {
+  if (worker) return worker;
+  worker = new Worker(new URL("./data_worker.js", import.meta.url), { type: "module" });
+  worker.addEventListener("message", event => {
+    const msg = event.data;
+    if (msg.id === undefined) {
+      if (msg.type === "error") fail(msg.message);
+      else (listeners[msg.type] || []).forEach(fn => fn(msg));
+      return;
+    }
+    const p = pending.get(msg.id);
+    if (!p) return;
+    pending.delete(msg.id);
+    if (msg.error) p.reject(new Error(msg.error));
+    else p.resolve(msg);
+  });
+  worker.addEventListener("error", e => {
+    console.error("Datatråden feilet:", e.message || e);
+    fail(e.message || "Datatråden feilet");
+  });
+  return worker;
+}
+
+function request(type, payload = {}) {
+  const id = nextId++;
+  return new Promise((resolve, reject) => {
+    if (loadError) return reject(new Error(loadError.message));
+    pending.set(id, { resolve, reject });
+    getWorker().postMessage({ id, type, ...payload });
+  });
+}
+
+// Starter datatråden (lasting begynner med en gang)
+export function startData() {
+  getWorker();
+}
+
+// fn({ loaded, expected }) mens shardene lastes
+export function onProgress(fn) {
+  listeners.progress.push(fn);
+  getWorker();
+}
+
+// fn({ totalAll }) når datasettet er klart
+export function onReady(fn) {
+  listeners.ready.push(fn);
+  getWorker();
+}
+
+// fn({ message }) hvis datasettet ikke kunne lastes (også etter at det skjedde)
+export function onError(fn) {
+  listeners.error.push(fn);
+  if (loadError) fn(loadError);
+  getWorker();
+}
+
+// Én side: { items, total, totalAll, page }
+export function queryPage(query, page, perPage) {
+  return request("query", { query, page, perPage });
+}
+
+export async function queryCSV(query) {
+  return (await request("csv", { query })).csv;
+}
+
+export async function queryStats() {
+  return (await request("stats")).stats;
+}
+
+// { dokumentID: dokument } for de gitte ID-ene
+export async function getDocuments(ids) {
+  return (await request("documents", { ids: Array.from(ids) })).docs;
+}
@@ -0,0 +1,77 @@
+// ===============================
+//  data_worker.js
+//  Datatråd for postlisten og dashboardene: laster shards (og deltaer),
+//  holder indeksen og svarer på spørringer, så hovedtråden bare rendrer.
+//
+//  Meldinger inn  { id, type, ... }:
+//    query      { query, page, perPage }  → { items, total, totalAll, page }
+//    csv        { query }                 → { csv }
+//    stats      {}                        → { stats }   (stats.js computeStats)
+//    documents  { ids }                   → { docs: { dokumentID: dokument } }
+//  Meldinger ut uten id:
+//    { type: "progress", loaded, expected }  mens shardene lastes
+//    { type: "ready", totalAll }             når datasettet er klart
+//    { type: "error", message }              når datasettet ikke kunne lastes
+//  Svar har samme id som forespørselen; feil gis som { id, error }.
+// ===============================
+
+import { loadPostliste } from "./endringer_data.js";
+import { filterAndSort, indexDocument, toCSV } from "./query.js";
+import { computeStats } from "./stats.js";
+
+let map = {};
+let rows = [];
+let loadError = null;
+
+const ready = loadPostliste((loaded, expected) => {
+  self.postMessage({ type: "progress", loaded, expected });
+}).then(result => {
+  map = result;
+  rows = Object.values(map).map(indexDocument);
+  self.postMessage({ type: "ready", totalAll: rows.length });
+}).catch(e => {
+  loadError = String(e && e.message || e);
+  self.postMessage({ type: "error", message: loadError });
+});
+
+const handlers = {
+  query({ query, page, perPage }) {
+    const filtered = filterAndSort(rows, query);
+    const maxPage = Math.ceil(filtered.length / perPage) || 1;
+    page = Math.min(Math.max(page, 1), maxPage);
+    const start = (page - 1) * perPage;
+    return {
+      items: filtered.slice(start, start + perPage).map(r => r.doc),
+      total: filtered.length,
+      totalAll: rows.length,
+      page,
+    };
+  },
+
+  csv({ query }) {
+    return { csv: toCSV(filterAndSort(rows, query).map(r => r.doc)) };
+  },
+
+  stats() {
+    return { stats: computeStats(rows.map(r => r.doc)) };
+  },
+
+  documents({ ids }) {
+    const docs = {};
+    for (const id of ids) {
+      if (map[id]) docs[id] = map[id];
+    }
+    return { docs };
+  },
+};
+
+self.addEventListener("message", async event => {
+  const { id, type } = event.data;
+  try {
+    await ready;
+    if (loadError) throw new Error(loadError);
+    self.postMessage({ id, ...handlers[type](event.data) });
+  } catch (e) {
+    self.postMessage({ id, error: String(e && e.message || e) });
+  }
+});
@@ -0,0 +1,89 @@
+// ===============================
+//  deltas.js
+//  Lokal kopi av postlisten (IndexedDB) som holdes oppdatert med
+//  deltaene fra data/deltas/ (src/scrapers/utils_deltas.py)
+// ===============================
+
+// data/deltas/ relativt til denne modulen (brukes også fra data_worker.js)
+const DELTAS_URL = new URL("../../data/deltas/", import.meta.url);
+
+const DB_NAME = "postliste";
+const DB_STORE = "snapshot";
+const DB_KEY = "current";
+
+function openDb() {
+    return new Promise((resolve, reject) => {
+        const req = indexedDB.open(DB_NAME, 1);
+        req.onupgradeneeded = () => req.result.createObjectStore(DB_STORE);
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+async function withStore(mode, fn) {
+    const db = await openDb();
+    try {
+        return await new Promise((resolve, reject) => {
+            const tx = db.transaction(DB_STORE, mode);
+            const req = fn(tx.objectStore(DB_STORE));
+            tx.oncomplete = () => resolve(req.result);
+            tx.onerror = () => reject(tx.error);
+        });
+    } finally {
+        db.close();
+    }
+}
+
+// { seq, docs: { dokumentID: dokument } } eller null
+export async function loadCachedPostliste() {
+    if (!("indexedDB" in self)) return null;
+    try {
+        return (await withStore("readonly", s => s.get(DB_KEY))) || null;
+    } catch (e) {
+        console.warn("Kunne ikke lese lokal kopi:", e);
+        return null;
+    }
+}
+
+export async function saveCachedPostliste(seq, docs) {
+    if (!("indexedDB" in self)) return;
+    try {
+        await withStore("readwrite", s => s.put({ seq, docs }, DB_KEY));
+    } catch (e) {
+        console.warn("Kunne ikke lagre lokal kopi:", e);
+    }
+}
+
+// data/deltas/manifest.json eller null (ingen deltaer publisert)
+export async function loadDeltaManifest() {
+    try {
+        const res = await fetch(new URL("manifest.json", DELTAS_URL), { cache: "no-cache" });
+        return res.ok ? await res.json() : null;
+    } catch (e) {
+        return null;
+    }
+}
+
+// Kan et datasett per seq oppdateres med deltaene i manifestet?
+export function canCatchUp(manifest, seq) {
+    if (seq == null || seq > manifest.latest_seq) return false;
+    if (seq === manifest.latest_seq) return true;
+    const first = manifest.deltas[0];
+    return !!first && first.seq <= seq + 1;
+}
+
+// Henter og bruker deltaene etter seq på map (endres på stedet)
+export async function applyDeltas(map, manifest, seq) {
+    for (const entry of manifest.deltas) {
+        if (entry.seq <= seq) continue;
+        const res = await fetch(new URL(entry.file, DELTAS_URL), { cache: "no-cache" });
+        const delta = await res.json();
+        for (const d of delta.added.concat(delta.updated)) {
+            map[d.dokumentID] = d;
+        }
+        for (const id of delta.removed) {
+            delete map[id];
+        }
+    }
+    return map;
+}
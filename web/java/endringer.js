@@ -3,7 +3,8 @@
 // ===============================
 
 // Importer moduler
-import { loadChanges, loadPostliste } from "./endringer_data.js";
+import { loadChanges } from "./endringer_data.js";
+import { getDocuments } from "./data_client.js";
 import { renderKPIs } from "./endringer_kpi.js";
 import { renderGraphs } from "./endringer_graphs.js";
 import { renderTables } from "./endringer_tables.js";
@@ -16,9 +17,9 @@ import { renderTables } from "./endringer_tables.js";
 async function initDashboard() {
     console.log("📊 Initialiserer endringsdashboard...");
 
-    // 1. Last data
+    // 1. Last data; datatråden laster shardene og sender bare dokumentene endringene gjelder
     const changes = await loadChanges();
-    const postliste = await loadPostliste();
+    const postliste = await getDocuments(new Set(changes.map(c => c.dokumentID)));
 
     // 2. KPI-er
     renderKPIs(changes, postliste);
@@ -3,8 +3,14 @@
 //  Laster og parser datafiler
 // ===============================
 
+import { decodeDocuments, streamDocuments } from "./compact.js";
+import { applyDeltas, canCatchUp, loadCachedPostliste, loadDeltaManifest, saveCachedPostliste } from "./deltas.js";
+
+// data/ relativt til denne modulen, så stiene stemmer også i data_worker.js
+const DATA_URL = new URL("../../data/", import.meta.url);
+
 export async function loadChanges() {
-    const res = await fetch("../data/changes.json");
+    const res = await fetch(new URL("changes.json", DATA_URL));
     const data = await res.json();
 
     // Sorter nyeste først
@@ -15,26 +21,107 @@ export async function loadChanges() {
 //  Laster shards i stedet for postliste.json
 // ===============================
 
-export async function loadPostliste() {
-    // 1. Last indexfilen
-    const indexRes = await fetch("../data/postliste_index.json");
+// Shards med innholdshash i navnet endrer seg aldri og caches for alltid
+const SHARD_CACHE = "postliste-shards-v2";
+
+// Publiserte shards fra data/publish/manifest.json (linjeformat), ellers
+// arbeidsshardene fra postliste_index.json
+async function shardSources() {
+    try {
+        const res = await fetch(new URL("publish/manifest.json", DATA_URL), { cache: "no-cache" });
+        if (res.ok) {
+            const manifest = await res.json();
+            return {
+                published: true,
+                urls: manifest.shards.map(s => new URL(`publish/${s.file}`, DATA_URL).href),
+                rows: manifest.shards.reduce((n, s) => n + (s.rows || 0), 0),
+                seq: manifest.delta_seq ?? null,
+            };
+        }
+    } catch (e) {
+        console.warn("Fant ikke publiseringsmanifest, bruker postliste_index.json:", e);
+    }
+    const indexRes = await fetch(new URL("postliste_index.json", DATA_URL));
     const shardFiles = await indexRes.json();
+    // Arbeidsshardene committes sammen med deltaene, så de er alltid ajour
+    return { published: false, urls: shardFiles.map(f => new URL(f, DATA_URL).href), rows: null, seq: null };
+}
 
-    // 2. Last alle shards parallelt
-    const shardPromises = shardFiles.map(async (filename) => {
-        const res = await fetch(`../data/${filename}`);
-        return res.json();
-    });
+async function fetchPublished(url, cache) {
+    if (cache) {
+        const cached = await cache.match(url);
+        if (cached) return cached;
+        const res = await fetch(url);
+        if (res.ok) await cache.put(url, res.clone());
+        return res;
+    }
+    return fetch(url);
+}
 
-    const shardData = await Promise.all(shardPromises);
+// Laster og dekoder alle shards inn i map. Publiserte shards dekodes linje
+// for linje mens de lastes ned; onProgress(lastet, forventet) etter hver bit.
+// Returnerer seq for deltaet shardene er ajour med.
+async function loadSnapshot(map, onProgress) {
+    // 1. Finn shardene
+    const { published, urls, rows, seq } = await shardSources();
 
-    // 3. Slå sammen alle entries til én liste
-    const allEntries = shardData.flat();
+    let loaded = 0;
+    const add = docs => {
+        for (const d of docs) {
+            map[d.dokumentID] = d;
+        }
+        loaded += docs.length;
+        if (onProgress) onProgress(loaded, rows);
+    };
+
+    if (!published) {
+        const shards = await Promise.all(urls.map(async url => decodeDocuments(await (await fetch(url)).json())));
+        shards.forEach(add);
+        return seq;
+    }
 
-    // 4. Lag et map: dokumentID → dokument
+    // 2. Uendrede shards hentes fra Cache API; utdaterte hasher fjernes
+    const cache = "caches" in self ? await caches.open(SHARD_CACHE).catch(() => null) : null;
+    if (cache) caches.delete("postliste-shards-v1");   // hele JSON-filer, før linjeformatet
+    if (cache) {
+        const wanted = new Set(urls);
+        for (const req of await cache.keys()) {
+            if (!wanted.has(req.url)) cache.delete(req);
+        }
+    }
+
+    // 3. Alle shards parallelt, dekodet mens de lastes ned
+    await Promise.all(urls.map(async url => streamDocuments(await fetchPublished(url, cache), add)));
+    return seq;
+}
+
+// { dokumentID: dokument }. onProgress(lastet, forventet) kalles mens
+// shardene lastes; forventet er null når antallet ikke er kjent.
+export async function loadPostliste(onProgress) {
+    // 1. Deltamanifestet sier hvor langt datasettet har kommet
+    const deltas = await loadDeltaManifest();
+
+    // 2. Lokal kopi + deltaene siden sist, hvis ingen mangler
+    if (deltas) {
+        const cached = await loadCachedPostliste();
+        if (cached && canCatchUp(deltas, cached.seq)) {
+            const map = await applyDeltas(cached.docs, deltas, cached.seq);
+            if (cached.seq !== deltas.latest_seq) await saveCachedPostliste(deltas.latest_seq, map);
+            return map;
+        }
+    }
+
+    // 3. Ellers hele datasettet fra shardene
     const map = {};
-    for (const d of allEntries) {
-        map[d.dokumentID] = d;
+    const seq = await loadSnapshot(map, onProgress);
+
+    // 4. Ta igjen deltaer publisert etter shardene og lagre lokal kopi
+    if (deltas) {
+        const base = seq ?? deltas.latest_seq;
+        if (canCatchUp(deltas, base)) {
+            await applyDeltas(map, deltas, base);
+            await saveCachedPostliste(deltas.latest_seq, map);
+        }
     }
 
     return map;
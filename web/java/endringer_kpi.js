@@ -18,7 +18,7 @@ export function renderKPIs(changes, postliste) {
         : 0;
 
     const newFiles = recent.filter(c =>
-        c.endringer && c.endringer.filer_count
+        c.endringer && (c.endringer.filer_count || c.endringer.filer?.lagt_til?.length)
     ).length;
 
     const statusChanges = recent.filter(c =>
@@ -66,7 +66,7 @@ export function renderTables(changes, postliste) {
     tbody3.innerHTML = "";
 
     const fileChanges = changes.filter(c =>
-        c.endringer && c.endringer.filer_count
+        c.endringer && (c.endringer.filer_count || c.endringer.filer?.lagt_til?.length)
     );
 
     for (const c of fileChanges.slice(0, 20)) {
@@ -74,7 +74,7 @@ export function renderTables(changes, postliste) {
         tr.innerHTML = `
             <td>${c.dokumentID}</td>
             <td>${postliste[c.dokumentID]?.tittel || ""}</td>
-            <td>${c.endringer.filer_count?.ny || "?"}</td>
+            <td>${c.endringer.filer_count?.ny ?? postliste[c.dokumentID]?.filer?.length ?? "?"}</td>
         `;
         tbody3.appendChild(tr);
     }
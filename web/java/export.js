@@ -1,25 +1,10 @@
 // export.js – funksjoner for eksport og deling
-import { getState, getFilteredData } from './render.js';
+import { getState, getQuery } from './render.js';
+import { queryCSV } from './data_client.js';
 
-export function exportCSV() {
-  const filtered = getFilteredData();
-  const rows = [["Dato","DokumentID","Tittel","Dokumenttype","Avsender/Mottaker","Status","Journalpostlenke"]];
-  filtered.forEach(d => {
-    const link = d.journal_link || d.detalj_link || "";
-    rows.push([
-      d.dato || "",
-      String(d.dokumentID || ""),
-      (d.tittel || "").replace(/\s+/g, " ").trim(),
-      d.dokumenttype || "",
-      d.avsender_mottaker || "",
-      d.status || "",
-      link
-    ]);
-  });
-
-  const csv = rows
-    .map(r => r.map(v => `"${String(v).replace(/"/g, '""')}"`).join(","))
-    .join("\n");
+export async function exportCSV() {
+  // CSV-en bygges i datatråden fra de filtrerte dokumentene
+  const csv = await queryCSV(getQuery());
 
   const blob = new Blob([csv], { type: "text/csv;charset=utf-8;" });
   const url = URL.createObjectURL(blob);
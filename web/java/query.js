@@ -0,0 +1,87 @@
+// query.js – filtrering, sortering og CSV for postlisten
+// Brukes av data_worker.js; ingen DOM-avhengigheter.
+
+export function parseDDMMYYYY(d) {
+  if (!d) return null;
+  const parts = d.split(".");
+  if (parts.length !== 3) return null;
+  const [DD, MM, YYYY] = parts.map(x => parseInt(x, 10));
+  return new Date(YYYY, MM - 1, DD);
+}
+
+// Dokument med forhåndsberegnet dato og søketekst, så hvert søk slipper
+// å parse datoer og gjøre om til små bokstaver på nytt
+export function indexDocument(d) {
+  const dt = parseDDMMYYYY(d.dato);
+  return {
+    doc: d,
+    time: dt ? dt.getTime() : null,
+    tittel: (d.tittel || "").toLowerCase(),
+    id: String(d.dokumentID || "").toLowerCase(),
+  };
+}
+
+// q: { search, filter, status, dateFrom, dateTo, sort } som i render.js
+export function filterAndSort(rows, q) {
+  let arr = rows;
+
+  if (q.search) {
+    const s = q.search.toLowerCase();
+    arr = arr.filter(r => r.tittel.includes(s) || r.id.includes(s));
+  }
+
+  if (q.filter) {
+    arr = arr.filter(r => r.doc.dokumenttype && r.doc.dokumenttype.includes(q.filter));
+  }
+
+  if (q.status) {
+    arr = arr.filter(r => r.doc.status === q.status);
+  }
+
+  if (q.dateFrom || q.dateTo) {
+    const from = q.dateFrom ? new Date(q.dateFrom).getTime() : null;
+    const to = q.dateTo ? new Date(q.dateTo).getTime() : null;
+    arr = arr.filter(r => {
+      if (r.time === null) return false;
+      if (from !== null && r.time < from) return false;
+      if (to !== null && r.time > to) return false;
+      return true;
+    });
+  }
+
+  if (arr === rows) arr = rows.slice();
+
+  const sort = q.sort || "dato-desc";
+  arr.sort((a, b) => {
+    if (sort === "dato-desc") return (b.time || 0) - (a.time || 0);
+    if (sort === "dato-asc") return (a.time || 0) - (b.time || 0);
+    if (sort === "type-asc") return (a.doc.dokumenttype || "").localeCompare(b.doc.dokumenttype || "");
+    if (sort === "type-desc") return (b.doc.dokumenttype || "").localeCompare(a.doc.dokumenttype || "");
+    if (sort === "status-publisert") return (b.doc.status === "Publisert") - (a.doc.status === "Publisert");
+    if (sort === "status-innsyn") return (a.doc.status === "Publisert") - (b.doc.status === "Publisert");
+    return 0;
+  });
+
+  return arr;
+}
+
+// Samme kolonner som data/exports/ (src/utils/generate_exports.py)
+export function toCSV(docs) {
+  const rows = [["Dato","DokumentID","Tittel","Dokumenttype","Avsender/Mottaker","Status","Journalpostlenke"]];
+  docs.forEach(d => {
+    const link = d.journal_link || d.detalj_link || "";
+    rows.push([
+      d.dato || "",
+      String(d.dokumentID || ""),
+      (d.tittel || "").replace(/\s+/g, " ").trim(),
+      d.dokumenttype || "",
+      d.avsender_mottaker || "",
+      d.status || "",
+      link
+    ]);
+  });
+
+  return rows
+    .map(r => r.map(v => `"${String(v).replace(/"/g, '""')}"`).join(","))
+    .join("\n");
+}
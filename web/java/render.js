@@ -1,8 +1,11 @@
 // === Imports ===
 import { renderPagination } from './pagination.js';
+import { queryPage } from './data_client.js';
 
 // === Global state (privat) ===
-let data = [];              // <-- NYTT: datasettet fra shards
+// Datasettet ligger i datatråden (data_worker.js); her er bare filtrene
+let loaded = false;         // første side er ferdigrendret i HTML til data er lastet
+let latestRequest = 0;      // svar på eldre spørringer forkastes
 let currentSearch = "";
 let currentFilter = "";
 let currentStatus = "";
@@ -12,7 +15,7 @@ let currentSort = "dato-desc";
 let currentPage = 1;
 
 // === Settere og gettere ===
-export function setData(arr) { data = arr || []; }   // <-- NYTT
+export function setLoaded() { loaded = true; }
 
 export function setSearch(val) { currentSearch = val; }
 export function setFilter(val) { currentFilter = val; }
@@ -25,6 +28,18 @@ export function getState() {
   return { currentSearch, currentFilter, currentStatus, dateFrom, dateTo, currentSort, currentPage };
 }
 
+// Filtrene slik datatråden (query.js) tar dem
+export function getQuery() {
+  return {
+    search: currentSearch,
+    filter: currentFilter,
+    status: currentStatus,
+    dateFrom,
+    dateTo,
+    sort: currentSort,
+  };
+}
+
 // === Hjelpefunksjoner ===
 function escapeHtml(s) {
   if (!s) return "";
@@ -57,68 +72,8 @@ function iconForType(doktype) {
   return "📄";
 }
 
-// Eksporter parseDDMMYYYY slik at stats.js kan bruke den
-export function parseDDMMYYYY(d) {
-  if (!d) return null;
-  const parts = d.split(".");
-  if (parts.length !== 3) return null;
-  const [DD, MM, YYYY] = parts.map(x => parseInt(x, 10));
-  return new Date(YYYY, MM - 1, DD);
-}
-
-function getDateForSort(d) {
-  const dt = parseDDMMYYYY(d.dato);
-  return dt ? dt.getTime() : 0;
-}
-
-// === Filtrering og sortering ===
-export function getFilteredData() {
-  let arr = data.slice();
-
-  if (currentSearch) {
-    const q = currentSearch.toLowerCase();
-    arr = arr.filter(d =>
-      (d.tittel && d.tittel.toLowerCase().includes(q)) ||
-      (d.dokumentID && String(d.dokumentID).toLowerCase().includes(q))
-    );
-  }
-
-  if (currentFilter) {
-    arr = arr.filter(d => d.dokumenttype && d.dokumenttype.includes(currentFilter));
-  }
-
-  if (currentStatus) {
-    arr = arr.filter(d => d.status === currentStatus);
-  }
-
-  if (dateFrom || dateTo) {
-    const from = dateFrom ? new Date(dateFrom) : null;
-    const to = dateTo ? new Date(dateTo) : null;
-    arr = arr.filter(d => {
-      const pd = parseDDMMYYYY(d.dato);
-      if (!pd) return false;
-      if (from && pd < from) return false;
-      if (to && pd > to) return false;
-      return true;
-    });
-  }
-
-  arr.sort((a,b) => {
-    if (currentSort === "dato-desc") return getDateForSort(b) - getDateForSort(a);
-    if (currentSort === "dato-asc") return getDateForSort(a) - getDateForSort(b);
-    if (currentSort === "type-asc") return (a.dokumenttype||"").localeCompare(b.dokumenttype||"");
-    if (currentSort === "type-desc") return (b.dokumenttype||"").localeCompare(a.dokumenttype||"");
-    if (currentSort === "status-publisert") return (b.status === "Publisert") - (a.status === "Publisert");
-    if (currentSort === "status-innsyn") return (a.status === "Publisert") - (b.status === "Publisert");
-    return 0;
-  });
-
-  return arr;
-}
-
 // === Sammendrag ===
-function renderSummary(totalFiltered) {
-  const totalAll = data.length;
+function renderSummary(totalFiltered, totalAll) {
   const parts = [];
   if (currentSearch) parts.push(`søk: "${currentSearch}"`);
   if (currentFilter) parts.push(`type: ${currentFilter}`);
@@ -131,17 +86,17 @@ function renderSummary(totalFiltered) {
 }
 
 // === Rendering av kort og paginering ===
-export function renderPage(page) {
-  const filtered = getFilteredData();
-  const maxPage = Math.ceil(filtered.length / perPage) || 1;
+export async function renderPage(page) {
+  // Behold den statiske første siden til datasettet er på plass
+  if (!loaded) return;
 
-  if (page < 1) page = 1;
-  if (page > maxPage) page = maxPage;
-  currentPage = page;
+  // Filtrering, sortering og utsnitt skjer i datatråden
+  const request = ++latestRequest;
+  const result = await queryPage(getQuery(), page, perPage);
+  if (request !== latestRequest) return;
 
-  const start = (page - 1) * perPage;
-  const end = start + perPage;
-  const items = filtered.slice(start, end);
+  currentPage = result.page;
+  const items = result.items;
 
   const cards = items.map(d => {
     const typeClass = cssClassForType(d.dokumenttype || "");
@@ -177,8 +132,8 @@ export function renderPage(page) {
   const container = document.getElementById("container");
   if (container) container.innerHTML = cards;
 
-  renderPagination("pagination-top", currentPage, filtered.length, perPage);
-  renderPagination("pagination-bottom", currentPage, filtered.length, perPage);
+  renderPagination("pagination-top", currentPage, result.total, perPage);
+  renderPagination("pagination-bottom", currentPage, result.total, perPage);
 
-  renderSummary(filtered.length);
+  renderSummary(result.total, result.totalAll);
 }
@@ -1,5 +1,5 @@
 // stats.js – Statistikk og diagrammer med Chart.js
-import { parseDDMMYYYY } from './render.js';
+import { parseDDMMYYYY } from './query.js';
 
 // Chart-instansene (slik at vi kan destroy() ved oppdatering)
 let weeklyChart = null;
@@ -7,16 +7,18 @@ let typesChart = null;
 let statusChart = null;
 let yearChart = null;
 
-export function initStats(data) {
-  if (!Array.isArray(data)) {
-    console.error("Data er ikke en liste:", data);
+// stats er resultatet av computeStats (regnes ut i data_worker.js)
+export function initStats(stats) {
+  if (!stats || !stats.month) {
+    console.error("Mangler statistikk:", stats);
     return;
   }
 
-  buildCharts(data);
+  buildCharts(stats);
 }
 
-function buildCharts(data) {
+// Tellinger per måned, type, status og år for en liste dokumenter
+export function computeStats(data) {
   // ============================
   // 1) Dokumenter per måned
   // ============================
@@ -69,6 +71,20 @@ function buildCharts(data) {
   const yearLabels = Object.keys(perYear).sort();
   const yearData = yearLabels.map(k => perYear[k]);
 
+  return {
+    month: { labels: monthLabels, data: monthData },
+    type: { labels: typeLabels, data: typeData },
+    status: { labels: statusLabels, data: statusData },
+    year: { labels: yearLabels, data: yearData },
+  };
+}
+
+function buildCharts(stats) {
+  const { labels: monthLabels, data: monthData } = stats.month;
+  const { labels: typeLabels, data: typeData } = stats.type;
+  const { labels: statusLabels, data: statusData } = stats.status;
+  const { labels: yearLabels, data: yearData } = stats.year;
+
   // ============================
   // Hent canvas-elementer
   // ============================
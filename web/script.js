@@ -1,28 +1,35 @@
 // Entry point for å hente inn modulene fra web/java/
 
 import './java/filters.js';
-import { renderPage, setData } from './java/render.js';
-import { loadPostliste } from './java/endringer_data.js';
+import { renderPage, setLoaded } from './java/render.js';
+import { onError, onProgress, onReady } from './java/data_client.js';
 import './java/export.js';
 import './java/stats.js';
 
 // Global konfig (brukes av filters.js)
 window.perPage = 50;
 
-document.addEventListener("DOMContentLoaded", async () => {
-  // 1. Last datasettet fra shards
-  const map = await loadPostliste();
+// 1. Datatråden laster shardene med en gang; hovedtråden viser bare fremdrift
+onProgress(({ loaded, expected }) => {
+  const el = document.getElementById("summary");
+  if (el) el.textContent = expected ? `Laster postlisten … ${loaded} av ${expected}` : `Laster postlisten … ${loaded}`;
+});
 
-  // 2. Konverter map → array (render.js forventer en liste)
-  const arr = Object.values(map);
+onError(({ message }) => {
+  const el = document.getElementById("summary");
+  if (el) el.textContent = `Kunne ikke laste postlisten: ${message}`;
+});
 
-  // 3. Sett data i render.js
-  setData(arr);
+document.addEventListener("DOMContentLoaded", () => {
+  // 2. Når datasettet er klart i datatråden, tar render.js over den ferdigrendrede siden
+  onReady(() => {
+    setLoaded();
 
-  // 4. Hent side fra URL
-  const params = new URLSearchParams(window.location.search);
-  const page = parseInt(params.get("page"), 10);
+    // 3. Hent side fra URL
+    const params = new URLSearchParams(window.location.search);
+    const page = parseInt(params.get("page"), 10);
 
-  // 5. Render første side
-  renderPage(!isNaN(page) ? page : 1);
+    // 4. Render siden (med filtre som ble valgt mens data lastet)
+    renderPage(!isNaN(page) ? page : 1);
+  });
 });